@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Benchmark peak memory of the sessions XLSX export, streaming vs. the previous writer.
+
+Each case runs in a fresh interpreter and reports how much its peak RSS grew while the
+workbook was built (the synthetic sessions are created before the baseline is taken).
+The "legacy" writer is the pre-streaming implementation: a regular `Workbook()`, a
+materialized row list and a `BytesIO` output.
+
+    uv run python scripts/bench_export_memory.py --rows 10000 50000 200000
+"""
+
+from __future__ import annotations
+
+import json
+import resource
+import subprocess
+import sys
+import time
+from argparse import SUPPRESS, ArgumentParser
+from datetime import UTC, datetime
+from io import BytesIO
+from typing import cast
+
+from openpyxl import Workbook
+from openpyxl.worksheet.worksheet import Worksheet
+
+from drova_bot.domain.models import Session, Station
+from drova_bot.exports.executor import pack_records
+from drova_bot.exports.sessions import (
+    SESSION_EXPORT_HEADERS,
+    _session_rows,
+    _sessions_xlsx_payload,
+)
+
+NOW = datetime(2026, 5, 18, 12, 0, tzinfo=UTC)
+TIMEZONE = "Asia/Yekaterinburg"
+
+
+def make_inputs(rows: int) -> tuple[list[Session], list[Station], dict[str, str]]:
+    stations = [
+        Station(uuid=f"station-{index}", name=f"Station {index}", state="BUSY", published=True)
+        for index in range(8)
+    ]
+    catalog = {f"product-{index}": f"Game {index}" for index in range(300)}
+    start_ms = 1_779_000_000_000
+    sessions = [
+        Session(
+            uuid=f"00000000-0000-4000-8000-{index:012d}",
+            server_id=f"station-{index % 8}",
+            merchant_id="merchant-1",
+            product_id=f"product-{index % 300}",
+            client_id=f"client-{index % 5000}",
+            creator_ip=f"10.{index % 250}.{index % 200}.{index % 100}",
+            created_on_ms=start_ms - index * 60_000,
+            finished_on_ms=start_ms - index * 60_000 + 1_800_000,
+            billing_type="prepaid",
+            status="FINISHED",
+            score_text="ok",
+        )
+        for index in range(rows)
+    ]
+    return sessions, stations, catalog
+
+
+def build_legacy(
+    sessions: list[Session],
+    stations: list[Station],
+    catalog: dict[str, str],
+) -> bytes:
+    rows = list(_session_rows(sessions, stations, catalog, NOW, TIMEZONE))
+    workbook = Workbook()
+    worksheet = cast(Worksheet, workbook.active)
+    worksheet.title = "sessions"
+    worksheet.append(SESSION_EXPORT_HEADERS)
+    for row in rows:
+        worksheet.append(row)
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def build_streaming(
+    sessions: list[Session],
+    stations: list[Station],
+    catalog: dict[str, str],
+) -> bytes:
+    return _sessions_xlsx_payload(
+        pack_records(Session, sessions),
+        pack_records(Station, stations),
+        catalog,
+        NOW,
+        TIMEZONE,
+    )
+
+
+def peak_rss_mib() -> float:
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_case(mode: str, rows: int) -> dict[str, float]:
+    sessions, stations, catalog = make_inputs(rows)
+    baseline = peak_rss_mib()
+    started = time.perf_counter()
+    builder = build_legacy if mode == "legacy" else build_streaming
+    payload = builder(sessions, stations, catalog)
+    return {
+        "seconds": time.perf_counter() - started,
+        "peak_growth_mib": peak_rss_mib() - baseline,
+        "file_mib": len(payload) / 1024 / 1024,
+    }
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument(
+        "--legacy-max-rows",
+        type=int,
+        default=50_000,
+        help="skip the legacy writer above this size (about 1.5 GiB of RSS at 200k rows)",
+    )
+    parser.add_argument("--case", nargs=2, metavar=("MODE", "ROWS"), help=SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case is not None:
+        mode, rows = args.case
+        print(json.dumps(run_case(mode, int(rows))))
+        return
+
+    print(f"{'rows':>8} {'writer':>10} {'peak MiB':>10} {'seconds':>9} {'file MiB':>9}")
+    for rows in args.rows:
+        for mode in ("legacy", "streaming"):
+            if mode == "legacy" and rows > args.legacy_max_rows:
+                print(f"{rows:>8} {mode:>10} {'skipped':>10}")
+                continue
+            completed = subprocess.run(
+                [sys.executable, __file__, "--case", mode, str(rows)],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            result = json.loads(completed.stdout)
+            print(
+                f"{rows:>8} {mode:>10} {result['peak_growth_mib']:>10.1f} "
+                f"{result['seconds']:>9.2f} {result['file_mib']:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
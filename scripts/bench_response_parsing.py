@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Micro-benchmark Drova response parsing against the API fixtures.
+
+Compares the per-row pydantic model path (`response.json()` -> `XResponse.model_validate`
+-> `to_domain()`) with the TypeAdapter fast path used by `DrovaClient`. Fixture rows are
+repeated to reach export-sized payloads.
+
+    uv run python scripts/bench_response_parsing.py --rows 20000
+
+Measured with CPython 3.13.5 and pydantic 2.13.4 on one core of an x86_64 Xeon VM, best of
+20 repeats (speedup of the fast path):
+
+    rows     sessions  products_full
+    2000     1.2x      2.3x
+    20000    1.4x      2.7x
+
+The sessions figure varies between runs and machines, from about 1.0x to 1.4x; re-run the
+script before relying on it.
+"""
+
+from __future__ import annotations
+
+import json
+import timeit
+from argparse import ArgumentParser
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from drova_bot.drova.models import (
+    CatalogProductResponse,
+    SessionPageResponse,
+    parse_catalog_products_json,
+    parse_sessions_json,
+)
+
+FIXTURE_DIR = Path(__file__).resolve().parents[1] / "specs" / "v2" / "fixtures" / "api"
+
+
+def load_response(filename: str) -> Any:
+    return json.loads((FIXTURE_DIR / filename).read_text(encoding="utf-8"))["response"]
+
+
+def repeat_rows(rows: list[Any], count: int) -> list[Any]:
+    return [rows[index % len(rows)] for index in range(count)]
+
+
+def model_sessions(content: bytes) -> object:
+    return SessionPageResponse.parse_payload(json.loads(content)).to_domain().sessions
+
+
+def model_products(content: bytes) -> object:
+    return [CatalogProductResponse.model_validate(item).to_domain() for item in json.loads(content)]
+
+
+def measure(parse: Callable[[bytes], object], content: bytes, repeat: int) -> float:
+    return min(timeit.repeat(lambda: parse(content), number=1, repeat=repeat))
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sessions = repeat_rows(load_response("sessions_all_limit_5.json")["sessions"], args.rows)
+    products = repeat_rows(load_response("products_full.json"), args.rows)
+    cases = [
+        (
+            "sessions",
+            json.dumps({"sessions": sessions}).encode(),
+            model_sessions,
+            parse_sessions_json,
+        ),
+        (
+            "products_full",
+            json.dumps(products).encode(),
+            model_products,
+            parse_catalog_products_json,
+        ),
+    ]
+
+    print(f"{'payload':<14} {'rows':>7} {'models ms':>10} {'adapter ms':>11} {'speedup':>8}")
+    for name, content, slow, fast in cases:
+        if slow(content) != fast(content):
+            raise SystemExit(f"{name}: fast path result differs from model path")
+        slow_ms = measure(slow, content, args.repeat) * 1000
+        fast_ms = measure(fast, content, args.repeat) * 1000
+        print(
+            f"{name:<14} {args.rows:>7} {slow_ms:>10.1f} {fast_ms:>11.1f} "
+            f"{slow_ms / fast_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmark concurrent unit-of-work transactions on SQLite with and without tuning.
+
+Each worker runs the bot's typical command mix: a profile read, a station-cache sync
+that changes rows on every other call, and a product-title read. The same load runs
+against a plain engine (SQLite defaults) and against the `SQLitePragmas` profile.
+
+    uv run python scripts/bench_sqlite_uow.py --chats 50 --rounds 20
+"""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+
+from drova_bot.domain.models import CatalogProduct, Station
+from drova_bot.storage import (
+    SQLitePragmas,
+    StorageUnitOfWorkFactory,
+    TokenEncryptor,
+    create_database_engine,
+    create_schema,
+    make_session_factory,
+)
+
+
+async def run_load(
+    database_path: Path,
+    *,
+    pragmas: SQLitePragmas | None,
+    chats: int,
+    rounds: int,
+) -> tuple[float, int]:
+    engine = create_database_engine(f"sqlite+aiosqlite:///{database_path}", sqlite_pragmas=pragmas)
+    await create_schema(engine)
+    uow_factory = StorageUnitOfWorkFactory(
+        make_session_factory(engine),
+        TokenEncryptor(TokenEncryptor.generate_key()),
+    )
+    async with uow_factory() as uow:
+        for chat_id in range(chats):
+            await uow.chat_profiles.get_or_create(chat_id)
+        await uow.product_cache.upsert_catalog(
+            CatalogProduct(f"product-{index}", f"Game {index}") for index in range(200)
+        )
+
+    errors = 0
+
+    async def worker(chat_id: int) -> None:
+        nonlocal errors
+        for round_index in range(rounds):
+            stations = [
+                Station(
+                    uuid=f"station-{chat_id}-{index}",
+                    name=f"Station {index} v{round_index // 2}",
+                    state="HANDSHAKE",
+                    published=True,
+                )
+                for index in range(4)
+            ]
+            try:
+                async with uow_factory() as uow:
+                    await uow.chat_profiles.get(chat_id)
+                async with uow_factory() as uow:
+                    await uow.station_cache.replace_for_chat(chat_id, stations)
+                async with uow_factory() as uow:
+                    await uow.product_cache.title_map()
+            except OperationalError:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(chat_id) for chat_id in range(chats)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return elapsed, errors
+
+
+async def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument(
+        "--directory",
+        type=Path,
+        default=None,
+        help="where to create the databases; use the production volume for real fsync costs",
+    )
+    args = parser.parse_args()
+
+    transactions = args.chats * args.rounds * 3
+    print(f"{'profile':<10} {'seconds':>8} {'tx/s':>8} {'errors':>7}")
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        for name, pragmas in (("default", None), ("tuned", SQLitePragmas())):
+            elapsed, errors = await run_load(
+                Path(directory) / f"{name}.sqlite3",
+                pragmas=pragmas,
+                chats=args.chats,
+                rounds=args.rounds,
+            )
+            print(f"{name:<10} {elapsed:>8.2f} {transactions / elapsed:>8.0f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
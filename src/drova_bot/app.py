@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import structlog
 from aiogram import Bot, Dispatcher
@@ -11,11 +11,25 @@ from aiogram.types import BotCommand
 from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine
 
+from drova_bot.application.catalog import ProductCatalog
+from drova_bot.application.export_jobs import ExportJobQueue
+from drova_bot.application.response_cache import DrovaResponseCache
 from drova_bot.application.services import BotService, DefaultDrovaClientFactory
+from drova_bot.application.session_history import SessionHistory
 from drova_bot.config import Settings
+from drova_bot.exports import (
+    ExportArtifactCache,
+    ExportExecutor,
+    ProductExportService,
+    SessionExportService,
+    create_export_executor,
+)
 from drova_bot.geoip import GeoLiteResolver
 from drova_bot.observability.logging import configure_logging
 from drova_bot.storage import (
+    ChatProfileCache,
+    DatabasePoolOptions,
+    SQLitePragmas,
     StorageUnitOfWorkFactory,
     TokenEncryptor,
     create_database_engine,
@@ -23,7 +37,7 @@ from drova_bot.storage import (
     run_migrations,
 )
 from drova_bot.telegram.middleware import RequestContextMiddleware
-from drova_bot.telegram.routers import build_router
+from drova_bot.telegram.routers import build_router, deliver_export_job
 
 logger = structlog.get_logger(__name__)
 
@@ -55,6 +69,7 @@ BOT_COMMANDS = [
     BotCommand(command="promocodes", description="Неактивированные промокоды"),
     BotCommand(command="export_sessions", description="Сессии одним XLSX"),
     BotCommand(command="export_sessions_csv", description="Сессии CSV по станциям"),
+    BotCommand(command="csv_bundle", description="CSV по станциям: ZIP или файлы"),
     BotCommand(command="export_products", description="Матрица продуктов XLSX"),
     BotCommand(command="export_product_time", description="Время по продуктам XLSX"),
 ]
@@ -66,41 +81,156 @@ class Runtime:
     dispatcher: Dispatcher
     engine: AsyncEngine
     geo_resolver: GeoLiteResolver | None = None
+    client_factory: DefaultDrovaClientFactory | None = None
+    export_executor: ExportExecutor | None = None
+    export_queue: ExportJobQueue | None = None
+    export_drain_timeout_seconds: float = 30.0
+    background_tasks: list[asyncio.Task[None]] = field(default_factory=list)
 
     async def close(self) -> None:
+        if self.export_queue is not None:
+            await self.export_queue.drain(self.export_drain_timeout_seconds)
+        for task in self.background_tasks:
+            task.cancel()
+        await asyncio.gather(*self.background_tasks, return_exceptions=True)
         await self.bot.session.close()
+        if self.client_factory is not None:
+            await self.client_factory.aclose()
         if self.geo_resolver is not None:
             self.geo_resolver.close()
+        if self.export_executor is not None:
+            await asyncio.to_thread(self.export_executor.close)
         await self.engine.dispose()
 
 
 def build_runtime(settings: Settings) -> Runtime:
     """Create the concrete aiogram and storage runtime graph."""
     settings.require_runtime_secrets()
-    engine = create_database_engine(settings.database_url)
+    engine = create_database_engine(
+        settings.database_url,
+        sqlite_pragmas=SQLitePragmas(
+            journal_mode=settings.sqlite_journal_mode,
+            synchronous=settings.sqlite_synchronous,
+            busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+            mmap_size_bytes=settings.sqlite_mmap_size_bytes,
+            cache_size_kib=settings.sqlite_cache_size_kib,
+        ),
+        pool=DatabasePoolOptions(
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_pre_ping=settings.database_pool_pre_ping,
+        ),
+    )
     session_factory = make_session_factory(engine)
-    encryptor = TokenEncryptor(settings.bot_secret_key or "")
-    uow_factory = StorageUnitOfWorkFactory(session_factory, encryptor)
+    encryptor = TokenEncryptor(
+        settings.bot_secret_key or "",
+        retired_keys=settings.retired_secret_keys(),
+    )
+    uow_factory = StorageUnitOfWorkFactory(
+        session_factory,
+        encryptor,
+        profile_cache=(
+            ChatProfileCache(
+                ttl_seconds=settings.profile_cache_ttl_seconds,
+                max_entries=settings.profile_cache_max_entries,
+            )
+            if settings.profile_cache_ttl_seconds > 0
+            else None
+        ),
+    )
     geo_resolver = GeoLiteResolver(
         city_db_path=settings.geolite_city_db,
         asn_db_path=settings.geolite_asn_db,
     )
+    client_factory = DefaultDrovaClientFactory(settings)
+    product_catalog = ProductCatalog(
+        uow_factory,
+        miss_refresh_interval_seconds=settings.product_catalog_miss_refresh_seconds,
+    )
+    session_history = SessionHistory(
+        uow_factory,
+        window=settings.session_sync_window,
+        full_sync_limit=settings.export_row_limit,
+    )
+    export_executor = create_export_executor(
+        settings.export_executor,
+        max_workers=settings.export_workers,
+    )
+    export_cache = (
+        ExportArtifactCache(settings.export_cache_dir, max_bytes=settings.export_cache_max_bytes)
+        if settings.export_cache_dir and settings.export_cache_max_bytes > 0
+        else None
+    )
     service = BotService(
         uow_factory=uow_factory,
-        client_factory=DefaultDrovaClientFactory(settings),
+        client_factory=client_factory,
+        session_export_service=SessionExportService(export_executor, cache=export_cache),
+        product_export_service=ProductExportService(export_executor, cache=export_cache),
         export_row_limit=settings.export_row_limit,
         export_timeout_seconds=settings.export_timeout_seconds,
+        export_csv_zip_station_threshold=settings.export_csv_zip_station_threshold,
         session_geo_resolver=geo_resolver.lookup_session,
+        fan_out_limit=settings.drova_fan_out_limit,
+        response_cache=(
+            DrovaResponseCache(max_bytes=settings.drova_cache_max_bytes)
+            if settings.drova_cache_enabled
+            else None
+        ),
+        product_catalog=product_catalog,
+        session_history=session_history,
+        station_cache_fresh_seconds=settings.station_cache_fresh_seconds,
+        telegram_file_retention_seconds=settings.telegram_file_retention_seconds,
     )
+    background_tasks = []
+    if settings.product_catalog_refresh_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                product_catalog.run_refresher(
+                    # listfull2 is public, so the refresher needs no chat token.
+                    lambda: client_factory.create(""),
+                    interval_seconds=settings.product_catalog_refresh_seconds,
+                ),
+                name="product-catalog-refresher",
+            )
+        )
+    if settings.session_sync_interval_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                session_history.run_sync_loop(
+                    service.client_for_merchant,
+                    interval_seconds=settings.session_sync_interval_seconds,
+                ),
+                name="session-history-sync",
+            )
+        )
 
     bot = Bot(token=settings.telegram_bot_token or "")
+    export_queue = ExportJobQueue(
+        uow_factory,
+        lambda job: deliver_export_job(job, bot=bot, bot_service=service),
+        workers=settings.export_queue_workers,
+        per_chat_limit=settings.export_queue_per_chat_limit,
+        max_attempts=settings.export_queue_max_attempts,
+    )
+    background_tasks.append(asyncio.create_task(export_queue.run(), name="export-queue"))
     dispatcher = Dispatcher()
-    request_context = RequestContextMiddleware()
+    request_context = RequestContextMiddleware(request_scope=uow_factory.request_scope)
     dispatcher.message.middleware(request_context)
     dispatcher.callback_query.middleware(request_context)
     dispatcher.include_router(build_router())
     dispatcher["bot_service"] = service
-    return Runtime(bot=bot, dispatcher=dispatcher, engine=engine, geo_resolver=geo_resolver)
+    dispatcher["export_queue"] = export_queue
+    return Runtime(
+        bot=bot,
+        dispatcher=dispatcher,
+        engine=engine,
+        geo_resolver=geo_resolver,
+        client_factory=client_factory,
+        export_executor=export_executor,
+        export_queue=export_queue,
+        export_drain_timeout_seconds=settings.export_drain_timeout_seconds,
+        background_tasks=background_tasks,
+    )
 
 
 async def register_bot_commands(bot: Bot) -> None:
@@ -130,9 +260,19 @@ def main() -> None:
         "bot_starting",
         database_url=_safe_database_url(settings.database_url),
         drova_base_url=settings.drova_base_url,
+        drova_http2=settings.drova_http2,
+        drova_max_connections=settings.drova_max_connections,
+        drova_cache_enabled=settings.drova_cache_enabled,
+        drova_breaker_failure_threshold=settings.drova_breaker_failure_threshold,
+        drova_breaker_state_file_configured=bool(settings.drova_breaker_state_file),
         timezone=settings.timezone,
         export_row_limit=settings.export_row_limit,
         export_timeout_seconds=settings.export_timeout_seconds,
+        export_executor=settings.export_executor,
+        export_workers=settings.export_workers,
+        export_queue_workers=settings.export_queue_workers,
+        export_queue_per_chat_limit=settings.export_queue_per_chat_limit,
+        export_cache_dir_configured=bool(settings.export_cache_dir),
         geolite_city_db_configured=bool(settings.geolite_city_db),
         geolite_asn_db_configured=bool(settings.geolite_asn_db),
         http_proxy_configured=settings.http_proxy is not None,
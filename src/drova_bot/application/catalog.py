@@ -0,0 +1,152 @@
+"""Process-wide product catalog snapshot with background refresh."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Iterable, Mapping
+from hashlib import sha256
+from types import MappingProxyType
+
+import structlog
+
+from drova_bot.application.protocols import DrovaClientProtocol
+from drova_bot.domain.models import CatalogProduct
+from drova_bot.drova.coalescing import RequestCoalescer
+from drova_bot.drova.errors import DrovaError
+from drova_bot.storage.uow import StorageUnitOfWork
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_REFRESH_INTERVAL_SECONDS = 3600.0
+DEFAULT_MISS_REFRESH_INTERVAL_SECONDS = 300.0
+
+
+class ProductCatalog:
+    """Product titles shared by all chats, backed by the `product_cache` table.
+
+    The snapshot is read from storage once and then kept in memory. It is revalidated
+    against `listfull2` by `run_refresher` and whenever a lookup meets an unknown product
+    id (at most once per `miss_refresh_interval_seconds`). Refreshes are single-flight,
+    and storage is written only when the catalog's content hash changes.
+    """
+
+    def __init__(
+        self,
+        uow_factory: Callable[[], StorageUnitOfWork],
+        *,
+        miss_refresh_interval_seconds: float = DEFAULT_MISS_REFRESH_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._uow_factory = uow_factory
+        self._miss_refresh_interval_seconds = miss_refresh_interval_seconds
+        self._clock = clock
+        self._titles: Mapping[str, str] = MappingProxyType({})
+        self._digest: str | None = None
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._refreshes = RequestCoalescer()
+        self._last_refresh_at: float | None = None
+
+    @property
+    def titles(self) -> Mapping[str, str]:
+        return self._titles
+
+    async def lookup(
+        self,
+        client: DrovaClientProtocol,
+        product_ids: Iterable[str] = (),
+    ) -> Mapping[str, str]:
+        """Current titles, refreshing first when one of `product_ids` is unknown."""
+        if not self._loaded:
+            await self._load(client)
+        if any(product_id not in self._titles for product_id in product_ids):
+            if self._may_refresh_on_miss():
+                try:
+                    await self.refresh(client)
+                except DrovaError as exc:
+                    logger.warning("product_catalog_refresh_failed", error=type(exc).__name__)
+        return self._titles
+
+    async def refresh(self, client: DrovaClientProtocol) -> bool:
+        """Fetch the catalog from Drova; True when it differed from the snapshot."""
+        return await self._refreshes.run("refresh", lambda: self._refresh(client))
+
+    async def apply(self, products: Iterable[CatalogProduct]) -> bool:
+        """Merge a freshly fetched catalog into the snapshot and storage if it changed."""
+        products = list(products)
+        titles = {product.product_id: product.title for product in products}
+        digest = _digest(titles)
+        self._last_refresh_at = self._clock()
+        if digest == self._digest:
+            return False
+        async with self._uow_factory() as uow:
+            stored = await uow.product_cache.upsert_catalog(products)
+        logger.info(
+            "product_catalog_stored",
+            inserted=stored.inserted,
+            updated=stored.updated,
+            unchanged=stored.unchanged,
+        )
+        # Keep titles of products that left the catalog: old sessions still reference them.
+        self._titles = MappingProxyType({**self._titles, **titles})
+        self._digest = digest
+        self._loaded = True
+        return True
+
+    async def run_refresher(
+        self,
+        client_source: Callable[[], DrovaClientProtocol],
+        *,
+        interval_seconds: float = DEFAULT_REFRESH_INTERVAL_SECONDS,
+    ) -> None:
+        """Revalidate the catalog every `interval_seconds` until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            client = client_source()
+            try:
+                changed = await self.refresh(client)
+            except DrovaError as exc:
+                logger.warning("product_catalog_refresh_failed", error=type(exc).__name__)
+            except Exception:
+                # A storage or validation error must not end the refresher for good.
+                logger.exception("product_catalog_refresh_crashed")
+            else:
+                logger.info(
+                    "product_catalog_refreshed",
+                    changed=changed,
+                    product_count=len(self._titles),
+                )
+            finally:
+                await client.aclose()
+
+    async def _load(self, client: DrovaClientProtocol) -> None:
+        async with self._load_lock:
+            if self._loaded:
+                return
+            async with self._uow_factory() as uow:
+                stored = await uow.product_cache.title_map()
+            if stored:
+                self._titles = MappingProxyType(stored)
+                self._loaded = True
+                return
+            await self.refresh(client)
+
+    async def _refresh(self, client: DrovaClientProtocol) -> bool:
+        return await self.apply(await client.get_products_full())
+
+    def _may_refresh_on_miss(self) -> bool:
+        return (
+            self._last_refresh_at is None
+            or self._clock() - self._last_refresh_at >= self._miss_refresh_interval_seconds
+        )
+
+
+def _digest(titles: Mapping[str, str]) -> str:
+    digest = sha256()
+    for product_id, title in sorted(titles.items()):
+        digest.update(product_id.encode())
+        digest.update(b"\0")
+        digest.update(title.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
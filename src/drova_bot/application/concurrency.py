@@ -0,0 +1,95 @@
+"""Bounded concurrency helpers for per-station Drova fan-out."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Coroutine, Hashable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, overload
+
+DEFAULT_FAN_OUT_LIMIT = 8
+
+
+@dataclass(frozen=True, slots=True)
+class FanOutResult[K: Hashable, T]:
+    """Per-key results in input order plus keys whose call raised a captured error."""
+
+    values: dict[K, T] = field(default_factory=dict)
+    failures: dict[K, Exception] = field(default_factory=dict)
+
+    @property
+    def failed_keys(self) -> set[K]:
+        return set(self.failures)
+
+
+async def fan_out[K: Hashable, T](
+    keys: Iterable[K],
+    call: Callable[[K], Awaitable[T]],
+    *,
+    limit: int = DEFAULT_FAN_OUT_LIMIT,
+    capture: tuple[type[Exception], ...] = (),
+) -> FanOutResult[K, T]:
+    """Run `call` for every key with at most `limit` calls in flight.
+
+    Exceptions listed in `capture` are recorded per key and do not affect other keys.
+    Any other exception cancels the remaining calls and is re-raised unchanged, so
+    callers keep their usual `except DrovaUnauthorized` handling.
+    """
+    ordered_keys = list(dict.fromkeys(keys))
+    semaphore = asyncio.Semaphore(max(1, limit))
+    values: dict[K, T] = {}
+    failures: dict[K, Exception] = {}
+
+    async def run(key: K) -> None:
+        async with semaphore:
+            try:
+                values[key] = await call(key)
+            except capture as exc:
+                failures[key] = exc
+
+    tasks = [asyncio.create_task(run(key)) for key in ordered_keys]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    return FanOutResult(
+        values={key: values[key] for key in ordered_keys if key in values},
+        failures={key: failures[key] for key in ordered_keys if key in failures},
+    )
+
+
+@overload
+async def gather_all[A, B](
+    first: Coroutine[Any, Any, A],
+    second: Coroutine[Any, Any, B],
+    /,
+) -> tuple[A, B]: ...
+
+
+@overload
+async def gather_all[A, B, C](
+    first: Coroutine[Any, Any, A],
+    second: Coroutine[Any, Any, B],
+    third: Coroutine[Any, Any, C],
+    /,
+) -> tuple[A, B, C]: ...
+
+
+async def gather_all(*coroutines: Coroutine[Any, Any, Any]) -> tuple[Any, ...]:
+    """Await independent reads concurrently and return their results in argument order.
+
+    The first failure cancels the remaining reads and is re-raised as-is rather than
+    wrapped in an `ExceptionGroup`.
+    """
+    tasks = [asyncio.create_task(coroutine) for coroutine in coroutines]
+    try:
+        return tuple(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
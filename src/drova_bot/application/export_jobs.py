@@ -1,10 +1,25 @@
-"""Application DTOs for export job lifecycle."""
+"""Export job DTOs and the durable queue that runs them."""
 
 from __future__ import annotations
 
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
 from dataclasses import dataclass
 
+import structlog
+
 from drova_bot.exports import ExportKind
+from drova_bot.storage.database import ExportJobRow, ExportJobTargetRow
+from drova_bot.storage.uow import StorageUnitOfWork
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_EXPORT_QUEUE_WORKERS = 2
+DEFAULT_EXPORT_QUEUE_PER_CHAT_LIMIT = 1
+DEFAULT_EXPORT_QUEUE_MAX_ATTEMPTS = 3
+DEFAULT_EXPORT_QUEUE_POLL_SECONDS = 30.0
 
 
 @dataclass(frozen=True, slots=True)
@@ -14,3 +29,179 @@ class ExportJob:
     kind: ExportKind
     status: str
     error_code: str | None = None
+    progress_message_id: int | None = None
+
+    @classmethod
+    def from_row(cls, row: ExportJobRow) -> ExportJob:
+        return cls(
+            id=row.id,
+            telegram_chat_id=row.telegram_chat_id,
+            kind=ExportKind(row.kind),
+            status=row.status,
+            error_code=row.error_code,
+            progress_message_id=row.progress_message_id,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ExportDeliveryTarget:
+    """A chat waiting for an export job's files, besides the chat that created it."""
+
+    telegram_chat_id: int
+    progress_message_id: int | None = None
+
+    @classmethod
+    def from_row(cls, row: ExportJobTargetRow) -> ExportDeliveryTarget:
+        return cls(
+            telegram_chat_id=row.telegram_chat_id,
+            progress_message_id=row.progress_message_id,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ExportQueueStats:
+    queued: int
+    running: int
+    workers: int
+
+
+class ExportJobQueue:
+    """Runs `queued` rows of `export_jobs` on a fixed pool of `workers` tasks.
+
+    The worker count is the global concurrency cap; on top of it a chat has at most
+    `per_chat_limit` jobs running, and its other jobs wait while other chats' jobs
+    proceed. `notify` wakes idle workers after a job is created; they also poll every
+    `poll_interval_seconds`. On start, jobs left `running` by a previous process are
+    requeued (or failed once they used `max_attempts`); `drain` stops claiming and
+    gives running jobs a deadline to finish.
+    """
+
+    def __init__(
+        self,
+        uow_factory: Callable[[], StorageUnitOfWork],
+        runner: Callable[[ExportJob], Awaitable[None]],
+        *,
+        workers: int = DEFAULT_EXPORT_QUEUE_WORKERS,
+        per_chat_limit: int = DEFAULT_EXPORT_QUEUE_PER_CHAT_LIMIT,
+        max_attempts: int = DEFAULT_EXPORT_QUEUE_MAX_ATTEMPTS,
+        poll_interval_seconds: float = DEFAULT_EXPORT_QUEUE_POLL_SECONDS,
+    ) -> None:
+        self._uow_factory = uow_factory
+        self._runner = runner
+        self._worker_count = max(1, workers)
+        self._per_chat_limit = max(1, per_chat_limit)
+        self._max_attempts = max(1, max_attempts)
+        self._poll_interval_seconds = poll_interval_seconds
+        self._wakeup = asyncio.Event()
+        self._claim_lock = asyncio.Lock()
+        self._running_by_chat: Counter[int] = Counter()
+        self._workers: list[asyncio.Task[None]] = []
+        self._draining = False
+        self._queued = 0
+
+    def stats(self) -> ExportQueueStats:
+        """Queue depth as of the last claim, and jobs running in this process."""
+        return ExportQueueStats(
+            queued=self._queued,
+            running=sum(self._running_by_chat.values()),
+            workers=self._worker_count,
+        )
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        """Recover interrupted jobs, then work the queue until drained or cancelled."""
+        async with self._uow_factory() as uow:
+            requeued, failed = await uow.export_jobs.requeue_interrupted(
+                max_attempts=self._max_attempts,
+            )
+        if requeued or failed:
+            logger.info("export_jobs_recovered", requeued=requeued, failed=failed)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"export-worker-{index}")
+            for index in range(self._worker_count)
+        ]
+        try:
+            # Workers cancelled by `drain` end the run normally.
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        finally:
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+
+    async def drain(self, timeout_seconds: float) -> None:
+        """Stop claiming jobs and wait up to `timeout_seconds` for running ones.
+
+        Jobs still running at the deadline are cancelled; their rows stay `running` and
+        are requeued by the next `run`.
+        """
+        self._draining = True
+        self._wakeup.set()
+        if not self._workers:
+            return
+        _, pending = await asyncio.wait(self._workers, timeout=timeout_seconds)
+        for worker in pending:
+            worker.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        logger.info("export_queue_drained", interrupted=len(pending))
+
+    async def _work(self) -> None:
+        while not self._draining:
+            self._wakeup.clear()
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("export_job_claim_failed")
+                job = None
+            if job is None:
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self._poll_interval_seconds)
+                continue
+            try:
+                await self._run(job)
+            finally:
+                self._running_by_chat[job.telegram_chat_id] -= 1
+                if self._running_by_chat[job.telegram_chat_id] <= 0:
+                    del self._running_by_chat[job.telegram_chat_id]
+                # The chat may have more jobs that were held back by its limit.
+                self._wakeup.set()
+
+    async def _claim(self) -> ExportJob | None:
+        async with self._claim_lock:
+            busy_chats = [
+                chat_id
+                for chat_id, running in self._running_by_chat.items()
+                if running >= self._per_chat_limit
+            ]
+            async with self._uow_factory() as uow:
+                row = await uow.export_jobs.claim_next(excluded_chat_ids=busy_chats)
+                job = ExportJob.from_row(row) if row is not None else None
+                self._queued = (await uow.export_jobs.count_by_status()).get("queued", 0)
+            if job is None:
+                return None
+            self._running_by_chat[job.telegram_chat_id] += 1
+        stats = self.stats()
+        logger.info(
+            "export_job_claimed",
+            export_job_id=job.id,
+            kind=job.kind.value,
+            queued=stats.queued,
+            running=stats.running,
+        )
+        return job
+
+    async def _run(self, job: ExportJob) -> None:
+        try:
+            await self._runner(job)
+        except Exception:
+            logger.exception("export_job_runner_failed", export_job_id=job.id)
+            # The runner may fail after the job already finished (e.g. while delivering);
+            # only a job that is still running is failed.
+            try:
+                async with self._uow_factory() as uow:
+                    await uow.export_jobs.fail_if_running(job.id, "unexpected_export_error")
+            except Exception:
+                # The worker must outlive any single job; the row stays `running` and
+                # the next start requeues it.
+                logger.exception("export_job_status_update_failed", export_job_id=job.id)
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncGenerator, Awaitable, Callable
 from typing import Protocol
 
 from drova_bot.domain.models import (
@@ -16,6 +16,7 @@ from drova_bot.domain.models import (
     ServerProductEdit,
     ServerSource,
     ServerUsageStatistics,
+    Session,
     SessionPage,
     Station,
     StationProduct,
@@ -43,6 +44,13 @@ class DrovaClientProtocol(Protocol):
         limit: int | None = None,
     ) -> SessionPage: ...
 
+    def iter_sessions(
+        self,
+        merchant_id: str | None = None,
+        server_id: str | None = None,
+        limit: int | None = None,
+    ) -> AsyncGenerator[list[Session], None]: ...
+
     async def get_server_products(self, user_id: str, server_id: str) -> list[StationProduct]: ...
 
     async def get_server_product_edit(
@@ -0,0 +1,303 @@
+"""Opt-in in-process TTL cache for read-only Drova endpoints."""
+
+from __future__ import annotations
+
+import pickle
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from typing import cast
+
+from drova_bot.application.protocols import DrovaClientProtocol
+from drova_bot.domain.models import (
+    Account,
+    CatalogProduct,
+    Endpoint,
+    OpenedPrepaidDeal,
+    PrepaidSettlement,
+    PrepaidStats,
+    Promocode,
+    ServerProductEdit,
+    ServerSource,
+    ServerUsageStatistics,
+    Session,
+    SessionPage,
+    Station,
+    StationProduct,
+)
+
+SERVERS = "servers"
+SERVER_PRODUCTS = "server_products"
+SERVER_ENDPOINTS = "server_endpoints"
+SERVER_USAGE_STATISTICS = "server_usage_statistics"
+
+DEFAULT_CACHE_TTLS: Mapping[str, float] = {
+    SERVERS: 30.0,
+    SERVER_PRODUCTS: 120.0,
+    SERVER_ENDPOINTS: 60.0,
+    SERVER_USAGE_STATISTICS: 60.0,
+}
+DEFAULT_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+CacheParams = tuple[tuple[str, object], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class CacheKey:
+    merchant_id: str
+    endpoint: str
+    station_id: str | None = None
+    params: CacheParams = ()
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    value: object
+    expires_at: float
+    size: int
+
+
+class DrovaResponseCache:
+    """Process-wide LRU of parsed Drova responses with per-endpoint TTLs.
+
+    Entries are bounded by an approximate byte budget (pickled size of the parsed value).
+    Writes on a station drop that station's entries and the merchant's station list.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttls: Mapping[str, float] | None = None,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttls = dict(DEFAULT_CACHE_TTLS if ttls is None else ttls)
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, _CacheEntry] = OrderedDict()
+        self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> object | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def put(self, key: CacheKey, value: object) -> None:
+        ttl = self._ttls.get(key.endpoint, 0.0)
+        if ttl <= 0:
+            return
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self._max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = _CacheEntry(value=value, expires_at=self._clock() + ttl, size=size)
+        self._size += size
+        while self._size > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def invalidate_station(self, merchant_id: str, station_id: str) -> None:
+        stale = [
+            key
+            for key in self._entries
+            if key.merchant_id == merchant_id
+            and (key.station_id == station_id or key.endpoint == SERVERS)
+        ]
+        for key in stale:
+            self._drop(key)
+
+    def invalidate_merchant(self, merchant_id: str) -> None:
+        for key in [key for key in self._entries if key.merchant_id == merchant_id]:
+            self._drop(key)
+
+    def _drop(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+
+class CachingDrovaClient:
+    """`DrovaClientProtocol` decorator that serves cacheable reads from `DrovaResponseCache`.
+
+    Sessions, promocodes, billing and station source are always fetched fresh.
+    """
+
+    def __init__(
+        self,
+        client: DrovaClientProtocol,
+        cache: DrovaResponseCache,
+        *,
+        merchant_id: str,
+    ) -> None:
+        self._client = client
+        self._cache = cache
+        self._merchant_id = merchant_id
+
+    @property
+    def proxy_token(self) -> str:
+        return self._client.proxy_token
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def get_account(self) -> Account:
+        return await self._client.get_account()
+
+    async def get_products_full(self) -> list[CatalogProduct]:
+        return await self._client.get_products_full()
+
+    async def get_servers(self, user_id: str) -> list[Station]:
+        return await self._cached(
+            CacheKey(self._merchant_id, SERVERS, params=(("user_id", user_id),)),
+            lambda: self._client.get_servers(user_id),
+        )
+
+    async def get_sessions(
+        self,
+        merchant_id: str | None = None,
+        server_id: str | None = None,
+        limit: int | None = None,
+    ) -> SessionPage:
+        return await self._client.get_sessions(
+            merchant_id=merchant_id,
+            server_id=server_id,
+            limit=limit,
+        )
+
+    def iter_sessions(
+        self,
+        merchant_id: str | None = None,
+        server_id: str | None = None,
+        limit: int | None = None,
+    ) -> AsyncGenerator[list[Session], None]:
+        return self._client.iter_sessions(
+            merchant_id=merchant_id,
+            server_id=server_id,
+            limit=limit,
+        )
+
+    async def get_server_products(self, user_id: str, server_id: str) -> list[StationProduct]:
+        return await self._cached(
+            CacheKey(
+                self._merchant_id,
+                SERVER_PRODUCTS,
+                station_id=server_id,
+                params=(("user_id", user_id),),
+            ),
+            lambda: self._client.get_server_products(user_id, server_id),
+        )
+
+    async def get_server_product_edit(
+        self,
+        server_id: str,
+        product_id: str,
+    ) -> ServerProductEdit:
+        return await self._client.get_server_product_edit(server_id, product_id)
+
+    async def set_server_product_enabled(
+        self,
+        server_id: str,
+        product_id: str,
+        enabled: bool,
+    ) -> None:
+        try:
+            await self._client.set_server_product_enabled(server_id, product_id, enabled)
+        finally:
+            self._cache.invalidate_station(self._merchant_id, server_id)
+
+    async def get_server_endpoints(
+        self,
+        server_id: str,
+        limit: int | None = None,
+    ) -> list[Endpoint]:
+        return await self._cached(
+            CacheKey(
+                self._merchant_id,
+                SERVER_ENDPOINTS,
+                station_id=server_id,
+                params=(("limit", limit),),
+            ),
+            lambda: self._client.get_server_endpoints(server_id, limit=limit),
+        )
+
+    async def set_server_published(self, server_id: str, published: bool) -> None:
+        try:
+            await self._client.set_server_published(server_id, published)
+        finally:
+            self._cache.invalidate_station(self._merchant_id, server_id)
+
+    async def issue_promocode(self, minutes: int) -> list[Promocode]:
+        return await self._client.issue_promocode(minutes)
+
+    async def get_unused_promocodes(self) -> list[Promocode]:
+        return await self._client.get_unused_promocodes()
+
+    async def get_prepaid_stats(self, merchant_id: str) -> PrepaidStats:
+        return await self._client.get_prepaid_stats(merchant_id)
+
+    async def get_prepaid_settlements(self, merchant_id: str) -> list[PrepaidSettlement]:
+        return await self._client.get_prepaid_settlements(merchant_id)
+
+    async def get_opened_prepaid_deals(self) -> list[OpenedPrepaidDeal]:
+        return await self._client.get_opened_prepaid_deals()
+
+    async def get_server_usage_statistics(self) -> ServerUsageStatistics:
+        return await self._cached(
+            CacheKey(self._merchant_id, SERVER_USAGE_STATISTICS),
+            self._client.get_server_usage_statistics,
+        )
+
+    async def get_server_source(self, server_id: str, merchant_id: str) -> ServerSource:
+        return await self._client.get_server_source(server_id, merchant_id)
+
+    async def set_server_allow_desktop(self, server_id: str, allow_desktop: bool) -> None:
+        try:
+            await self._client.set_server_allow_desktop(server_id, allow_desktop)
+        finally:
+            self._cache.invalidate_station(self._merchant_id, server_id)
+
+    async def set_server_disable_updates(self, server_id: str, disable_updates: bool) -> None:
+        try:
+            await self._client.set_server_disable_updates(server_id, disable_updates)
+        finally:
+            self._cache.invalidate_station(self._merchant_id, server_id)
+
+    async def update_server_source(
+        self,
+        server_id: str,
+        *,
+        name: str,
+        description: str,
+    ) -> None:
+        try:
+            await self._client.update_server_source(
+                server_id,
+                name=name,
+                description=description,
+            )
+        finally:
+            self._cache.invalidate_station(self._merchant_id, server_id)
+
+    async def _cached[T](self, key: CacheKey, load: Callable[[], Awaitable[T]]) -> T:
+        cached = self._cache.get(key)
+        if isinstance(cached, list):
+            # Hand out a copy so one command cannot reorder another command's list.
+            return cast(T, list(cached))
+        if cached is not None:
+            return cast(T, cached)
+        value = await load()
+        self._cache.put(key, value)
+        return value
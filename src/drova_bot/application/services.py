@@ -3,25 +3,54 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Callable, Sequence
-from dataclasses import dataclass
-from datetime import UTC, datetime
+import time
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
 from hashlib import sha256
+from pathlib import Path
 from uuid import uuid4
 
-from drova_bot.application.export_jobs import ExportJob
+from drova_bot.application.catalog import ProductCatalog
+from drova_bot.application.concurrency import DEFAULT_FAN_OUT_LIMIT, fan_out, gather_all
+from drova_bot.application.export_jobs import ExportDeliveryTarget, ExportJob
 from drova_bot.application.protocols import DrovaClientFactory, DrovaClientProtocol, TokenPersister
+from drova_bot.application.response_cache import CachingDrovaClient, DrovaResponseCache
+from drova_bot.application.session_history import SessionHistory
 from drova_bot.config import Settings
-from drova_bot.domain.formatters import normalize_session_limit
-from drova_bot.domain.models import ChatProfile, ServerSource, Session, Station
-from drova_bot.drova import DrovaClient
+from drova_bot.domain.formatters import normalize_csv_bundle_mode, normalize_session_limit
+from drova_bot.domain.models import (
+    Account,
+    ChatProfile,
+    ServerSource,
+    Session,
+    SessionPage,
+    Station,
+    StationProduct,
+)
+from drova_bot.drova import (
+    CircuitBreaker,
+    CircuitState,
+    DrovaClient,
+    RequestCoalescer,
+    RetryBudget,
+    RetryPolicy,
+    TokenRenewalCoordinator,
+    create_http_client,
+)
 from drova_bot.drova.errors import (
     DrovaPermissionDenied,
     DrovaUnauthorized,
     DrovaUnavailable,
     ExportTooLarge,
 )
-from drova_bot.exports import ExportKind, ExportResult, ProductExportService, SessionExportService
+from drova_bot.exports import (
+    ExportCacheScope,
+    ExportKind,
+    ExportResult,
+    ProductExportService,
+    SessionExportService,
+)
 from drova_bot.storage.uow import StorageUnitOfWork
 from drova_bot.telegram.callbacks import ParsedCallback
 from drova_bot.telegram.renderers import (
@@ -30,6 +59,7 @@ from drova_bot.telegram.renderers import (
     latest_sessions_by_station,
     render_account_billing,
     render_account_menu,
+    render_csv_bundle_mode,
     render_current,
     render_disabled,
     render_error,
@@ -59,6 +89,10 @@ from drova_bot.telegram.renderers import (
 )
 
 UnitOfWorkFactory = Callable[[], StorageUnitOfWork]
+
+DEFAULT_STATION_CACHE_FRESH_SECONDS = 300.0
+DEFAULT_CSV_ZIP_STATION_THRESHOLD = 5
+DEFAULT_TELEGRAM_FILE_RETENTION_SECONDS = 7 * 24 * 3600.0
 DESCRIPTION_DRAFT_TTL_SECONDS = 30 * 60
 
 
@@ -79,9 +113,54 @@ class DescriptionDraft:
     return_to_current: bool = False
 
 
+@dataclass(frozen=True, slots=True)
+class ChatTokenPersister:
+    """Stores a renewed proxy token for one chat.
+
+    Equality by chat id lets the renewal coordinator write each chat's token once even
+    when several clients of that chat hit 401 together.
+    """
+
+    uow_factory: UnitOfWorkFactory = field(compare=False)
+    telegram_chat_id: int
+
+    async def __call__(self, new_token: str) -> None:
+        async with self.uow_factory() as uow:
+            await uow.chat_profiles.update_token(self.telegram_chat_id, new_token)
+
+
 class DefaultDrovaClientFactory:
+    """Creates per-command Drova clients on top of one process-wide connection pool."""
+
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
+        self._http_client = create_http_client(
+            base_url=settings.drova_base_url,
+            proxy=settings.https_proxy or settings.http_proxy,
+            timeout=settings.drova_timeout_seconds,
+            http2=settings.drova_http2,
+            max_connections=settings.drova_max_connections,
+            max_keepalive_connections=settings.drova_max_keepalive_connections,
+            keepalive_expiry=settings.drova_keepalive_expiry_seconds,
+        )
+        self._renewal_coordinator = TokenRenewalCoordinator()
+        self._request_coalescer = RequestCoalescer()
+        self._retry_policy = RetryPolicy(
+            max_attempts=max(1, settings.drova_read_attempts),
+            base_delay_seconds=settings.drova_retry_base_delay_seconds,
+            max_delay_seconds=settings.drova_retry_max_delay_seconds,
+            max_elapsed_seconds=settings.drova_retry_max_elapsed_seconds,
+            budget=RetryBudget(ratio=settings.drova_retry_budget_ratio),
+        )
+        self._circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.drova_breaker_failure_threshold,
+            reset_timeout_seconds=settings.drova_breaker_reset_seconds,
+            state_file=(
+                Path(settings.drova_breaker_state_file)
+                if settings.drova_breaker_state_file
+                else None
+            ),
+        )
 
     def create(
         self,
@@ -93,9 +172,19 @@ class DefaultDrovaClientFactory:
             proxy_token=proxy_token,
             base_url=self._settings.drova_base_url,
             token_persister=token_persister,
-            proxy=self._settings.https_proxy or self._settings.http_proxy,
+            http_client=self._http_client,
+            renewal_coordinator=self._renewal_coordinator,
+            request_coalescer=self._request_coalescer,
+            retry_policy=self._retry_policy,
+            circuit_breaker=self._circuit_breaker,
         )
 
+    def circuit_states(self) -> dict[str, CircuitState]:
+        return self._circuit_breaker.states()
+
+    async def aclose(self) -> None:
+        await self._http_client.aclose()
+
 
 class BotService:
     """Owns command behavior while Telegram handlers remain transport adapters."""
@@ -110,7 +199,15 @@ class BotService:
         product_export_service: ProductExportService | None = None,
         export_row_limit: int = 50_000,
         export_timeout_seconds: float = 120,
+        export_csv_zip_station_threshold: int = DEFAULT_CSV_ZIP_STATION_THRESHOLD,
         session_geo_resolver: SessionGeoResolver | None = None,
+        fan_out_limit: int = DEFAULT_FAN_OUT_LIMIT,
+        response_cache: DrovaResponseCache | None = None,
+        product_catalog: ProductCatalog | None = None,
+        session_history: SessionHistory | None = None,
+        station_cache_fresh_seconds: float = DEFAULT_STATION_CACHE_FRESH_SECONDS,
+        telegram_file_retention_seconds: float = DEFAULT_TELEGRAM_FILE_RETENTION_SECONDS,
+        monotonic: Callable[[], float] = time.monotonic,
     ) -> None:
         self._uow_factory = uow_factory
         self._client_factory = client_factory
@@ -119,7 +216,18 @@ class BotService:
         self._product_export_service = product_export_service or ProductExportService()
         self._export_row_limit = export_row_limit
         self._export_timeout_seconds = export_timeout_seconds
+        self._export_csv_zip_station_threshold = export_csv_zip_station_threshold
         self._session_geo_resolver = session_geo_resolver
+        self._fan_out_limit = fan_out_limit
+        self._response_cache = response_cache
+        self._catalog = product_catalog or ProductCatalog(uow_factory)
+        self._session_history = session_history or SessionHistory(
+            uow_factory, full_sync_limit=export_row_limit
+        )
+        self._station_cache_fresh_seconds = station_cache_fresh_seconds
+        self._telegram_file_retention_seconds = telegram_file_retention_seconds
+        self._monotonic = monotonic
+        self._station_syncs: dict[int, tuple[float, int]] = {}
         self._description_requests: dict[int, PendingDescriptionRequest] = {}
         self._description_drafts: dict[str, DescriptionDraft] = {}
 
@@ -144,10 +252,16 @@ class BotService:
         if not proxy_token.strip():
             return render_error("drova_unauthorized")
         client = self._client_factory.create(proxy_token.strip())
-        try:
+
+        async def account_and_stations() -> tuple[Account, list[Station]]:
             account = await client.get_account()
-            products = await client.get_products_full()
-            stations = await client.get_servers(account.uuid)
+            return account, await client.get_servers(account.uuid)
+
+        try:
+            (account, stations), products = await gather_all(
+                account_and_stations(),
+                client.get_products_full(),
+            )
         except DrovaUnauthorized:
             return render_error("drova_unauthorized")
         except (DrovaPermissionDenied, DrovaUnavailable):
@@ -155,14 +269,17 @@ class BotService:
         finally:
             await client.aclose()
 
+        if self._response_cache is not None:
+            self._response_cache.invalidate_merchant(account.uuid)
         async with self._uow_factory() as uow:
             profile = await uow.chat_profiles.connect_token(
                 telegram_chat_id,
                 drova_user_id=account.uuid,
                 proxy_token=client.proxy_token,
             )
-            await uow.product_cache.upsert_catalog(products)
             await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+        self._mark_stations_synced(telegram_chat_id, stations)
+        await self._catalog.apply(products)
 
         return render_start_connected(
             station_count=len(stations),
@@ -173,6 +290,7 @@ class BotService:
     async def logout(self, telegram_chat_id: int) -> RenderedMessage:
         async with self._uow_factory() as uow:
             await uow.chat_profiles.logout(telegram_chat_id)
+        self._station_syncs.pop(telegram_chat_id, None)
         return RenderedMessage("Токен и настройки чата удалены.")
 
     async def station_picker(self, telegram_chat_id: int, *, page: int = 0) -> RenderedMessage:
@@ -182,8 +300,7 @@ class BotService:
         profile, client = loaded
         try:
             stations = await client.get_servers(profile.drova_user_id or "")
-            async with self._uow_factory() as uow:
-                await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+            await self._cache_stations(telegram_chat_id, stations)
             return render_station_picker(stations, page=page)
         except (DrovaUnauthorized, DrovaPermissionDenied):
             return render_error("drova_unauthorized")
@@ -205,8 +322,7 @@ class BotService:
         profile, client = loaded
         try:
             stations = await client.get_servers(profile.drova_user_id or "")
-            async with self._uow_factory() as uow:
-                await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+            await self._cache_stations(telegram_chat_id, stations)
             return render_station_manage_picker(
                 stations,
                 page=page,
@@ -324,6 +440,18 @@ class BotService:
             await uow.chat_profiles.set_session_limit(telegram_chat_id, limit)
         return RenderedMessage(f"Лимит сессий: {limit}")
 
+    async def set_csv_bundle_mode(
+        self,
+        telegram_chat_id: int,
+        raw_mode: str | None,
+    ) -> RenderedMessage:
+        mode = normalize_csv_bundle_mode(raw_mode)
+        if raw_mode is None or mode != raw_mode.strip().lower():
+            return render_error("invalid_csv_bundle_mode")
+        async with self._uow_factory() as uow:
+            await uow.chat_profiles.set_csv_bundle_mode(telegram_chat_id, mode)
+        return render_csv_bundle_mode(mode, self._export_csv_zip_station_threshold)
+
     async def issue_promocode(
         self,
         telegram_chat_id: int,
@@ -372,9 +500,11 @@ class BotService:
         profile, client = loaded
         try:
             merchant_id = profile.drova_user_id or ""
-            stats = await client.get_prepaid_stats(merchant_id)
-            settlements = await client.get_prepaid_settlements(merchant_id)
-            opened_deals = await client.get_opened_prepaid_deals()
+            stats, settlements, opened_deals = await gather_all(
+                client.get_prepaid_stats(merchant_id),
+                client.get_prepaid_settlements(merchant_id),
+                client.get_opened_prepaid_deals(),
+            )
             return render_account_billing(
                 stats,
                 settlements=settlements,
@@ -400,15 +530,20 @@ class BotService:
             return render_error("not_connected")
         profile, client = loaded
         try:
-            stations = await client.get_servers(profile.drova_user_id or "")
-            sessions_page = await client.get_sessions(
-                merchant_id=None if profile.selected_station_id else profile.drova_user_id,
-                server_id=profile.selected_station_id,
-                limit=profile.session_limit,
+            stations, sessions_page = await gather_all(
+                client.get_servers(profile.drova_user_id or ""),
+                client.get_sessions(
+                    merchant_id=None if profile.selected_station_id else profile.drova_user_id,
+                    server_id=profile.selected_station_id,
+                    limit=profile.session_limit,
+                ),
             )
-            product_catalog = await self._product_catalog(telegram_chat_id, client)
-            async with self._uow_factory() as uow:
-                await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+            product_catalog = await self._product_catalog(
+                telegram_chat_id,
+                client,
+                _product_ids(sessions_page.sessions),
+            )
+            await self._cache_stations(telegram_chat_id, stations)
             return render_sessions(
                 profile,
                 sessions_page.sessions,
@@ -439,8 +574,7 @@ class BotService:
         profile, client = loaded
         try:
             stations = await client.get_servers(profile.drova_user_id or "")
-            async with self._uow_factory() as uow:
-                await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+            await self._cache_stations(telegram_chat_id, stations)
             return render_sessions_station_picker(stations, short_mode=short_mode, page=page)
         except (DrovaUnauthorized, DrovaPermissionDenied):
             return render_error("drova_unauthorized")
@@ -487,18 +621,23 @@ class BotService:
         profile, client = loaded
         try:
             stations = await client.get_servers(profile.drova_user_id or "")
-            product_catalog = await self._product_catalog(telegram_chat_id, client)
-            latest: dict[str, Session | None] = {}
-            failed_station_ids: set[str] = set()
-            for station in stations:
-                try:
-                    page = await client.get_sessions(server_id=station.uuid, limit=1)
-                    latest[station.uuid] = page.sessions[0] if page.sessions else None
-                except DrovaUnavailable:
-                    failed_station_ids.add(station.uuid)
-                    latest[station.uuid] = None
-            async with self._uow_factory() as uow:
-                await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+            pages = await fan_out(
+                [station.uuid for station in stations],
+                lambda station_id: client.get_sessions(server_id=station_id, limit=1),
+                limit=self._fan_out_limit,
+                capture=(DrovaUnavailable,),
+            )
+            latest = {
+                station.uuid: _first_session(pages.values.get(station.uuid))
+                for station in stations
+            }
+            product_catalog = await self._product_catalog(
+                telegram_chat_id,
+                client,
+                _product_ids(latest.values()),
+            )
+            failed_station_ids = pages.failed_keys
+            await self._cache_stations(telegram_chat_id, stations)
             return render_current(
                 profile,
                 stations,
@@ -522,11 +661,12 @@ class BotService:
             return render_error("not_connected")
         profile, client = loaded
         try:
-            stations = await client.get_servers(profile.drova_user_id or "")
-            statistics = await client.get_server_usage_statistics()
-            catalog = await self._product_catalog(telegram_chat_id, client)
-            async with self._uow_factory() as uow:
-                await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+            stations, statistics, catalog = await gather_all(
+                client.get_servers(profile.drova_user_id or ""),
+                client.get_server_usage_statistics(),
+                self._product_catalog(telegram_chat_id, client),
+            )
+            await self._cache_stations(telegram_chat_id, stations)
             return render_usage_statistics(statistics, stations, catalog)
         except (DrovaUnauthorized, DrovaPermissionDenied):
             return render_error("drova_unauthorized")
@@ -542,15 +682,8 @@ class BotService:
         profile, client = loaded
         try:
             stations = await client.get_servers(profile.drova_user_id or "")
-            products_by_station = {
-                station.uuid: await client.get_server_products(
-                    profile.drova_user_id or "",
-                    station.uuid,
-                )
-                for station in stations
-            }
-            async with self._uow_factory() as uow:
-                await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+            products_by_station = await self._products_by_station(profile, client, stations)
+            await self._cache_stations(telegram_chat_id, stations)
             return render_disabled(stations, products_by_station)
         except (DrovaUnauthorized, DrovaPermissionDenied):
             return render_error("drova_unauthorized")
@@ -566,12 +699,13 @@ class BotService:
         profile, client = loaded
         try:
             stations = await client.get_servers(profile.drova_user_id or "")
-            endpoints_by_station = {
-                station.uuid: await client.get_server_endpoints(station.uuid, limit=5)
-                for station in stations
-            }
-            async with self._uow_factory() as uow:
-                await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+            endpoints = await fan_out(
+                [station.uuid for station in stations],
+                lambda station_id: client.get_server_endpoints(station_id, limit=5),
+                limit=self._fan_out_limit,
+            )
+            endpoints_by_station = endpoints.values
+            await self._cache_stations(telegram_chat_id, stations)
             return render_stations(stations, endpoints_by_station)
         except (DrovaUnauthorized, DrovaPermissionDenied):
             return render_error("drova_unauthorized")
@@ -751,8 +885,7 @@ class BotService:
                     updated.append(station.name)
                 except DrovaUnavailable:
                     failed.append(station.name)
-            async with self._uow_factory() as uow:
-                await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+            await self._cache_stations(telegram_chat_id, stations)
             return render_game_enabled_result(
                 product_title=None,
                 product_id=product_id,
@@ -936,6 +1069,7 @@ class BotService:
             async with self._uow_factory() as uow:
                 await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
                 await uow.chat_profiles.set_selected_station(telegram_chat_id, station_id)
+            self._mark_stations_synced(telegram_chat_id, stations)
             return render_station_publish_manage_confirmation(
                 station,
                 return_to_current=return_to_current,
@@ -977,6 +1111,7 @@ class BotService:
             async with self._uow_factory() as uow:
                 await uow.station_cache.replace_for_chat(telegram_chat_id, refreshed)
                 await uow.chat_profiles.set_selected_station(telegram_chat_id, station_id)
+            self._mark_stations_synced(telegram_chat_id, refreshed)
             toast = "Станция опубликована." if station.published else "Станция скрыта."
             return await self._render_station_manage_panel(
                 telegram_chat_id,
@@ -1248,21 +1383,64 @@ class BotService:
         finally:
             await client.aclose()
 
-    async def create_export_job(self, telegram_chat_id: int, kind: ExportKind) -> ExportJob:
-        job_id = uuid4().hex
+    async def create_export_job(
+        self,
+        telegram_chat_id: int,
+        kind: ExportKind,
+        *,
+        progress_message_id: int | None = None,
+    ) -> ExportJob:
+        """Queue an export, or attach the request to an in-flight job with the same output.
+
+        An attached request gets no job of its own: the returned job is the one already
+        queued or running, and the chat is delivered its files as an extra target.
+        """
         async with self._uow_factory() as uow:
+            profile = await uow.chat_profiles.get(telegram_chat_id)
+            dedup_key = _export_dedup_key(telegram_chat_id, profile, kind)
+            existing = await uow.export_jobs.find_in_flight(dedup_key)
+            if existing is not None and await uow.export_jobs.attach_target(
+                existing.id,
+                telegram_chat_id=telegram_chat_id,
+                progress_message_id=progress_message_id,
+            ):
+                return ExportJob.from_row(existing)
             row = await uow.export_jobs.create(
-                job_id=job_id,
+                job_id=uuid4().hex,
                 telegram_chat_id=telegram_chat_id,
                 kind=kind.value,
+                progress_message_id=progress_message_id,
+                dedup_key=dedup_key,
             )
-            return ExportJob(
-                id=row.id,
-                telegram_chat_id=row.telegram_chat_id,
-                kind=kind,
-                status=row.status,
-                error_code=row.error_code,
-            )
+            return ExportJob.from_row(row)
+
+    async def export_job_targets(self, job_id: str) -> list[ExportDeliveryTarget]:
+        """Requests attached to `job_id` by `create_export_job`, oldest first.
+
+        Read once the job is done or failed, the list is final: nothing attaches to a
+        finished job.
+        """
+        async with self._uow_factory() as uow:
+            rows = await uow.export_jobs.targets(job_id)
+        return [ExportDeliveryTarget.from_row(row) for row in rows]
+
+    async def telegram_file_ids(self, content_hashes: Iterable[str]) -> dict[str, str]:
+        """Telegram `file_id`s of documents already uploaded, by `document_hash`."""
+        async with self._uow_factory() as uow:
+            return await uow.telegram_files.file_ids(content_hashes)
+
+    async def remember_telegram_file(
+        self,
+        content_hash: str,
+        file_id: str,
+        *,
+        size_bytes: int,
+    ) -> None:
+        async with self._uow_factory() as uow:
+            await uow.telegram_files.remember(content_hash, file_id, size_bytes=size_bytes)
+            # Rows are stamped with the wall clock, so they are aged by it too.
+            retention = timedelta(seconds=self._telegram_file_retention_seconds)
+            await uow.telegram_files.prune(older_than=datetime.now(tz=UTC) - retention)
 
     async def run_export_job(
         self,
@@ -1304,14 +1482,18 @@ class BotService:
     ) -> RenderedMessage:
         latest_session: Session | None = None
         latest_session_failed = False
-        product_catalog: dict[str, str] = {}
+        product_catalog: Mapping[str, str] = {}
         try:
             page = await client.get_sessions(server_id=station.uuid, limit=1)
             latest_session = page.sessions[0] if page.sessions else None
         except DrovaUnavailable:
             latest_session_failed = True
         if latest_session is not None:
-            product_catalog = await self._product_catalog(telegram_chat_id, client)
+            product_catalog = await self._product_catalog(
+                telegram_chat_id,
+                client,
+                [latest_session.product_id],
+            )
         return render_station_manage_panel(
             station,
             source,
@@ -1370,10 +1552,13 @@ class BotService:
                 return render_error("stale_publish")
             await client.set_server_published(station_id, not expected_published)
             refreshed = await client.get_servers(profile.drova_user_id or "")
-            async with self._uow_factory() as uow:
-                await uow.station_cache.replace_for_chat(telegram_chat_id, refreshed)
-            product_catalog = await self._product_catalog(telegram_chat_id, client)
+            await self._cache_stations(telegram_chat_id, refreshed)
             latest = await self._latest_for_stations(client, refreshed)
+            product_catalog = await self._product_catalog(
+                telegram_chat_id,
+                client,
+                _product_ids(latest.values()),
+            )
             return render_current(
                 profile,
                 refreshed,
@@ -1584,8 +1769,7 @@ class BotService:
         station = _find_station(stations, profile.selected_station_id)
         if station is None:
             return render_error("station_not_found")
-        async with self._uow_factory() as uow:
-            await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+        await self._cache_stations(telegram_chat_id, stations)
         return station
 
     async def _station_and_source(
@@ -1603,6 +1787,7 @@ class BotService:
         async with self._uow_factory() as uow:
             await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
             await uow.chat_profiles.set_selected_station(telegram_chat_id, station.uuid)
+        self._mark_stations_synced(telegram_chat_id, stations)
         return station, source
 
     def _cleanup_description_state(self) -> None:
@@ -1624,6 +1809,15 @@ class BotService:
     def _is_description_state_expired(self, created_at: datetime) -> bool:
         return (self._clock() - created_at).total_seconds() > DESCRIPTION_DRAFT_TTL_SECONDS
 
+    async def client_for_merchant(self, merchant_id: str) -> DrovaClientProtocol | None:
+        """Client of some connected chat of `merchant_id`, for background session syncs."""
+        async with self._uow_factory() as uow:
+            chat_id = await uow.chat_profiles.chat_id_for_merchant(merchant_id)
+        if chat_id is None:
+            return None
+        loaded = await self._load_client(chat_id)
+        return loaded[1] if loaded is not None else None
+
     async def _load_client(
         self,
         telegram_chat_id: int,
@@ -1633,45 +1827,79 @@ class BotService:
             token = await uow.chat_profiles.decrypt_token(telegram_chat_id)
         if profile is None or not profile.drova_user_id or token is None:
             return None
+        persister = ChatTokenPersister(self._uow_factory, telegram_chat_id)
+        client = self._client_factory.create(token, token_persister=persister)
+        if self._response_cache is not None:
+            client = CachingDrovaClient(
+                client,
+                self._response_cache,
+                merchant_id=profile.drova_user_id,
+            )
+        return profile, client
+
+    async def _cache_stations(self, telegram_chat_id: int, stations: list[Station]) -> None:
+        """Sync the chat's station cache unless the same list was synced recently."""
+        synced = self._station_syncs.get(telegram_chat_id)
+        if (
+            synced is not None
+            and synced[1] == _stations_fingerprint(stations)
+            and self._monotonic() - synced[0] < self._station_cache_fresh_seconds
+        ):
+            return
+        async with self._uow_factory() as uow:
+            await uow.station_cache.replace_for_chat(telegram_chat_id, stations)
+        self._mark_stations_synced(telegram_chat_id, stations)
 
-        async def persist_token(new_token: str) -> None:
-            async with self._uow_factory() as token_uow:
-                await token_uow.chat_profiles.update_token(telegram_chat_id, new_token)
-
-        return profile, self._client_factory.create(token, token_persister=persist_token)
+    def _mark_stations_synced(self, telegram_chat_id: int, stations: list[Station]) -> None:
+        self._station_syncs[telegram_chat_id] = (
+            self._monotonic(),
+            _stations_fingerprint(stations),
+        )
 
     async def _product_catalog(
         self,
         telegram_chat_id: int,
         client: DrovaClientProtocol,
-    ) -> dict[str, str]:
-        async with self._uow_factory() as uow:
-            catalog = await uow.product_cache.title_map()
-        if catalog:
-            return catalog
-        products = await client.get_products_full()
-        async with self._uow_factory() as uow:
-            await uow.product_cache.upsert_catalog(products)
-        return {product.product_id: product.title for product in products}
+        product_ids: Iterable[str] = (),
+    ) -> Mapping[str, str]:
+        return await self._catalog.lookup(client, product_ids)
 
     async def _latest_for_stations(
         self,
         client: DrovaClientProtocol,
         stations: list[Station],
     ) -> dict[str, Session | None]:
-        sessions: list[Session] = []
-        latest: dict[str, Session | None] = {}
-        for station in stations:
-            page = await client.get_sessions(server_id=station.uuid, limit=1)
-            if page.sessions:
-                sessions.extend(page.sessions)
-            latest[station.uuid] = page.sessions[0] if page.sessions else None
+        pages = await fan_out(
+            [station.uuid for station in stations],
+            lambda station_id: client.get_sessions(server_id=station_id, limit=1),
+            limit=self._fan_out_limit,
+        )
+        sessions = [session for page in pages.values.values() for session in page.sessions]
+        latest = {
+            station_id: _first_session(page) for station_id, page in pages.values.items()
+        }
         return latest_sessions_by_station(sessions) | {
             station.uuid: latest.get(station.uuid)
             for station in stations
             if station.uuid not in latest
         }
 
+    async def _products_by_station(
+        self,
+        profile: ChatProfile,
+        client: DrovaClientProtocol,
+        stations: list[Station],
+    ) -> dict[str, list[StationProduct]]:
+        products = await fan_out(
+            [station.uuid for station in stations],
+            lambda station_id: client.get_server_products(
+                profile.drova_user_id or "",
+                station_id,
+            ),
+            limit=self._fan_out_limit,
+        )
+        return products.values
+
     async def _export_with_client(
         self,
         profile: ChatProfile,
@@ -1696,16 +1924,36 @@ class BotService:
         selected_stations = _selected_stations(stations, profile)
         if profile.selected_station_id is not None and not selected_stations:
             return ExportResult(files=[], message=render_error("station_not_found").text)
-        page = await client.get_sessions(
-            merchant_id=None if profile.selected_station_id else profile.drova_user_id,
+        sessions = await self._stored_sessions(
+            client,
+            merchant_id=profile.drova_user_id or "",
             server_id=profile.selected_station_id,
-            limit=None,
         )
-        self._ensure_row_limit(len(page.sessions))
-        product_catalog = await self._product_catalog(profile.telegram_chat_id, client)
-        if kind == ExportKind.SESSIONS_CSV:
+        product_catalog = await self._product_catalog(
+            profile.telegram_chat_id,
+            client,
+            _product_ids(sessions),
+        )
+        if kind == ExportKind.SESSIONS_CSV and self._bundle_station_csvs(
+            profile,
+            len(selected_stations),
+        ):
+            files = [
+                await self._session_export_service.build_sessions_csv_zip(
+                    sessions=sessions,
+                    stations=selected_stations,
+                    product_catalog=product_catalog,
+                    now=self._clock(),
+                    timezone=profile.timezone,
+                    cache_scope=ExportCacheScope(
+                        profile.drova_user_id or "",
+                        profile.selected_station_id,
+                    ),
+                )
+            ]
+        elif kind == ExportKind.SESSIONS_CSV:
             files = await self._session_export_service.build_sessions_csv_by_station(
-                sessions=page.sessions,
+                sessions=sessions,
                 stations=selected_stations,
                 product_catalog=product_catalog,
                 now=self._clock(),
@@ -1714,33 +1962,37 @@ class BotService:
         else:
             files = [
                 await self._session_export_service.build_sessions_xlsx(
-                    sessions=page.sessions,
+                    sessions=sessions,
                     stations=selected_stations,
                     product_catalog=product_catalog,
                     now=self._clock(),
                     timezone=profile.timezone,
+                    cache_scope=ExportCacheScope(
+                        profile.drova_user_id or "",
+                        profile.selected_station_id,
+                    ),
                 )
             ]
         return ExportResult(files=files, message=_export_ready_message(files))
 
+    def _bundle_station_csvs(self, profile: ChatProfile, station_count: int) -> bool:
+        if profile.csv_bundle_mode == "auto":
+            return station_count > self._export_csv_zip_station_threshold
+        return profile.csv_bundle_mode == "zip"
+
     async def _export_products(
         self,
         profile: ChatProfile,
         client: DrovaClientProtocol,
     ) -> ExportResult:
         stations = await client.get_servers(profile.drova_user_id or "")
-        products_by_station = {
-            station.uuid: await client.get_server_products(
-                profile.drova_user_id or "",
-                station.uuid,
-            )
-            for station in stations
-        }
+        products_by_station = await self._products_by_station(profile, client, stations)
         self._ensure_row_limit(sum(len(products) for products in products_by_station.values()))
         file = await self._product_export_service.build_products_xlsx(
             stations=stations,
             products_by_station=products_by_station,
             now=self._clock(),
+            cache_scope=ExportCacheScope(profile.drova_user_id or ""),
         )
         return ExportResult(files=[file], message="Файл готов.")
 
@@ -1750,17 +2002,41 @@ class BotService:
         client: DrovaClientProtocol,
     ) -> ExportResult:
         stations = await client.get_servers(profile.drova_user_id or "")
-        page = await client.get_sessions(merchant_id=profile.drova_user_id, limit=None)
-        self._ensure_row_limit(len(page.sessions))
-        product_catalog = await self._product_catalog(profile.telegram_chat_id, client)
+        sessions = await self._stored_sessions(client, merchant_id=profile.drova_user_id or "")
+        product_catalog = await self._product_catalog(
+            profile.telegram_chat_id,
+            client,
+            _product_ids(sessions),
+        )
         file = await self._product_export_service.build_product_time_xlsx(
             stations=stations,
-            sessions=page.sessions,
+            sessions=sessions,
             product_catalog=product_catalog,
             now=self._clock(),
+            cache_scope=ExportCacheScope(profile.drova_user_id or ""),
         )
         return ExportResult(files=[file], message="Файл готов.")
 
+    async def _stored_sessions(
+        self,
+        client: DrovaClientProtocol,
+        *,
+        merchant_id: str,
+        server_id: str | None = None,
+    ) -> list[Session]:
+        """Sync the merchant's session history, then read it from local storage."""
+        synced = await self._session_history.sync(client, merchant_id)
+        if synced.truncated_before_ms is not None:
+            # The first sync stopped at the row limit, so the merchant's history is
+            # already too large; a single station may still fit once its older
+            # sessions are fetched.
+            if server_id is None:
+                raise ExportTooLarge("export row limit exceeded")
+            await self._session_history.backfill_station(client, merchant_id, server_id)
+        async with self._uow_factory() as uow:
+            self._ensure_row_limit(await uow.sessions.count(merchant_id, server_id))
+            return await uow.sessions.list_recent(merchant_id, server_id)
+
     def _ensure_row_limit(self, row_count: int) -> None:
         if row_count > self._export_row_limit:
             raise ExportTooLarge("export row limit exceeded")
@@ -1770,6 +2046,20 @@ def _find_station(stations: list[Station], station_id: str) -> Station | None:
     return next((station for station in stations if station.uuid == station_id), None)
 
 
+def _first_session(page: SessionPage | None) -> Session | None:
+    if page is None or not page.sessions:
+        return None
+    return page.sessions[0]
+
+
+def _stations_fingerprint(stations: list[Station]) -> int:
+    return hash(tuple((station.uuid, station.name) for station in stations))
+
+
+def _product_ids(sessions: Iterable[Session | None]) -> set[str]:
+    return {session.product_id for session in sessions if session is not None}
+
+
 def _selected_stations(stations: list[Station], profile: ChatProfile) -> list[Station]:
     if profile.selected_station_id is None:
         return stations
@@ -1866,6 +2156,22 @@ async def _apply_server_control(
         await client.set_server_disable_updates(station_id, not target_on)
 
 
+def _export_dedup_key(telegram_chat_id: int, profile: ChatProfile | None, kind: ExportKind) -> str:
+    """Requests with equal keys produce the same files and can share one job.
+
+    Connected chats of a merchant share jobs; session exports also depend on the selected
+    station and the timezone. Other chats only deduplicate their own requests.
+    """
+    if profile is None or not profile.drova_user_id:
+        return f"chat:{telegram_chat_id}|{kind.value}"
+    parts = [f"merchant:{profile.drova_user_id}", kind.value]
+    if kind in {ExportKind.SESSIONS, ExportKind.SESSIONS_CSV}:
+        parts += [profile.selected_station_id or "*", profile.timezone]
+    if kind == ExportKind.SESSIONS_CSV:
+        parts.append(profile.csv_bundle_mode)
+    return "|".join(parts)
+
+
 def _export_ready_message(files: Sequence[object]) -> str:
     if len(files) == 1:
         return "Файл готов."
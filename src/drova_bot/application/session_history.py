@@ -0,0 +1,225 @@
+"""Local Drova session history kept current by incremental sync."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import aclosing
+from dataclasses import dataclass
+
+import structlog
+
+from drova_bot.application.protocols import DrovaClientProtocol
+from drova_bot.drova.coalescing import RequestCoalescer
+from drova_bot.drova.errors import DrovaError
+from drova_bot.storage.uow import StorageUnitOfWork
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_SYNC_INTERVAL_SECONDS = 900.0
+DEFAULT_SYNC_WINDOW = 100
+DEFAULT_OPEN_RECHECK_SECONDS = 2 * 24 * 3600.0
+
+
+@dataclass(frozen=True, slots=True)
+class SessionSyncResult:
+    fetched: int
+    stored: int
+    full: bool
+    # Set when the first sync stopped at its row cap: older sessions are not stored.
+    truncated_before_ms: int | None = None
+
+
+class SessionHistory:
+    """Per-merchant copy of `/session-manager/sessions` in the `sessions` table.
+
+    Drova's endpoint has no cursor and returns the newest sessions first. An incremental
+    sync therefore asks for the newest `window` sessions and doubles the window until it
+    reaches back past both the newest stored session and the oldest session still open
+    (unfinished and younger than `open_recheck_seconds`), but never past
+    `full_sync_limit`. The first sync of a merchant
+    streams the history newest first, up to `full_sync_limit` sessions, and incremental
+    syncs start only once such a pass has completed. A pass cut off by the cap records
+    where it stopped, and `backfill_station` fetches one station's older sessions the
+    first time they are needed. Syncs of the same merchant are single-flight.
+    """
+
+    def __init__(
+        self,
+        uow_factory: Callable[[], StorageUnitOfWork],
+        *,
+        window: int = DEFAULT_SYNC_WINDOW,
+        open_recheck_seconds: float = DEFAULT_OPEN_RECHECK_SECONDS,
+        full_sync_limit: int | None = None,
+        wall_clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._uow_factory = uow_factory
+        self._window = max(1, window)
+        self._full_sync_limit = full_sync_limit
+        self._open_recheck_seconds = open_recheck_seconds
+        self._wall_clock = wall_clock
+        self._syncs = RequestCoalescer()
+
+    async def sync(self, client: DrovaClientProtocol, merchant_id: str) -> SessionSyncResult:
+        """Bring the merchant's stored sessions up to date with Drova."""
+        return await self._syncs.run(merchant_id, lambda: self._sync(client, merchant_id))
+
+    async def backfill_station(
+        self, client: DrovaClientProtocol, merchant_id: str, server_id: str
+    ) -> int:
+        """Store one station's history past a capped first sync; returns sessions fetched.
+
+        The stream stops one session past `full_sync_limit`, which is enough for the
+        caller to tell that the station alone exceeds the cap. A station is backfilled
+        once; incremental syncs keep it current afterwards, and later calls fetch nothing.
+        """
+        return await self._syncs.run(
+            f"{merchant_id}/{server_id}",
+            lambda: self._backfill_station(client, merchant_id, server_id),
+        )
+
+    async def run_sync_loop(
+        self,
+        client_source: Callable[[str], Awaitable[DrovaClientProtocol | None]],
+        *,
+        interval_seconds: float = DEFAULT_SYNC_INTERVAL_SECONDS,
+    ) -> None:
+        """Sync every merchant with stored history each `interval_seconds` until cancelled.
+
+        `client_source` returns an authorized client for a merchant, or None when no
+        connected chat can act for it any more.
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                async with self._uow_factory() as uow:
+                    merchant_ids = await uow.sessions.merchant_ids()
+            except Exception:
+                logger.exception("session_history_sync_crashed")
+                continue
+            synced = failed = 0
+            for merchant_id in merchant_ids:
+                outcome = await self._sync_merchant(client_source, merchant_id)
+                if outcome is True:
+                    synced += 1
+                elif outcome is False:
+                    failed += 1
+            logger.info("session_history_synced", merchants=synced, failed=failed)
+
+    async def _sync_merchant(
+        self,
+        client_source: Callable[[str], Awaitable[DrovaClientProtocol | None]],
+        merchant_id: str,
+    ) -> bool | None:
+        """Sync one merchant for the loop; None when there was no client to sync with.
+
+        Any failure is logged and reported as False, so one merchant (a token that no
+        longer decrypts, a database error) cannot end the loop for the others.
+        """
+        try:
+            client = await client_source(merchant_id)
+        except Exception:
+            logger.exception("session_history_sync_crashed")
+            return False
+        if client is None:
+            return None
+        try:
+            await self.sync(client, merchant_id)
+        except DrovaError as exc:
+            logger.warning("session_history_sync_failed", error=type(exc).__name__)
+            return False
+        except Exception:
+            logger.exception("session_history_sync_crashed")
+            return False
+        finally:
+            await client.aclose()
+        return True
+
+    async def _sync(self, client: DrovaClientProtocol, merchant_id: str) -> SessionSyncResult:
+        open_since_ms = int((self._wall_clock() - self._open_recheck_seconds) * 1000)
+        async with self._uow_factory() as uow:
+            marks = await uow.sessions.sync_marks(merchant_id, open_since_ms=open_since_ms)
+        if not marks.full_synced:
+            return await self._full_sync(client, merchant_id)
+
+        marks_ms = [marks.newest_created_on_ms, marks.oldest_open_created_on_ms]
+        reach_back_to = min((mark for mark in marks_ms if mark is not None), default=0)
+        max_window = self._full_sync_limit
+        limit = self._window if max_window is None else min(self._window, max_window)
+        while True:
+            page = await client.get_sessions(merchant_id=merchant_id, limit=limit)
+            sessions = page.sessions
+            if len(sessions) < limit:
+                break
+            if min(session.created_on_ms for session in sessions) < reach_back_to:
+                break
+            if max_window is not None and limit >= max_window:
+                # An old unfinished session must not turn a periodic sync into a fetch
+                # of the whole history; past the cap it keeps its stored state.
+                logger.warning("session_history_sync_window_capped", window=limit)
+                break
+            limit = limit * 2 if max_window is None else min(limit * 2, max_window)
+        async with self._uow_factory() as uow:
+            stored = await uow.sessions.upsert_many(merchant_id, sessions)
+            await uow.sessions.mark_synced(merchant_id, full=False)
+        return SessionSyncResult(
+            fetched=len(sessions),
+            stored=stored,
+            full=False,
+            truncated_before_ms=marks.truncated_before_ms,
+        )
+
+    async def _full_sync(self, client: DrovaClientProtocol, merchant_id: str) -> SessionSyncResult:
+        # One session past the cap tells a history that fits from one that was cut off.
+        limit = None if self._full_sync_limit is None else self._full_sync_limit + 1
+        fetched = stored = 0
+        oldest_ms: int | None = None
+        async with aclosing(client.iter_sessions(merchant_id=merchant_id, limit=limit)) as batches:
+            async for batch in batches:
+                fetched += len(batch)
+                if batch:
+                    batch_oldest = min(session.created_on_ms for session in batch)
+                    oldest_ms = batch_oldest if oldest_ms is None else min(oldest_ms, batch_oldest)
+                async with self._uow_factory() as uow:
+                    stored += await uow.sessions.upsert_many(merchant_id, batch)
+                if limit is not None and fetched >= limit:
+                    break
+        truncated_before_ms = oldest_ms if limit is not None and fetched >= limit else None
+        # Only a completed (or capped) pass makes the history eligible for incremental syncs.
+        async with self._uow_factory() as uow:
+            await uow.sessions.mark_synced(
+                merchant_id, full=True, truncated_before_ms=truncated_before_ms
+            )
+        logger.info(
+            "session_history_initial_sync",
+            sessions=stored,
+            truncated=truncated_before_ms is not None,
+        )
+        return SessionSyncResult(
+            fetched=fetched,
+            stored=stored,
+            full=True,
+            truncated_before_ms=truncated_before_ms,
+        )
+
+    async def _backfill_station(
+        self, client: DrovaClientProtocol, merchant_id: str, server_id: str
+    ) -> int:
+        async with self._uow_factory() as uow:
+            if await uow.sessions.station_backfilled(merchant_id, server_id):
+                return 0
+        limit = None if self._full_sync_limit is None else self._full_sync_limit + 1
+        fetched = 0
+        async with aclosing(
+            client.iter_sessions(merchant_id=merchant_id, server_id=server_id, limit=limit)
+        ) as batches:
+            async for batch in batches:
+                fetched += len(batch)
+                async with self._uow_factory() as uow:
+                    await uow.sessions.upsert_many(merchant_id, batch)
+                if limit is not None and fetched >= limit:
+                    break
+        async with self._uow_factory() as uow:
+            await uow.sessions.mark_station_backfilled(merchant_id, server_id)
+        return fetched
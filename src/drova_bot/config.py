@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,10 +13,22 @@ class Settings(BaseSettings):
 
     telegram_bot_token: str | None = Field(default=None, alias="TELEGRAM_BOT_TOKEN")
     bot_secret_key: str | None = Field(default=None, alias="BOT_SECRET_KEY")
+    bot_retired_secret_keys: str = Field(default="", alias="BOT_RETIRED_SECRET_KEYS")
     database_url: str = Field(
         default="sqlite+aiosqlite:///data/drova_bot.sqlite3",
         alias="DATABASE_URL",
     )
+    sqlite_journal_mode: str = Field(default="wal", alias="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field(default="normal", alias="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(default=5_000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_mmap_size_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        alias="SQLITE_MMAP_SIZE_BYTES",
+    )
+    sqlite_cache_size_kib: int = Field(default=16 * 1024, alias="SQLITE_CACHE_SIZE_KIB")
+    database_pool_size: int = Field(default=5, alias="DATABASE_POOL_SIZE")
+    database_max_overflow: int = Field(default=10, alias="DATABASE_MAX_OVERFLOW")
+    database_pool_pre_ping: bool = Field(default=True, alias="DATABASE_POOL_PRE_PING")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
     timezone: str = Field(default="Asia/Yekaterinburg", alias="TZ")
     http_proxy: str | None = Field(default=None, alias="HTTP_PROXY")
@@ -23,13 +37,95 @@ class Settings(BaseSettings):
         default="https://services.drova.io",
         alias="DROVA_BASE_URL",
     )
+    drova_timeout_seconds: float = Field(default=10.0, alias="DROVA_TIMEOUT_SECONDS")
+    drova_read_attempts: int = Field(default=2, alias="DROVA_READ_ATTEMPTS")
+    drova_retry_base_delay_seconds: float = Field(
+        default=0.2,
+        alias="DROVA_RETRY_BASE_DELAY_SECONDS",
+    )
+    drova_retry_max_delay_seconds: float = Field(
+        default=5.0,
+        alias="DROVA_RETRY_MAX_DELAY_SECONDS",
+    )
+    drova_retry_max_elapsed_seconds: float = Field(
+        default=15.0,
+        alias="DROVA_RETRY_MAX_ELAPSED_SECONDS",
+    )
+    drova_retry_budget_ratio: float = Field(default=0.2, alias="DROVA_RETRY_BUDGET_RATIO")
+    drova_http2: bool = Field(default=True, alias="DROVA_HTTP2")
+    drova_max_connections: int = Field(default=50, alias="DROVA_MAX_CONNECTIONS")
+    drova_max_keepalive_connections: int = Field(
+        default=20,
+        alias="DROVA_MAX_KEEPALIVE_CONNECTIONS",
+    )
+    drova_keepalive_expiry_seconds: float = Field(
+        default=30.0,
+        alias="DROVA_KEEPALIVE_EXPIRY_SECONDS",
+    )
+    drova_breaker_failure_threshold: int = Field(
+        default=5,
+        alias="DROVA_BREAKER_FAILURE_THRESHOLD",
+    )
+    drova_breaker_reset_seconds: float = Field(default=30.0, alias="DROVA_BREAKER_RESET_SECONDS")
+    drova_breaker_state_file: str = Field(default="", alias="DROVA_BREAKER_STATE_FILE")
+    drova_fan_out_limit: int = Field(default=8, alias="DROVA_FAN_OUT_LIMIT")
+    drova_cache_enabled: bool = Field(default=False, alias="DROVA_CACHE_ENABLED")
+    drova_cache_max_bytes: int = Field(default=8 * 1024 * 1024, alias="DROVA_CACHE_MAX_BYTES")
+    profile_cache_ttl_seconds: float = Field(default=300.0, alias="PROFILE_CACHE_TTL_SECONDS")
+    profile_cache_max_entries: int = Field(default=10_000, alias="PROFILE_CACHE_MAX_ENTRIES")
+    station_cache_fresh_seconds: float = Field(
+        default=300.0,
+        alias="STATION_CACHE_FRESH_SECONDS",
+    )
+    product_catalog_refresh_seconds: float = Field(
+        default=3600.0,
+        alias="PRODUCT_CATALOG_REFRESH_SECONDS",
+    )
+    product_catalog_miss_refresh_seconds: float = Field(
+        default=300.0,
+        alias="PRODUCT_CATALOG_MISS_REFRESH_SECONDS",
+    )
+    session_sync_interval_seconds: float = Field(
+        default=900.0,
+        alias="SESSION_SYNC_INTERVAL_SECONDS",
+    )
+    session_sync_window: int = Field(default=100, alias="SESSION_SYNC_WINDOW")
     export_row_limit: int = Field(default=50_000, alias="EXPORT_ROW_LIMIT")
     export_timeout_seconds: int = Field(default=120, alias="EXPORT_TIMEOUT_SECONDS")
+    export_executor: Literal["thread", "process"] = Field(
+        default="process",
+        alias="EXPORT_EXECUTOR",
+    )
+    export_workers: int = Field(default=2, alias="EXPORT_WORKERS")
+    export_csv_zip_station_threshold: int = Field(
+        default=5,
+        alias="EXPORT_CSV_ZIP_STATION_THRESHOLD",
+    )
+    export_queue_workers: int = Field(default=2, alias="EXPORT_QUEUE_WORKERS")
+    export_queue_per_chat_limit: int = Field(default=1, alias="EXPORT_QUEUE_PER_CHAT_LIMIT")
+    export_queue_max_attempts: int = Field(default=3, alias="EXPORT_QUEUE_MAX_ATTEMPTS")
+    export_drain_timeout_seconds: float = Field(
+        default=30.0,
+        alias="EXPORT_DRAIN_TIMEOUT_SECONDS",
+    )
+    export_cache_dir: str = Field(default="data/export-cache", alias="EXPORT_CACHE_DIR")
+    export_cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        alias="EXPORT_CACHE_MAX_BYTES",
+    )
+    telegram_file_retention_seconds: float = Field(
+        default=7 * 24 * 3600.0,
+        alias="TELEGRAM_FILE_RETENTION_SECONDS",
+    )
     geolite_city_db: str = Field(default="GeoLite2-City.mmdb", alias="GEOLITE_CITY_DB")
     geolite_asn_db: str = Field(default="GeoLite2-ASN.mmdb", alias="GEOLITE_ASN_DB")
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore", populate_by_name=True)
 
+    def retired_secret_keys(self) -> tuple[str, ...]:
+        """Comma-separated `BOT_RETIRED_SECRET_KEYS`, still accepted for decryption."""
+        return tuple(key.strip() for key in self.bot_retired_secret_keys.split(",") if key.strip())
+
     def require_runtime_secrets(self) -> None:
         """Fail fast when production startup lacks mandatory secrets."""
         missing = []
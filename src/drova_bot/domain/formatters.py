@@ -10,11 +10,14 @@ from ipaddress import IPv4Address, ip_address, ip_network
 from zoneinfo import ZoneInfo
 
 from drova_bot.domain.models import (
+    CSV_BUNDLE_MODES,
+    DEFAULT_CSV_BUNDLE_MODE,
     DEFAULT_SESSION_LIMIT,
     MAX_SESSION_LIMIT,
     MIN_SESSION_LIMIT,
     ONLINE_STATES,
     CatalogProduct,
+    CsvBundleMode,
     Endpoint,
     Session,
     Station,
@@ -39,6 +42,15 @@ def normalize_session_limit(value: int | str | None) -> int:
     return DEFAULT_SESSION_LIMIT
 
 
+def normalize_csv_bundle_mode(value: str | None) -> CsvBundleMode:
+    """Return a known CSV bundle mode, falling back to the product default."""
+    normalized = (value or "").strip().lower()
+    for mode in CSV_BUNDLE_MODES:
+        if mode == normalized:
+            return mode
+    return DEFAULT_CSV_BUNDLE_MODE
+
+
 def html_escape(value: object) -> str:
     return escape(str(value), quote=False)
 
@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import Literal
 
 DEFAULT_SESSION_LIMIT = 5
 MIN_SESSION_LIMIT = 1
 MAX_SESSION_LIMIT = 100
 DEFAULT_TIMEZONE = "Asia/Yekaterinburg"
 
+CsvBundleMode = Literal["auto", "zip", "files"]
+CSV_BUNDLE_MODES: tuple[CsvBundleMode, ...] = ("auto", "zip", "files")
+DEFAULT_CSV_BUNDLE_MODE: CsvBundleMode = "auto"
+
 ONLINE_STATES = frozenset({"LISTEN", "HANDSHAKE", "BUSY"})
 
 
@@ -27,6 +32,7 @@ class ChatProfile:
     selected_station_id: str | None = None
     session_limit: int = DEFAULT_SESSION_LIMIT
     timezone: str = DEFAULT_TIMEZONE
+    csv_bundle_mode: CsvBundleMode = DEFAULT_CSV_BUNDLE_MODE
 
 
 @dataclass(frozen=True, slots=True)
@@ -1,18 +1,31 @@
 """Drova API client package."""
 
-from drova_bot.drova.client import DrovaClient
+from drova_bot.drova.breaker import CircuitBreaker, CircuitState
+from drova_bot.drova.client import DrovaClient, create_http_client
+from drova_bot.drova.coalescing import RequestCoalescer
 from drova_bot.drova.errors import (
+    DrovaCircuitOpen,
     DrovaError,
     DrovaPermissionDenied,
     DrovaUnauthorized,
     DrovaUnavailable,
 )
+from drova_bot.drova.renewal import TokenRenewalCoordinator
+from drova_bot.drova.retry import RetryBudget, RetryPolicy
 
 __all__ = [
+    "CircuitBreaker",
+    "CircuitState",
+    "DrovaCircuitOpen",
     "DrovaClient",
     "DrovaError",
     "DrovaPermissionDenied",
     "DrovaUnauthorized",
     "DrovaUnavailable",
+    "RequestCoalescer",
+    "RetryBudget",
+    "RetryPolicy",
+    "TokenRenewalCoordinator",
+    "create_http_client",
 ]
 
@@ -0,0 +1,136 @@
+"""Process-wide circuit breaker for Drova API path families."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from enum import StrEnum
+from pathlib import Path
+
+import structlog
+
+from drova_bot.drova.errors import DrovaCircuitOpen
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT_SECONDS = 30.0
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(slots=True)
+class _Circuit:
+    state: CircuitState = CircuitState.CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    probes: int = 0
+
+
+def path_family(path: str) -> str:
+    """Group endpoints by their Drova service, e.g. `/server-manager/...` -> `server-manager`."""
+    return path.strip("/").split("/", 1)[0] or "/"
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker per path family, shared by all Drova clients.
+
+    `failure_threshold` consecutive failures open the family's circuit; calls then fail
+    fast with `DrovaCircuitOpen` until `reset_timeout_seconds` pass, after which a single
+    probe is let through. Transitions are logged and, when `state_file` is set, written
+    out for the healthcheck process.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout_seconds: float = DEFAULT_RESET_TIMEOUT_SECONDS,
+        half_open_max_calls: int = 1,
+        state_file: Path | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = max(1, failure_threshold)
+        self._reset_timeout_seconds = reset_timeout_seconds
+        self._half_open_max_calls = max(1, half_open_max_calls)
+        self._state_file = state_file
+        self._clock = clock
+        self._circuits: dict[str, _Circuit] = {}
+
+    def states(self) -> dict[str, CircuitState]:
+        return {family: circuit.state for family, circuit in sorted(self._circuits.items())}
+
+    def before_call(self, family: str) -> None:
+        circuit = self._circuits.setdefault(family, _Circuit())
+        if circuit.state is CircuitState.OPEN:
+            if self._clock() - circuit.opened_at < self._reset_timeout_seconds:
+                raise DrovaCircuitOpen(f"Drova circuit for {family} is open")
+            circuit.probes = 0
+            self._transition(family, circuit, CircuitState.HALF_OPEN)
+        if circuit.state is CircuitState.HALF_OPEN:
+            if circuit.probes >= self._half_open_max_calls:
+                raise DrovaCircuitOpen(f"Drova circuit for {family} is half-open")
+            circuit.probes += 1
+
+    def record_success(self, family: str) -> None:
+        circuit = self._circuits.setdefault(family, _Circuit())
+        circuit.failures = 0
+        circuit.probes = 0
+        if circuit.state is not CircuitState.CLOSED:
+            self._transition(family, circuit, CircuitState.CLOSED)
+
+    def record_failure(self, family: str) -> None:
+        circuit = self._circuits.setdefault(family, _Circuit())
+        circuit.failures += 1
+        if circuit.state is CircuitState.HALF_OPEN or (
+            circuit.state is CircuitState.CLOSED and circuit.failures >= self._failure_threshold
+        ):
+            circuit.opened_at = self._clock()
+            circuit.probes = 0
+            self._transition(family, circuit, CircuitState.OPEN)
+
+    def release(self, family: str) -> None:
+        """Give back a half-open probe slot when the call ended without an outcome."""
+        circuit = self._circuits.get(family)
+        if circuit is not None and circuit.state is CircuitState.HALF_OPEN and circuit.probes:
+            circuit.probes -= 1
+
+    def _transition(self, family: str, circuit: _Circuit, state: CircuitState) -> None:
+        previous = circuit.state
+        circuit.state = state
+        log = logger.info if state is CircuitState.CLOSED else logger.warning
+        log(
+            "drova_circuit_state_changed",
+            family=family,
+            previous_state=previous.value,
+            state=state.value,
+            failures=circuit.failures,
+        )
+        if self._state_file is not None:
+            write_circuit_states(self._state_file, self.states())
+
+
+def write_circuit_states(path: Path, states: Mapping[str, CircuitState]) -> None:
+    payload = {"updated_at": time.time(), "circuits": {k: v.value for k, v in states.items()}}
+    temporary = path.with_name(f"{path.name}.tmp")
+    try:
+        temporary.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(temporary, path)
+    except OSError as exc:
+        logger.warning("drova_circuit_state_write_failed", path=str(path), error=str(exc))
+
+
+def read_circuit_states(path: Path) -> dict[str, CircuitState]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        circuits = payload["circuits"]
+        return {str(family): CircuitState(state) for family, state in circuits.items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Awaitable, Callable, Mapping
+import json
+import time
+from collections.abc import AsyncGenerator, Mapping
 from typing import Any
 
 import httpx
@@ -20,14 +22,17 @@ from drova_bot.domain.models import (
     ServerProductEdit,
     ServerSource,
     ServerUsageStatistics,
+    Session,
     SessionPage,
     Station,
     StationProduct,
 )
+from drova_bot.drova.breaker import CircuitBreaker, path_family
+from drova_bot.drova.coalescing import RequestCoalescer
 from drova_bot.drova.errors import DrovaPermissionDenied, DrovaUnauthorized, DrovaUnavailable
 from drova_bot.drova.models import (
+    SESSION_ADAPTER,
     AccountResponse,
-    CatalogProductResponse,
     EndpointResponse,
     OpenedPrepaidDealResponse,
     PrepaidSettlementResponse,
@@ -36,14 +41,49 @@ from drova_bot.drova.models import (
     ServerProductEditResponse,
     ServerSourceResponse,
     ServerUsageStatisticsResponse,
-    SessionPageResponse,
     StationProductResponse,
     StationResponse,
+    parse_catalog_products_json,
+    parse_sessions_json,
+    session_from_wire,
 )
+from drova_bot.drova.renewal import TokenPersister, TokenRenewalCoordinator
+from drova_bot.drova.retry import RetryPolicy
+from drova_bot.drova.streaming import iter_json_array
 
-TokenPersister = Callable[[str], Awaitable[None]]
 QueryValue = str | int | float | bool | None
 
+DEFAULT_BASE_URL = "https://services.drova.io"
+SESSION_STREAM_BATCH_SIZE = 500
+
+
+def create_http_client(
+    *,
+    base_url: str = DEFAULT_BASE_URL,
+    proxy: str | None = None,
+    timeout: float = 10.0,
+    http2: bool = False,
+    max_connections: int | None = 100,
+    max_keepalive_connections: int | None = 20,
+    keepalive_expiry: float | None = 5.0,
+) -> httpx.AsyncClient:
+    """Build the pooled transport shared by `DrovaClient` instances.
+
+    The client carries no auth state: tokens are sent per request, so one pool can
+    serve every chat and keep TCP/TLS (and proxy CONNECT) sessions warm.
+    """
+    return httpx.AsyncClient(
+        base_url=base_url.rstrip("/"),
+        timeout=httpx.Timeout(timeout),
+        proxy=proxy,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+    )
+
 
 class DrovaClient:
     """Typed client for the Drova service contract in `specs/v2/drova-api.md`."""
@@ -52,23 +92,30 @@ class DrovaClient:
         self,
         *,
         proxy_token: str,
-        base_url: str = "https://services.drova.io",
+        base_url: str = DEFAULT_BASE_URL,
         token_persister: TokenPersister | None = None,
         http_client: httpx.AsyncClient | None = None,
         proxy: str | None = None,
         timeout: float = 10.0,
         read_attempts: int = 2,
+        renewal_coordinator: TokenRenewalCoordinator | None = None,
+        request_coalescer: RequestCoalescer | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
     ) -> None:
         self._proxy_token = proxy_token
         self._base_url = base_url.rstrip("/")
         self._token_persister = token_persister
         self._owns_client = http_client is None
-        self._client = http_client or httpx.AsyncClient(
+        self._client = http_client or create_http_client(
             base_url=self._base_url,
-            timeout=httpx.Timeout(timeout),
+            timeout=timeout,
             proxy=proxy,
         )
-        self._read_attempts = max(1, read_attempts)
+        self._retry_policy = retry_policy or RetryPolicy(max_attempts=max(1, read_attempts))
+        self._renewal = renewal_coordinator or TokenRenewalCoordinator()
+        self._coalescer = request_coalescer or RequestCoalescer()
+        self._breaker = circuit_breaker or CircuitBreaker()
 
     @property
     def proxy_token(self) -> str:
@@ -107,11 +154,13 @@ class DrovaClient:
         return token
 
     async def get_products_full(self) -> list[CatalogProduct]:
-        payload = await self._request("GET", "/product-manager/product/listfull2", auth=False)
-        if not isinstance(payload, list):
-            raise DrovaUnavailable("products response is not a list")
+        content = await self._request_content(
+            "GET",
+            "/product-manager/product/listfull2",
+            auth=False,
+        )
         try:
-            return [CatalogProductResponse.model_validate(item).to_domain() for item in payload]
+            return parse_catalog_products_json(content)
         except ValidationError as exc:
             raise DrovaUnavailable("products response has unexpected shape") from exc
 
@@ -130,18 +179,54 @@ class DrovaClient:
         server_id: str | None = None,
         limit: int | None = None,
     ) -> SessionPage:
-        params: dict[str, QueryValue] = {}
-        if merchant_id is not None:
-            params["merchant_id"] = merchant_id
-        if server_id is not None:
-            params["server_id"] = server_id
-        if limit is not None:
-            params["limit"] = limit
-        payload = await self._request("GET", "/session-manager/sessions", params=params)
+        params = _session_params(merchant_id, server_id, limit)
+        content = await self._request_content("GET", "/session-manager/sessions", params=params)
+        try:
+            return SessionPage(sessions=parse_sessions_json(content))
+        except ValidationError as exc:
+            raise DrovaUnavailable("sessions response has unexpected shape") from exc
+
+    async def iter_sessions(
+        self,
+        merchant_id: str | None = None,
+        server_id: str | None = None,
+        limit: int | None = None,
+        *,
+        batch_size: int = SESSION_STREAM_BATCH_SIZE,
+    ) -> AsyncGenerator[list[Session], None]:
+        """Stream `/session-manager/sessions` and yield parsed sessions in batches.
+
+        The body is parsed incrementally, so only one batch of sessions is held on top
+        of whatever the caller keeps. Identical requests are not coalesced.
+        """
+        response = await self._send_authorized(
+            "GET",
+            "/session-manager/sessions",
+            params=_session_params(merchant_id, server_id, limit),
+            json_body=None,
+            auth=True,
+            allow_renewal=True,
+            retry_read=True,
+            stream=True,
+        )
         try:
-            return SessionPageResponse.parse_payload(payload).to_domain()
+            _raise_for_status(response)
+            batch: list[Session] = []
+            async for item in iter_json_array(response.aiter_bytes(), key="sessions"):
+                batch.append(session_from_wire(SESSION_ADAPTER.validate_python(item)))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        except httpx.HTTPError as exc:
+            raise DrovaUnavailable("Drova request failed") from exc
         except ValidationError as exc:
             raise DrovaUnavailable("sessions response has unexpected shape") from exc
+        except ValueError as exc:
+            raise DrovaUnavailable("Drova returned malformed JSON") from exc
+        finally:
+            await response.aclose()
 
     async def get_server_products(self, user_id: str, server_id: str) -> list[StationProduct]:
         payload = await self._request(
@@ -322,48 +407,170 @@ class DrovaClient:
         allow_renewal: bool = True,
         retry_read: bool = True,
     ) -> Any:
-        headers = {"X-Auth-Token": self._proxy_token} if auth else None
+        content = await self._request_content(
+            method,
+            path,
+            params=params,
+            json_body=json_body,
+            auth=auth,
+            allow_renewal=allow_renewal,
+            retry_read=retry_read,
+        )
+        if not content:
+            return None
         try:
-            response = await self._send_with_retry(
+            return json.loads(content)
+        except ValueError as exc:
+            raise DrovaUnavailable("Drova returned malformed JSON") from exc
+
+    async def _request_content(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Mapping[str, QueryValue] | None = None,
+        json_body: Mapping[str, object] | None = None,
+        auth: bool = True,
+        allow_renewal: bool = True,
+        retry_read: bool = True,
+    ) -> bytes:
+        if method != "GET" or not retry_read:
+            return await self._perform_request(
+                method,
+                path,
+                params=params,
+                json_body=json_body,
+                auth=auth,
+                allow_renewal=allow_renewal,
+                retry_read=retry_read,
+            )
+        key = (
+            self._base_url,
+            path,
+            tuple(sorted((params or {}).items())),
+            self._proxy_token if auth else None,
+        )
+        return await self._coalescer.run(
+            key,
+            lambda: self._perform_request(
+                method,
+                path,
+                params=params,
+                json_body=json_body,
+                auth=auth,
+                allow_renewal=allow_renewal,
+                retry_read=retry_read,
+            ),
+        )
+
+    async def _perform_request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Mapping[str, QueryValue] | None,
+        json_body: Mapping[str, object] | None,
+        auth: bool,
+        allow_renewal: bool,
+        retry_read: bool,
+    ) -> bytes:
+        response = await self._send_authorized(
+            method,
+            path,
+            params=params,
+            json_body=json_body,
+            auth=auth,
+            allow_renewal=allow_renewal,
+            retry_read=retry_read,
+        )
+        _raise_for_status(response)
+        return response.content
+
+    async def _send_authorized(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Mapping[str, QueryValue] | None,
+        json_body: Mapping[str, object] | None,
+        auth: bool,
+        allow_renewal: bool,
+        retry_read: bool,
+        stream: bool = False,
+    ) -> httpx.Response:
+        sent_token = self._proxy_token
+        headers = {"X-Auth-Token": sent_token} if auth else None
+        try:
+            response = await self._send_guarded(
                 method,
                 path,
                 params=params,
                 json_body=json_body,
                 headers=headers,
                 retry_read=retry_read,
+                stream=stream,
             )
         except httpx.HTTPError as exc:
             raise DrovaUnavailable("Drova request failed") from exc
 
         if response.status_code == 401 and auth and allow_renewal:
-            new_token = await self.renew_token(self._proxy_token)
-            if self._token_persister is not None:
-                await self._token_persister(new_token)
-            self._proxy_token = new_token
-            response = await self._send_with_retry(
+            await response.aclose()
+            await self._renew_rejected_token(sent_token)
+            response = await self._send_guarded(
                 method,
                 path,
                 params=params,
                 json_body=json_body,
                 headers={"X-Auth-Token": self._proxy_token},
                 retry_read=retry_read,
+                stream=stream,
             )
+        return response
+
+    async def _renew_rejected_token(self, rejected_token: str) -> None:
+        if self._proxy_token != rejected_token:
+            # A concurrent request on this client already renewed the token.
+            return
+        self._proxy_token = await self._renewal.renew(
+            rejected_token,
+            self.renew_token,
+            persister=self._token_persister,
+        )
 
-        if response.status_code == 401:
-            raise DrovaUnauthorized("Drova token is invalid")
-        if response.status_code == 403:
-            raise DrovaPermissionDenied("Drova permission denied")
-        if response.status_code >= 500:
-            raise DrovaUnavailable("Drova returned a server error")
-        if response.status_code >= 400:
-            raise DrovaUnavailable("Drova returned an unexpected client error")
-
-        if not response.content:
-            return None
+    async def _send_guarded(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Mapping[str, QueryValue] | None,
+        json_body: Mapping[str, object] | None,
+        headers: Mapping[str, str] | None,
+        retry_read: bool,
+        stream: bool,
+    ) -> httpx.Response:
+        family = path_family(path)
+        self._breaker.before_call(family)
         try:
-            return response.json()
-        except ValueError as exc:
-            raise DrovaUnavailable("Drova returned malformed JSON") from exc
+            response = await self._send_with_retry(
+                method,
+                path,
+                params=params,
+                json_body=json_body,
+                headers=headers,
+                retry_read=retry_read,
+                stream=stream,
+            )
+        except httpx.HTTPError:
+            self._breaker.record_failure(family)
+            raise
+        except BaseException:
+            self._breaker.release(family)
+            raise
+        if response.status_code >= 500 or response.status_code == 429:
+            self._breaker.record_failure(family)
+        else:
+            self._breaker.record_success(family)
+        return response
 
     async def _send_with_retry(
         self,
@@ -374,26 +581,75 @@ class DrovaClient:
         json_body: Mapping[str, object] | None,
         headers: Mapping[str, str] | None,
         retry_read: bool,
+        stream: bool,
     ) -> httpx.Response:
-        attempts = self._read_attempts if method == "GET" and retry_read else 1
-        last_exc: httpx.HTTPError | None = None
-        for attempt in range(attempts):
+        policy = self._retry_policy
+        retryable = method == "GET" and retry_read
+        host = self._client.base_url.host
+        if retryable and policy.budget is not None:
+            policy.budget.record_request(host)
+        started = time.monotonic()
+        attempt = 1
+        while True:
             try:
-                return await self._client.request(
+                request = self._client.build_request(
                     method,
                     path,
                     params=params,
                     json=json_body,
                     headers=headers,
                 )
-            except (httpx.TimeoutException, httpx.NetworkError) as exc:
-                last_exc = exc
-                if attempt + 1 >= attempts:
-                    break
-                await asyncio.sleep(0)
-        if last_exc is not None:
-            raise last_exc
-        raise DrovaUnavailable("Drova request did not complete")
+                response = await self._client.send(request, stream=stream)
+            except (httpx.TimeoutException, httpx.NetworkError):
+                if not retryable:
+                    raise
+                delay = policy.retry_delay(attempt, elapsed_seconds=time.monotonic() - started)
+                if delay is None or not self._acquire_retry(host):
+                    raise
+            else:
+                if not retryable or response.status_code not in policy.retry_status_codes:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                delay = policy.retry_delay(
+                    attempt,
+                    elapsed_seconds=time.monotonic() - started,
+                    retry_after=retry_after,
+                )
+                if delay is None or not self._acquire_retry(host):
+                    return response
+                await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _acquire_retry(self, host: str) -> bool:
+        budget = self._retry_policy.budget
+        return budget is None or budget.try_acquire_retry(host)
+
+
+def _raise_for_status(response: httpx.Response) -> None:
+    if response.status_code == 401:
+        raise DrovaUnauthorized("Drova token is invalid")
+    if response.status_code == 403:
+        raise DrovaPermissionDenied("Drova permission denied")
+    if response.status_code >= 500:
+        raise DrovaUnavailable("Drova returned a server error")
+    if response.status_code >= 400:
+        raise DrovaUnavailable("Drova returned an unexpected client error")
+
+
+def _session_params(
+    merchant_id: str | None,
+    server_id: str | None,
+    limit: int | None,
+) -> dict[str, QueryValue]:
+    params: dict[str, QueryValue] = {}
+    if merchant_id is not None:
+        params["merchant_id"] = merchant_id
+    if server_id is not None:
+        params["server_id"] = server_id
+    if limit is not None:
+        params["limit"] = limit
+    return params
 
 
 def _parse_promocodes(payload: object) -> list[Promocode]:
@@ -0,0 +1,38 @@
+"""Coalescing of identical in-flight Drova reads."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine, Hashable
+from typing import Any, cast
+
+
+class RequestCoalescer:
+    """Shares one underlying request between concurrent callers with the same key.
+
+    The shared request runs as its own task, so a caller that is cancelled (for example
+    by an export timeout) does not cancel the request for the other waiters. Keys are
+    forgotten as soon as the request completes; nothing is cached afterwards.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[Hashable, asyncio.Task[Any]] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def run[T](self, key: Hashable, fetch: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        task = self._in_flight.get(key)
+        if task is None or task.done():
+            task = asyncio.create_task(fetch())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return cast(T, await asyncio.shield(task))
+
+    def _forget(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved; waiters re-raise it from the shield.
+            task.exception()
@@ -23,6 +23,10 @@ class DrovaUnavailable(DrovaError):
     """Drova is unavailable, timed out, or returned malformed data."""
 
 
+class DrovaCircuitOpen(DrovaUnavailable):
+    """Drova calls are short-circuited after repeated failures."""
+
+
 class DrovaPermissionDenied(DrovaError):
     """Drova rejected the operation for permission reasons."""
 
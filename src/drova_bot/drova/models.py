@@ -2,9 +2,9 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, NotRequired, TypedDict
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
 
 from drova_bot.domain.models import (
     Account,
@@ -365,3 +365,70 @@ class ServerProductEditResponse(DrovaApiModel):
                 work_path=self.work_path,
             ),
         )
+
+
+# Fast path for the large list endpoints: validate straight from the response bytes into
+# TypedDicts (plain dicts built by pydantic-core) and construct the domain dataclasses
+# from them, skipping `response.json()` and the intermediate pydantic model per row.
+
+
+class SessionWire(TypedDict):
+    uuid: str
+    server_id: str
+    merchant_id: str
+    product_id: str
+    client_id: NotRequired[str | None]
+    creator_ip: NotRequired[str | None]
+    created_on: int
+    finished_on: NotRequired[int | None]
+    billing_type: NotRequired[str | None]
+    status: NotRequired[str | None]
+    score_text: NotRequired[str | None]
+
+
+class _SessionPageWire(TypedDict):
+    sessions: NotRequired[list[SessionWire]]
+
+
+class CatalogProductWire(TypedDict):
+    productId: str
+    title: str
+
+
+SESSION_ADAPTER: TypeAdapter[SessionWire] = TypeAdapter(SessionWire)
+SESSIONS_PAYLOAD_ADAPTER: TypeAdapter[list[SessionWire] | _SessionPageWire] = TypeAdapter(
+    list[SessionWire] | _SessionPageWire
+)
+CATALOG_PRODUCTS_ADAPTER: TypeAdapter[list[CatalogProductWire]] = TypeAdapter(
+    list[CatalogProductWire]
+)
+
+
+def session_from_wire(item: SessionWire) -> Session:
+    return Session(
+        uuid=item["uuid"],
+        server_id=item["server_id"],
+        merchant_id=item["merchant_id"],
+        product_id=item["product_id"],
+        client_id=item.get("client_id"),
+        creator_ip=item.get("creator_ip"),
+        created_on_ms=item["created_on"],
+        finished_on_ms=item.get("finished_on"),
+        billing_type=item.get("billing_type"),
+        status=item.get("status"),
+        score_text=item.get("score_text"),
+    )
+
+
+def parse_sessions_json(content: bytes) -> list[Session]:
+    """Parse a sessions payload (bare list or `{"sessions": [...]}`) from raw JSON bytes."""
+    payload = SESSIONS_PAYLOAD_ADAPTER.validate_json(content)
+    items = payload if isinstance(payload, list) else payload.get("sessions", [])
+    return [session_from_wire(item) for item in items]
+
+
+def parse_catalog_products_json(content: bytes) -> list[CatalogProduct]:
+    return [
+        CatalogProduct(product_id=item["productId"], title=item["title"])
+        for item in CATALOG_PRODUCTS_ADAPTER.validate_json(content)
+    ]
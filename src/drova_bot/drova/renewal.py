@@ -0,0 +1,90 @@
+"""Single-flight proxy token renewal shared by Drova clients."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Coroutine, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+TokenPersister = Callable[[str], Awaitable[None]]
+TokenRenewer = Callable[[str], Coroutine[Any, Any, str]]
+
+DEFAULT_RENEWAL_MEMORY_SECONDS = 300.0
+
+
+@dataclass(slots=True)
+class _Renewal:
+    task: asyncio.Task[str]
+    persisted: set[Hashable] = field(default_factory=set)
+    finished_at: float | None = None
+
+
+class TokenRenewalCoordinator:
+    """Runs at most one `renewProxyToken` call per rejected token.
+
+    Concurrent requests that hit 401 with the same token await the same renewal. The
+    result is remembered for a short window so a request that was already in flight with
+    the old token (possibly on another client of the same chat) reuses the new token
+    instead of renewing again. Persisters are hashable per chat, so each chat's storage
+    is written once per renewal.
+    """
+
+    def __init__(
+        self,
+        *,
+        memory_seconds: float = DEFAULT_RENEWAL_MEMORY_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._memory_seconds = memory_seconds
+        self._clock = clock
+        self._renewals: dict[str, _Renewal] = {}
+
+    async def renew(
+        self,
+        rejected_token: str,
+        renewer: TokenRenewer,
+        *,
+        persister: TokenPersister | None = None,
+    ) -> str:
+        self._forget_expired()
+        renewal = self._renewals.get(rejected_token)
+        if renewal is None or _failed(renewal.task):
+            renewal = _Renewal(task=asyncio.create_task(renewer(rejected_token)))
+            renewal.task.add_done_callback(self._on_done(renewal))
+            self._renewals[rejected_token] = renewal
+
+        new_token = await asyncio.shield(renewal.task)
+        if persister is not None and persister not in renewal.persisted:
+            renewal.persisted.add(persister)
+            try:
+                await persister(new_token)
+            except BaseException:
+                renewal.persisted.discard(persister)
+                raise
+        return new_token
+
+    def _on_done(self, renewal: _Renewal) -> Callable[[asyncio.Task[str]], None]:
+        def done(task: asyncio.Task[str]) -> None:
+            renewal.finished_at = self._clock()
+            if not task.cancelled():
+                # Mark the exception retrieved; waiters re-raise it from the shield.
+                task.exception()
+
+        return done
+
+    def _forget_expired(self) -> None:
+        now = self._clock()
+        expired = [
+            token
+            for token, renewal in self._renewals.items()
+            if renewal.finished_at is not None
+            and now - renewal.finished_at > self._memory_seconds
+        ]
+        for token in expired:
+            del self._renewals[token]
+
+
+def _failed(task: asyncio.Task[str]) -> bool:
+    return task.done() and (task.cancelled() or task.exception() is not None)
@@ -0,0 +1,111 @@
+"""Retry policy for idempotent Drova reads."""
+
+from __future__ import annotations
+
+import random
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+class RetryBudget:
+    """Caps retries per host to a share of recent traffic.
+
+    Within a sliding `window_seconds`, retries are allowed while they stay below
+    `ratio` of first attempts, with `min_retries` always available so a quiet bot can
+    still ride out a single blip.
+    """
+
+    def __init__(
+        self,
+        *,
+        ratio: float = 0.2,
+        min_retries: int = 3,
+        window_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ratio = ratio
+        self._min_retries = min_retries
+        self._window_seconds = window_seconds
+        self._clock = clock
+        self._requests: dict[str, deque[float]] = {}
+        self._retries: dict[str, deque[float]] = {}
+
+    def record_request(self, host: str) -> None:
+        # Pruned here as well: retries are rare, and healthy traffic must not grow it.
+        now = self._clock()
+        self._pruned(self._requests, host, now).append(now)
+
+    def try_acquire_retry(self, host: str) -> bool:
+        now = self._clock()
+        requests = self._pruned(self._requests, host, now)
+        retries = self._pruned(self._retries, host, now)
+        allowed = max(self._min_retries, int(len(requests) * self._ratio))
+        if len(retries) >= allowed:
+            return False
+        retries.append(now)
+        return True
+
+    def _pruned(self, events: dict[str, deque[float]], host: str, now: float) -> deque[float]:
+        bucket = events.setdefault(host, deque())
+        while bucket and now - bucket[0] > self._window_seconds:
+            bucket.popleft()
+        return bucket
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by attempts and elapsed time."""
+
+    max_attempts: int = 2
+    base_delay_seconds: float = 0.2
+    max_delay_seconds: float = 5.0
+    max_elapsed_seconds: float = 15.0
+    retry_status_codes: frozenset[int] = RETRYABLE_STATUS_CODES
+    budget: RetryBudget | None = field(default=None, compare=False)
+    jitter: Callable[[], float] = field(default=random.random, compare=False)
+
+    def backoff_seconds(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based)."""
+        ceiling = min(self.max_delay_seconds, self.base_delay_seconds * 2.0 ** (attempt - 1))
+        return ceiling * self.jitter()
+
+    def retry_delay(
+        self,
+        attempt: int,
+        *,
+        elapsed_seconds: float,
+        retry_after: str | None = None,
+        now: datetime | None = None,
+    ) -> float | None:
+        """Seconds to wait before the next attempt, or None when retrying is not allowed."""
+        if attempt >= self.max_attempts:
+            return None
+        delay = self.backoff_seconds(attempt)
+        if retry_after is not None:
+            server_delay = parse_retry_after(retry_after, now=now)
+            if server_delay is not None:
+                delay = max(delay, server_delay)
+        if elapsed_seconds + delay > self.max_elapsed_seconds:
+            return None
+        return delay
+
+
+def parse_retry_after(value: str, *, now: datetime | None = None) -> float | None:
+    """Parse a `Retry-After` header given either as seconds or as an HTTP date."""
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    current = now or datetime.now(tz=UTC)
+    return max(0.0, (retry_at - current).total_seconds())
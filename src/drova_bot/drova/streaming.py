@@ -0,0 +1,104 @@
+"""Incremental parsing of large JSON array responses."""
+
+from __future__ import annotations
+
+import codecs
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+_DECODER = json.JSONDecoder()
+
+
+class _Buffer:
+    """Decoded text window over an async byte stream."""
+
+    def __init__(self, chunks: AsyncIterator[bytes]) -> None:
+        self._chunks = chunks
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    async def fill(self) -> bool:
+        """Read another chunk; False once the stream is exhausted."""
+        if self.exhausted:
+            return False
+        try:
+            chunk = await anext(self._chunks)
+        except StopAsyncIteration:
+            self.exhausted = True
+            self.text = self.text[self.pos :] + self._decoder.decode(b"", final=True)
+        else:
+            self.text = self.text[self.pos :] + self._decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    async def peek(self) -> str:
+        """Next non-whitespace character, or an empty string at the end of the stream."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not await self.fill():
+                return ""
+
+    async def expect(self, *chars: str) -> str:
+        char = await self.peek()
+        if char not in chars:
+            raise ValueError(f"expected one of {chars!r} in JSON stream, got {char!r}")
+        self.pos += 1
+        return char
+
+    async def value(self) -> Any:
+        """Decode one complete JSON value, reading more data until it is available."""
+        await self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not await self.fill():
+                    raise
+                continue
+            # A scalar cut at the chunk boundary ("12" of "123") also decodes; only
+            # trust a value that is followed by more text or by the end of the stream.
+            if end < len(self.text) or self.exhausted:
+                self.pos = end
+                return value
+            await self.fill()
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes], *, key: str) -> AsyncIterator[Any]:
+    """Yield the items of a top-level JSON array, or of the array under `key` in an object.
+
+    Only one item (plus the unread tail of the current chunk) is held in memory at a
+    time. Raises `ValueError` on malformed or truncated JSON.
+    """
+    buffer = _Buffer(chunks)
+    opening = await buffer.expect("[", "{")
+    if opening == "{" and not await _seek_key(buffer, key):
+        return
+    if await buffer.peek() == "]":
+        buffer.pos += 1
+        return
+    while True:
+        yield await buffer.value()
+        if await buffer.expect(",", "]") == "]":
+            return
+
+
+async def _seek_key(buffer: _Buffer, key: str) -> bool:
+    """Advance past `"key": [`; False when the object has no such key."""
+    if await buffer.peek() == "}":
+        return False
+    while True:
+        name = await buffer.value()
+        await buffer.expect(":")
+        if name == key:
+            await buffer.expect("[")
+            return True
+        await buffer.value()
+        if await buffer.expect(",", "}") == "}":
+            return False
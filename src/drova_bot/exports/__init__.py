@@ -1,13 +1,28 @@
 """Export service boundaries."""
 
+from drova_bot.exports.cache import ExportArtifactCache, ExportCacheScope
+from drova_bot.exports.executor import (
+    ExportExecutor,
+    ExportExecutorMode,
+    ProcessExportExecutor,
+    ThreadExportExecutor,
+    create_export_executor,
+)
 from drova_bot.exports.models import ExportFile, ExportKind, ExportResult
 from drova_bot.exports.products import ProductExportService
 from drova_bot.exports.sessions import SessionExportService
 
 __all__ = [
+    "ExportArtifactCache",
+    "ExportCacheScope",
+    "ExportExecutor",
+    "ExportExecutorMode",
     "ExportFile",
     "ExportKind",
     "ExportResult",
+    "ProcessExportExecutor",
     "ProductExportService",
     "SessionExportService",
+    "ThreadExportExecutor",
+    "create_export_executor",
 ]
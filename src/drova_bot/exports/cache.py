@@ -0,0 +1,227 @@
+"""On-disk cache of built export payloads keyed by their inputs."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+import structlog
+
+from drova_bot.domain.models import Session
+from drova_bot.exports.models import ExportKind
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_EXPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+_ARTIFACT_SUFFIX = ".artifact"
+
+
+@dataclass(frozen=True, slots=True)
+class ExportCacheScope:
+    """Whose data an export is built from; chats with the same scope share artifacts."""
+
+    merchant_id: str
+    station_id: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ExportCacheKey:
+    scope: ExportCacheScope
+    kind: ExportKind
+    timezone: str | None
+    fingerprint: str
+
+    @property
+    def digest(self) -> str:
+        parts = (
+            self.scope.merchant_id,
+            self.scope.station_id or "",
+            self.kind.value,
+            self.timezone or "",
+            self.fingerprint,
+        )
+        return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=20).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class ExportArtifact:
+    payload: bytes
+    built_at: datetime
+
+
+def content_fingerprint(*parts: object) -> str:
+    """Hash export inputs (records, mappings and scalars) independently of object identity.
+
+    Mappings are hashed in key order, so a catalog assembled in a different order still
+    matches; sequences keep their order.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        _feed(digest, part)
+    return digest.hexdigest()
+
+
+def _feed(digest: hashlib.blake2b, value: object) -> None:
+    if isinstance(value, Mapping):
+        digest.update(b"{%d:" % len(value))
+        for key in sorted(value):
+            _feed(digest, key)
+            _feed(digest, value[key])
+    elif isinstance(value, list):
+        digest.update(b"[%d:" % len(value))
+        for item in value:
+            _feed(digest, item)
+    else:
+        digest.update(repr(value).encode("utf-8"))
+        digest.update(b"\x00")
+
+
+class ExportArtifactCache:
+    """LRU of export payloads stored as files under `directory`, bounded by `max_bytes`.
+
+    A file's mtime is the time its payload was built and its atime the last use: the
+    index is rebuilt from the directory on first use, ordered by access time, and a hit
+    refreshes the atime, so recency survives restarts. Files are written to a temporary
+    name and renamed into place; disk work runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        max_bytes: int = DEFAULT_EXPORT_CACHE_MAX_BYTES,
+    ) -> None:
+        self._directory = Path(directory)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] | None = None
+        self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    async def get(self, key: ExportCacheKey) -> ExportArtifact | None:
+        return await asyncio.to_thread(self._read, key.digest)
+
+    async def put(self, key: ExportCacheKey, artifact: ExportArtifact) -> None:
+        await asyncio.to_thread(self._write, key.digest, artifact)
+
+    async def get_or_build(
+        self,
+        key: ExportCacheKey,
+        build: Callable[[], Awaitable[bytes]],
+        *,
+        now: datetime,
+    ) -> ExportArtifact:
+        """The cached artifact for `key`, or a new one built at `now`."""
+        artifact = await self.get(key)
+        if artifact is not None:
+            logger.info("export_cache_hit", kind=key.kind.value, size=len(artifact.payload))
+            return artifact
+        artifact = ExportArtifact(await build(), now)
+        try:
+            await self.put(key, artifact)
+        except OSError as exc:
+            logger.warning("export_cache_write_failed", error=type(exc).__name__)
+        return artifact
+
+    def _read(self, digest: str) -> ExportArtifact | None:
+        with self._lock:
+            entries = self._index()
+            if digest not in entries:
+                return None
+            path = self._path(digest)
+            try:
+                payload = path.read_bytes()
+                built_at_ns = path.stat().st_mtime_ns
+                os.utime(path, ns=(time.time_ns(), built_at_ns))
+            except FileNotFoundError:
+                self._forget(entries, digest)
+                return None
+            entries.move_to_end(digest)
+            built_at = datetime.fromtimestamp(built_at_ns / 1e9, tz=UTC)
+            return ExportArtifact(payload, built_at)
+
+    def _write(self, digest: str, artifact: ExportArtifact) -> None:
+        payload = artifact.payload
+        if len(payload) > self._max_bytes:
+            return
+        with self._lock:
+            entries = self._index()
+            path = self._path(digest)
+            temporary = path.with_name(f"{digest}.{uuid.uuid4().hex}.tmp")
+            temporary.write_bytes(payload)
+            built_at_ns = int(artifact.built_at.timestamp() * 1e9)
+            os.utime(temporary, ns=(time.time_ns(), built_at_ns))
+            os.replace(temporary, path)
+            self._forget(entries, digest)
+            entries[digest] = len(payload)
+            self._size += len(payload)
+            while self._size > self._max_bytes:
+                oldest = next(iter(entries))
+                self._path(oldest).unlink(missing_ok=True)
+                self._forget(entries, oldest)
+
+    def _index(self) -> OrderedDict[str, int]:
+        if self._entries is None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            found = []
+            for path in self._directory.iterdir():
+                if path.suffix == _ARTIFACT_SUFFIX:
+                    stat = path.stat()
+                    found.append((stat.st_atime_ns, path.stem, stat.st_size))
+                elif path.suffix == ".tmp":
+                    path.unlink(missing_ok=True)
+            self._entries = OrderedDict((digest, size) for _, digest, size in sorted(found))
+            self._size = sum(self._entries.values())
+        return self._entries
+
+    def _forget(self, entries: OrderedDict[str, int], digest: str) -> None:
+        size = entries.pop(digest, None)
+        if size is not None:
+            self._size -= size
+
+    def _path(self, digest: str) -> Path:
+        return self._directory / f"{digest}{_ARTIFACT_SUFFIX}"
+
+
+async def cached_export_artifact(
+    cache: ExportArtifactCache | None,
+    scope: ExportCacheScope | None,
+    kind: ExportKind,
+    *,
+    timezone: str | None,
+    inputs: tuple[object, ...],
+    now: datetime,
+    build: Callable[[], Awaitable[bytes]],
+) -> ExportArtifact:
+    """Serve the artifact built from `inputs` from `cache`, building it at `now` on a miss.
+
+    A hit keeps the time it was built, in `now`'s timezone, so filenames stamped with it
+    repeat for identical bytes. Without a cache or a scope the payload is always built.
+    """
+    if cache is None or scope is None:
+        return ExportArtifact(await build(), now)
+    fingerprint = await asyncio.to_thread(content_fingerprint, *inputs)
+    key = ExportCacheKey(scope, kind, timezone, fingerprint)
+    artifact = await cache.get_or_build(key, build, now=now)
+    built_at = artifact.built_at.astimezone(now.tzinfo)
+    if now.tzinfo is None:
+        built_at = built_at.replace(tzinfo=None)
+    return ExportArtifact(artifact.payload, built_at)
+
+
+def duration_clock(sessions: Iterable[Session], now: datetime) -> datetime | None:
+    """`now` when it changes computed durations, i.e. some session is still open."""
+    return now if any(session.finished_on_ms is None for session in sessions) else None
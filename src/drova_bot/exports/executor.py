@@ -0,0 +1,126 @@
+"""Executors that run CPU-bound export builders off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import fields
+from typing import TYPE_CHECKING, Any, Literal, Protocol
+
+import structlog
+
+if TYPE_CHECKING:
+    from _typeshed import DataclassInstance
+
+logger = structlog.get_logger(__name__)
+
+ExportExecutorMode = Literal["thread", "process"]
+
+DEFAULT_EXPORT_WORKERS = 2
+
+Record = tuple[Any, ...]
+
+
+class ExportExecutor(Protocol):
+    async def run[*Ts, T](self, fn: Callable[[*Ts], T], /, *args: *Ts) -> T: ...
+
+    def close(self) -> None: ...
+
+
+class ThreadExportExecutor:
+    """Run builders with `asyncio.to_thread`.
+
+    A cancelled call stops waiting, but the builder thread itself runs to completion and
+    keeps holding the GIL while it does.
+    """
+
+    async def run[*Ts, T](self, fn: Callable[[*Ts], T], /, *args: *Ts) -> T:
+        return await asyncio.to_thread(fn, *args)
+
+    def close(self) -> None:
+        return None
+
+
+class ProcessExportExecutor:
+    """Run builders in a pool of at most `max_workers` spawned processes.
+
+    `fn` must be a module-level function and its arguments picklable; callers pass
+    `pack_records` tuples instead of dataclasses to keep the payload small. The pool
+    starts on first use. Cancelling a call whose builder is already running terminates
+    the pool's workers, since a process cannot be interrupted any other way; calls that
+    were running on the same pool are resubmitted once to a fresh pool.
+    """
+
+    def __init__(self, *, max_workers: int = DEFAULT_EXPORT_WORKERS) -> None:
+        self._max_workers = max(1, max_workers)
+        self._pool: ProcessPoolExecutor | None = None
+
+    async def run[*Ts, T](self, fn: Callable[[*Ts], T], /, *args: *Ts) -> T:
+        resubmitted = False
+        while True:
+            pool = self._current_pool()
+            future = pool.submit(fn, *args)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                if not future.cancel():
+                    self._terminate(pool)
+                raise
+            except BrokenProcessPool:
+                if pool is self._pool:
+                    # A worker died on its own (e.g. killed for memory); start over next time.
+                    self._pool = None
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+                if resubmitted:
+                    raise
+                resubmitted = True
+
+    def close(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _current_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Workers are spawned rather than forked: the parent runs an event loop and
+            # several threads whose state must not be copied into the children.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _terminate(self, pool: ProcessPoolExecutor) -> None:
+        if pool is self._pool:
+            self._pool = None
+        # ProcessPoolExecutor has no public way to stop a running call before 3.14.
+        processes = list((pool._processes or {}).values())
+        for process in processes:
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        logger.info("export_workers_terminated", workers=len(processes))
+
+
+def create_export_executor(
+    mode: ExportExecutorMode,
+    *,
+    max_workers: int = DEFAULT_EXPORT_WORKERS,
+) -> ExportExecutor:
+    if mode == "process":
+        return ProcessExportExecutor(max_workers=max_workers)
+    return ThreadExportExecutor()
+
+
+def pack_records(cls: type[DataclassInstance], items: Iterable[object]) -> list[Record]:
+    """Flatten dataclass instances into field-ordered tuples for a worker process."""
+    # attrgetter with a single name returns a bare value, not a 1-tuple.
+    names = [field.name for field in fields(cls)]
+    return [tuple(getattr(item, name) for name in names) for item in items]
+
+
+def unpack_records[T](cls: Callable[..., T], records: Sequence[Record]) -> list[T]:
+    return [cls(*record) for record in records]
@@ -2,16 +2,12 @@
 
 from __future__ import annotations
 
-import asyncio
 from collections import defaultdict
-from collections.abc import Mapping, Sequence
+from collections.abc import Iterator, Mapping, Sequence
 from datetime import datetime
-from io import BytesIO
-from typing import cast
 
-from openpyxl import Workbook
 from openpyxl.styles import PatternFill
-from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.utils import get_column_letter
 
 from drova_bot.domain.formatters import (
     product_problem_flags,
@@ -19,25 +15,66 @@ from drova_bot.domain.formatters import (
     sort_stations,
 )
 from drova_bot.domain.models import Session, Station, StationProduct
-from drova_bot.exports.models import ExportFile
-from drova_bot.exports.sessions import XLSX_CONTENT_TYPE
+from drova_bot.exports.cache import (
+    ExportArtifactCache,
+    ExportCacheScope,
+    cached_export_artifact,
+    duration_clock,
+)
+from drova_bot.exports.executor import (
+    ExportExecutor,
+    Record,
+    ThreadExportExecutor,
+    pack_records,
+    unpack_records,
+)
+from drova_bot.exports.models import ExportFile, ExportKind
+from drova_bot.exports.xlsx import XLSX_CONTENT_TYPE, StyledValue, write_xlsx
 
 PROBLEM_FILL = PatternFill(fill_type="solid", fgColor="FFFF00")
+DURATION_FORMAT = "[h]:mm:ss"
 
 
 class ProductExportService:
+    def __init__(
+        self,
+        executor: ExportExecutor | None = None,
+        *,
+        cache: ExportArtifactCache | None = None,
+    ) -> None:
+        self._executor = executor or ThreadExportExecutor()
+        self._cache = cache
+
     async def build_products_xlsx(
         self,
         *,
         stations: Sequence[Station],
         products_by_station: Mapping[str, Sequence[StationProduct]],
         now: datetime,
+        cache_scope: ExportCacheScope | None = None,
     ) -> ExportFile:
-        return await asyncio.to_thread(
-            self._build_products_xlsx,
-            stations,
-            products_by_station,
-            now,
+        station_records = pack_records(Station, stations)
+        product_records = {
+            station_id: pack_records(StationProduct, products)
+            for station_id, products in products_by_station.items()
+        }
+        artifact = await cached_export_artifact(
+            self._cache,
+            cache_scope,
+            ExportKind.PRODUCTS,
+            timezone=None,
+            inputs=(station_records, product_records),
+            now=now,
+            build=lambda: self._executor.run(
+                _products_xlsx_payload,
+                station_records,
+                product_records,
+            ),
+        )
+        return ExportFile(
+            filename=self.products_filename(artifact.built_at),
+            content_type=XLSX_CONTENT_TYPE,
+            payload=artifact.payload,
         )
 
     async def build_product_time_xlsx(
@@ -47,13 +84,30 @@ class ProductExportService:
         sessions: Sequence[Session],
         product_catalog: Mapping[str, str],
         now: datetime,
+        cache_scope: ExportCacheScope | None = None,
     ) -> ExportFile:
-        return await asyncio.to_thread(
-            self._build_product_time_xlsx,
-            stations,
-            sessions,
-            product_catalog,
-            now,
+        station_records = pack_records(Station, stations)
+        session_records = pack_records(Session, sessions)
+        catalog = dict(product_catalog)
+        artifact = await cached_export_artifact(
+            self._cache,
+            cache_scope,
+            ExportKind.PRODUCT_TIME,
+            timezone=None,
+            inputs=(station_records, session_records, catalog, duration_clock(sessions, now)),
+            now=now,
+            build=lambda: self._executor.run(
+                _product_time_xlsx_payload,
+                station_records,
+                session_records,
+                catalog,
+                now,
+            ),
+        )
+        return ExportFile(
+            filename=self.product_time_filename(artifact.built_at),
+            content_type=XLSX_CONTENT_TYPE,
+            payload=artifact.payload,
         )
 
     @staticmethod
@@ -64,104 +118,93 @@ class ProductExportService:
     def product_time_filename(now: datetime) -> str:
         return f"drova-product-time-{now.strftime('%Y%m%d-%H%M%S')}.xlsx"
 
-    def _build_products_xlsx(
-        self,
-        stations: Sequence[Station],
-        products_by_station: Mapping[str, Sequence[StationProduct]],
-        now: datetime,
-    ) -> ExportFile:
-        ordered_stations = sort_stations(stations)
-        product_titles = sorted(
-            {
-                product.title
-                for station_products in products_by_station.values()
-                for product in station_products
-            },
-            key=str.casefold,
-        )
-        product_by_station_and_title = {
-            (station_id, product.title): product
-            for station_id, station_products in products_by_station.items()
-            for product in station_products
-        }
 
-        workbook = Workbook()
-        worksheet = cast(Worksheet, workbook.active)
-        worksheet.title = "products"
-        worksheet.append(["Продукт", *[station.name for station in ordered_stations]])
+def _products_xlsx_payload(
+    station_records: Sequence[Record],
+    product_records_by_station: Mapping[str, Sequence[Record]],
+) -> bytes:
+    ordered_stations = sort_stations(unpack_records(Station, station_records))
+    products_by_station = {
+        station_id: unpack_records(StationProduct, records)
+        for station_id, records in product_records_by_station.items()
+    }
+    product_titles = sorted(
+        {
+            product.title
+            for station_products in products_by_station.values()
+            for product in station_products
+        },
+        key=str.casefold,
+    )
+    product_by_station_and_title = {
+        (station_id, product.title): product
+        for station_id, station_products in products_by_station.items()
+        for product in station_products
+    }
+
+    def rows() -> Iterator[list[object]]:
+        yield ["Продукт", *[station.name for station in ordered_stations]]
         for product_title in product_titles:
-            row_index = worksheet.max_row + 1
-            worksheet.cell(row=row_index, column=1, value=product_title)
-            for column_index, station in enumerate(ordered_stations, start=2):
+            row: list[object] = [product_title]
+            for station in ordered_stations:
                 product = product_by_station_and_title.get((station.uuid, product_title))
                 value = _product_state_cell(product)
-                cell = worksheet.cell(row=row_index, column=column_index, value=value)
-                if value and value != "Active":
-                    cell.fill = PROBLEM_FILL
-
-        output = BytesIO()
-        workbook.save(output)
-        return ExportFile(
-            filename=self.products_filename(now),
-            content_type=XLSX_CONTENT_TYPE,
-            payload=output.getvalue(),
+                row.append(
+                    StyledValue(value, fill=PROBLEM_FILL)
+                    if value and value != "Active"
+                    else value
+                )
+            yield row
+
+    return write_xlsx("products", rows())
+
+
+def _product_time_xlsx_payload(
+    station_records: Sequence[Record],
+    session_records: Sequence[Record],
+    product_catalog: Mapping[str, str],
+    now: datetime,
+) -> bytes:
+    ordered_stations = sort_stations(unpack_records(Station, station_records))
+    sessions = unpack_records(Session, session_records)
+    product_titles_by_id = {
+        session.product_id: product_catalog.get(session.product_id, "Неизвестная игра")
+        for session in sessions
+    }
+    durations: dict[tuple[str, str], int] = defaultdict(int)
+    for session in sessions:
+        durations[(session.product_id, session.server_id)] += session_duration_seconds(
+            session,
+            now,
         )
 
-    def _build_product_time_xlsx(
-        self,
-        stations: Sequence[Station],
-        sessions: Sequence[Session],
-        product_catalog: Mapping[str, str],
-        now: datetime,
-    ) -> ExportFile:
-        ordered_stations = sort_stations(stations)
-        station_column_by_id = {
-            station.uuid: index for index, station in enumerate(ordered_stations, start=2)
-        }
-        product_titles_by_id = {
-            session.product_id: product_catalog.get(session.product_id, "Неизвестная игра")
-            for session in sessions
-        }
-        durations: dict[tuple[str, str], int] = defaultdict(int)
-        for session in sessions:
-            durations[(session.product_id, session.server_id)] += session_duration_seconds(
-                session,
-                now,
-            )
-
-        workbook = Workbook()
-        worksheet = cast(Worksheet, workbook.active)
-        worksheet.title = "product-time"
-        worksheet.append(["Продукт", *[station.name for station in ordered_stations], "Всего"])
-        sorted_products = sorted(
-            product_titles_by_id.items(),
-            key=lambda item: item[1].casefold(),
-        )
-        for product_id, title in sorted_products:
-            row_index = worksheet.max_row + 1
-            worksheet.cell(row=row_index, column=1, value=title)
-            for station in ordered_stations:
-                column_index = station_column_by_id[station.uuid]
-                seconds = durations.get((product_id, station.uuid), 0)
-                cell = worksheet.cell(row=row_index, column=column_index, value=seconds / 86_400)
-                cell.number_format = "[h]:mm:ss"
-            first_station_column = 2
-            last_station_column = len(ordered_stations) + 1
-            total_cell = worksheet.cell(
-                row=row_index,
-                column=last_station_column + 1,
-                value=f"=SUM({worksheet.cell(row_index, first_station_column).coordinate}:"
-                f"{worksheet.cell(row_index, last_station_column).coordinate})",
-            )
-            total_cell.number_format = "[h]:mm:ss"
-
-        output = BytesIO()
-        workbook.save(output)
-        return ExportFile(
-            filename=self.product_time_filename(now),
-            content_type=XLSX_CONTENT_TYPE,
-            payload=output.getvalue(),
-        )
+    sorted_products = sorted(
+        product_titles_by_id.items(),
+        key=lambda item: item[1].casefold(),
+    )
+    first_station_column = get_column_letter(2)
+    last_station_column = get_column_letter(len(ordered_stations) + 1)
+
+    def rows() -> Iterator[list[object]]:
+        yield ["Продукт", *[station.name for station in ordered_stations], "Всего"]
+        for row_index, (product_id, title) in enumerate(sorted_products, start=2):
+            yield [
+                title,
+                *[
+                    StyledValue(
+                        durations.get((product_id, station.uuid), 0) / 86_400,
+                        number_format=DURATION_FORMAT,
+                    )
+                    for station in ordered_stations
+                ],
+                StyledValue(
+                    f"=SUM({first_station_column}{row_index}:"
+                    f"{last_station_column}{row_index})",
+                    number_format=DURATION_FORMAT,
+                ),
+            ]
+
+    return write_xlsx("product-time", rows())
 
 
 def _product_state_cell(product: StationProduct | None) -> str:
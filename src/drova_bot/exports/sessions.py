@@ -2,16 +2,16 @@
 
 from __future__ import annotations
 
-import asyncio
 import csv
 import re
-from collections.abc import Mapping, Sequence
+from collections.abc import Iterator, Mapping, Sequence
 from datetime import datetime
-from io import BytesIO, StringIO
-from typing import cast
-
-from openpyxl import Workbook
-from openpyxl.worksheet.worksheet import Worksheet
+from io import StringIO, TextIOWrapper
+from itertools import chain
+from tempfile import SpooledTemporaryFile
+from typing import TextIO
+from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
+from zoneinfo import ZoneInfo
 
 from drova_bot.domain.formatters import (
     datetime_from_ms,
@@ -20,7 +20,21 @@ from drova_bot.domain.formatters import (
     sort_stations,
 )
 from drova_bot.domain.models import Session, Station
-from drova_bot.exports.models import ExportFile
+from drova_bot.exports.cache import (
+    ExportArtifactCache,
+    ExportCacheScope,
+    cached_export_artifact,
+    duration_clock,
+)
+from drova_bot.exports.executor import (
+    ExportExecutor,
+    Record,
+    ThreadExportExecutor,
+    pack_records,
+    unpack_records,
+)
+from drova_bot.exports.models import ExportFile, ExportKind
+from drova_bot.exports.xlsx import XLSX_CONTENT_TYPE, write_xlsx
 
 SESSION_EXPORT_HEADERS = [
     "station_name",
@@ -50,11 +64,21 @@ SESSION_EXPORT_HEADERS = [
     "sched_hints",
 ]
 
-XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+ZIP_CONTENT_TYPE = "application/zip"
+ZIP_SPOOL_MAX_BYTES = 8 * 1024 * 1024
 
 
 class SessionExportService:
+    def __init__(
+        self,
+        executor: ExportExecutor | None = None,
+        *,
+        cache: ExportArtifactCache | None = None,
+    ) -> None:
+        self._executor = executor or ThreadExportExecutor()
+        self._cache = cache
+
     async def build_sessions_xlsx(
         self,
         *,
@@ -63,14 +87,31 @@ class SessionExportService:
         product_catalog: Mapping[str, str],
         now: datetime,
         timezone: str,
+        cache_scope: ExportCacheScope | None = None,
     ) -> ExportFile:
-        return await asyncio.to_thread(
-            self._build_sessions_xlsx,
-            sessions,
-            stations,
-            product_catalog,
-            now,
-            timezone,
+        session_records = pack_records(Session, sessions)
+        station_records = pack_records(Station, stations)
+        catalog = dict(product_catalog)
+        artifact = await cached_export_artifact(
+            self._cache,
+            cache_scope,
+            ExportKind.SESSIONS,
+            timezone=timezone,
+            inputs=(session_records, station_records, catalog, duration_clock(sessions, now)),
+            now=now,
+            build=lambda: self._executor.run(
+                _sessions_xlsx_payload,
+                session_records,
+                station_records,
+                catalog,
+                now,
+                timezone,
+            ),
+        )
+        return ExportFile(
+            filename=self.sessions_filename(artifact.built_at),
+            content_type=XLSX_CONTENT_TYPE,
+            payload=artifact.payload,
         )
 
     async def build_sessions_csv_by_station(
@@ -82,81 +123,168 @@ class SessionExportService:
         now: datetime,
         timezone: str,
     ) -> list[ExportFile]:
-        return await asyncio.to_thread(
-            self._build_sessions_csv_by_station,
-            sessions,
-            stations,
-            product_catalog,
+        return await self._executor.run(
+            _build_sessions_csv_by_station,
+            pack_records(Session, sessions),
+            pack_records(Station, stations),
+            dict(product_catalog),
             now,
             timezone,
         )
 
-    @staticmethod
-    def sessions_filename(now: datetime) -> str:
-        return f"drova-sessions-{now.strftime('%Y%m%d-%H%M%S')}.xlsx"
-
-    @staticmethod
-    def station_csv_filename(station_name: str, now: datetime) -> str:
-        timestamp = now.strftime("%Y%m%d-%H%M%S")
-        return f"drova-sessions-{_sanitize_filename(station_name)}-{timestamp}.csv"
-
-    def _build_sessions_xlsx(
+    async def build_sessions_csv_zip(
         self,
+        *,
         sessions: Sequence[Session],
         stations: Sequence[Station],
         product_catalog: Mapping[str, str],
         now: datetime,
         timezone: str,
+        cache_scope: ExportCacheScope | None = None,
     ) -> ExportFile:
-        workbook = Workbook()
-        worksheet = cast(Worksheet, workbook.active)
-        worksheet.title = "sessions"
-        worksheet.append(SESSION_EXPORT_HEADERS)
-        for row in _session_rows(sessions, stations, product_catalog, now, timezone):
-            worksheet.append(row)
-
-        output = BytesIO()
-        workbook.save(output)
+        """The per-station CSVs of `build_sessions_csv_by_station` in one ZIP archive."""
+        session_records = pack_records(Session, sessions)
+        station_records = pack_records(Station, stations)
+        catalog = dict(product_catalog)
+        artifact = await cached_export_artifact(
+            self._cache,
+            cache_scope,
+            ExportKind.SESSIONS_CSV,
+            timezone=timezone,
+            inputs=(session_records, station_records, catalog, duration_clock(sessions, now)),
+            now=now,
+            build=lambda: self._executor.run(
+                _sessions_csv_zip_payload,
+                session_records,
+                station_records,
+                catalog,
+                now,
+                timezone,
+            ),
+        )
         return ExportFile(
-            filename=self.sessions_filename(now),
-            content_type=XLSX_CONTENT_TYPE,
-            payload=output.getvalue(),
+            filename=self.sessions_zip_filename(artifact.built_at),
+            content_type=ZIP_CONTENT_TYPE,
+            payload=artifact.payload,
         )
 
-    def _build_sessions_csv_by_station(
-        self,
-        sessions: Sequence[Session],
-        stations: Sequence[Station],
-        product_catalog: Mapping[str, str],
-        now: datetime,
-        timezone: str,
-    ) -> list[ExportFile]:
-        sessions_by_station: dict[str, list[Session]] = {station.uuid: [] for station in stations}
-        for session in sessions:
-            sessions_by_station.setdefault(session.server_id, []).append(session)
-
-        files: list[ExportFile] = []
-        for station in sort_stations(stations):
-            output = StringIO()
-            writer = csv.writer(output, lineterminator="\n")
-            writer.writerow(SESSION_EXPORT_HEADERS)
-            writer.writerows(
-                _session_rows(
-                    sessions_by_station.get(station.uuid, []),
-                    [station],
-                    product_catalog,
-                    now,
-                    timezone,
-                )
-            )
-            files.append(
-                ExportFile(
-                    filename=self.station_csv_filename(station.name, now),
-                    content_type=CSV_CONTENT_TYPE,
-                    payload=output.getvalue().encode("utf-8"),
-                )
+    @staticmethod
+    def sessions_filename(now: datetime) -> str:
+        return f"drova-sessions-{now.strftime('%Y%m%d-%H%M%S')}.xlsx"
+
+    @staticmethod
+    def sessions_zip_filename(now: datetime) -> str:
+        return f"drova-sessions-csv-{now.strftime('%Y%m%d-%H%M%S')}.zip"
+
+    @staticmethod
+    def station_csv_filename(station_name: str, now: datetime) -> str:
+        timestamp = now.strftime("%Y%m%d-%H%M%S")
+        return f"drova-sessions-{_sanitize_filename(station_name)}-{timestamp}.csv"
+
+
+def _sessions_xlsx_payload(
+    session_records: Sequence[Record],
+    station_records: Sequence[Record],
+    product_catalog: Mapping[str, str],
+    now: datetime,
+    timezone: str,
+) -> bytes:
+    rows = _session_rows(
+        unpack_records(Session, session_records),
+        unpack_records(Station, station_records),
+        product_catalog,
+        now,
+        timezone,
+    )
+    return write_xlsx("sessions", chain([SESSION_EXPORT_HEADERS], rows))
+
+
+def _build_sessions_csv_by_station(
+    session_records: Sequence[Record],
+    station_records: Sequence[Record],
+    product_catalog: Mapping[str, str],
+    now: datetime,
+    timezone: str,
+) -> list[ExportFile]:
+    files: list[ExportFile] = []
+    for station, sessions in _sessions_by_station(session_records, station_records):
+        output = StringIO()
+        _write_station_csv(output, station, sessions, product_catalog, now, timezone)
+        files.append(
+            ExportFile(
+                filename=SessionExportService.station_csv_filename(station.name, now),
+                content_type=CSV_CONTENT_TYPE,
+                payload=output.getvalue().encode("utf-8"),
             )
-        return files
+        )
+    return files
+
+
+def _sessions_csv_zip_payload(
+    session_records: Sequence[Record],
+    station_records: Sequence[Record],
+    product_catalog: Mapping[str, str],
+    now: datetime,
+    timezone: str,
+) -> bytes:
+    """Deflate each station's CSV straight into its archive member.
+
+    Rows are encoded and compressed as they are written, so no station's CSV exists as a
+    whole string; the archive itself is spooled like `write_xlsx` output. Member names
+    carry no timestamp (the archive's filename does), so equal inputs give equal bytes
+    up to the members' modification time.
+    """
+    timestamp = now.astimezone(ZoneInfo(timezone)).timetuple()[:6]
+    names: set[str] = set()
+    with SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_BYTES) as output:
+        with ZipFile(output, "w", compression=ZIP_DEFLATED) as archive:
+            for station, sessions in _sessions_by_station(session_records, station_records):
+                name = _unique_name(f"drova-sessions-{_sanitize_filename(station.name)}.csv", names)
+                member = ZipInfo(name, date_time=timestamp)
+                member.compress_type = ZIP_DEFLATED
+                with (
+                    archive.open(member, "w") as raw,
+                    TextIOWrapper(raw, encoding="utf-8", newline="") as text,
+                ):
+                    _write_station_csv(text, station, sessions, product_catalog, now, timezone)
+        output.seek(0)
+        return output.read()
+
+
+def _sessions_by_station(
+    session_records: Sequence[Record],
+    station_records: Sequence[Record],
+) -> Iterator[tuple[Station, list[Session]]]:
+    stations = unpack_records(Station, station_records)
+    sessions_by_station: dict[str, list[Session]] = {station.uuid: [] for station in stations}
+    for session in unpack_records(Session, session_records):
+        sessions_by_station.setdefault(session.server_id, []).append(session)
+    for station in sort_stations(stations):
+        yield station, sessions_by_station.get(station.uuid, [])
+
+
+def _write_station_csv(
+    output: TextIO,
+    station: Station,
+    sessions: Sequence[Session],
+    product_catalog: Mapping[str, str],
+    now: datetime,
+    timezone: str,
+) -> None:
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(SESSION_EXPORT_HEADERS)
+    writer.writerows(_session_rows(sessions, [station], product_catalog, now, timezone))
+
+
+def _unique_name(name: str, taken: set[str]) -> str:
+    """`name`, or `name` with a numeric suffix when two stations sanitize alike."""
+    stem, dot, suffix = name.rpartition(".")
+    candidate, index = name, 2
+    while candidate in taken:
+        candidate = f"{stem}-{index}{dot}{suffix}"
+        index += 1
+    taken.add(candidate)
+    return candidate
 
 
 def _session_rows(
@@ -165,9 +293,9 @@ def _session_rows(
     product_catalog: Mapping[str, str],
     now: datetime,
     timezone: str,
-) -> list[list[object]]:
+) -> Iterator[list[object]]:
+    """Export rows, newest session first, produced one at a time."""
     station_by_id = {station.uuid: station for station in stations}
-    rows: list[list[object]] = []
     for session in sorted(sessions, key=lambda item: item.created_on_ms, reverse=True):
         station = station_by_id.get(session.server_id)
         started = datetime_from_ms(session.created_on_ms, timezone)
@@ -176,36 +304,33 @@ def _session_rows(
             if session.finished_on_ms is not None
             else None
         )
-        rows.append(
-            [
-                station.name if station is not None else "",
-                product_catalog.get(session.product_id, "Неизвестная игра"),
-                session.creator_ip or "",
-                "",
-                "",
-                "",
-                started.strftime("%Y-%m-%d"),
-                format_export_duration(session_duration_seconds(session, now)),
-                started.strftime("%H:%M:%S"),
-                finished.strftime("%H:%M:%S") if finished is not None else "",
-                session.billing_type or "",
-                session.status or "",
-                "",
-                session.client_id or "",
-                session.uuid,
-                session.server_id,
-                session.merchant_id,
-                session.product_id,
-                session.created_on_ms,
-                session.finished_on_ms or "",
-                "",
-                "",
-                session.score_text or "",
-                "",
-                "",
-            ]
-        )
-    return rows
+        yield [
+            station.name if station is not None else "",
+            product_catalog.get(session.product_id, "Неизвестная игра"),
+            session.creator_ip or "",
+            "",
+            "",
+            "",
+            started.strftime("%Y-%m-%d"),
+            format_export_duration(session_duration_seconds(session, now)),
+            started.strftime("%H:%M:%S"),
+            finished.strftime("%H:%M:%S") if finished is not None else "",
+            session.billing_type or "",
+            session.status or "",
+            "",
+            session.client_id or "",
+            session.uuid,
+            session.server_id,
+            session.merchant_id,
+            session.product_id,
+            session.created_on_ms,
+            session.finished_on_ms or "",
+            "",
+            "",
+            session.score_text or "",
+            "",
+            "",
+        ]
 
 
 def _sanitize_filename(value: str) -> str:
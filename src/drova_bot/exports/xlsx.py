@@ -0,0 +1,53 @@
+"""Streaming XLSX writer shared by the export services."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+XLSX_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class StyledValue:
+    """Cell value with formatting, for rows passed to `write_xlsx`."""
+
+    value: str | float | None
+    fill: PatternFill | None = None
+    number_format: str | None = None
+
+
+def write_xlsx(title: str, rows: Iterable[Iterable[object]]) -> bytes:
+    """Write `rows` as a single-sheet workbook and return the file contents.
+
+    The workbook is in openpyxl write-only mode and `rows` is consumed lazily, so each
+    row is serialized as it arrives instead of keeping a cell object per value. The
+    archive is assembled in a `SpooledTemporaryFile` that moves to disk once it grows
+    past `XLSX_SPOOL_MAX_BYTES`.
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title)
+    for row in rows:
+        worksheet.append([_cell(worksheet, value) for value in row])
+    with SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES) as output:
+        workbook.save(output)
+        output.seek(0)
+        return output.read()
+
+
+def _cell(worksheet: WriteOnlyWorksheet, value: object) -> object:
+    if not isinstance(value, StyledValue):
+        return value
+    cell = WriteOnlyCell(worksheet, value=value.value)
+    if value.fill is not None:
+        cell.fill = value.fill
+    if value.number_format is not None:
+        cell.number_format = value.number_format
+    return cell
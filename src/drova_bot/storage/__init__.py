@@ -3,35 +3,60 @@
 from drova_bot.storage.database import (
     Base,
     ChatProfileRow,
+    DatabasePoolOptions,
     ExportJobRow,
+    ExportJobTargetRow,
     ProductCacheRow,
+    SessionRow,
+    SessionStationSyncRow,
+    SessionSyncStateRow,
+    SQLitePragmas,
     StationCacheRow,
+    TelegramFileRow,
     create_database_engine,
     create_schema,
     make_session_factory,
 )
 from drova_bot.storage.encryption import TokenEncryptor
 from drova_bot.storage.migrations.runner import run_migrations
+from drova_bot.storage.profile_cache import CachedChatProfile, ChatProfileCache
 from drova_bot.storage.repositories import (
+    CatalogUpsertResult,
     ChatProfileRepository,
     ExportJobRepository,
     ProductCacheRepository,
+    SessionRepository,
+    SessionSyncMarks,
     StationCacheRepository,
+    TelegramFileRepository,
 )
 from drova_bot.storage.uow import StorageUnitOfWork, StorageUnitOfWorkFactory
 
 __all__ = [
     "Base",
+    "CachedChatProfile",
+    "CatalogUpsertResult",
+    "ChatProfileCache",
     "ChatProfileRepository",
     "ChatProfileRow",
+    "DatabasePoolOptions",
     "ExportJobRepository",
     "ExportJobRow",
+    "ExportJobTargetRow",
     "ProductCacheRepository",
     "ProductCacheRow",
+    "SQLitePragmas",
+    "SessionRepository",
+    "SessionRow",
+    "SessionStationSyncRow",
+    "SessionSyncMarks",
+    "SessionSyncStateRow",
     "StationCacheRepository",
     "StationCacheRow",
     "StorageUnitOfWork",
     "StorageUnitOfWorkFactory",
+    "TelegramFileRepository",
+    "TelegramFileRow",
     "TokenEncryptor",
     "create_database_engine",
     "create_schema",
@@ -2,19 +2,24 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from typing import Any
 
 from sqlalchemy import (
     BigInteger,
     CheckConstraint,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     LargeBinary,
     String,
     Text,
     UniqueConstraint,
+    event,
 )
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -23,7 +28,11 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
-from drova_bot.domain.models import DEFAULT_SESSION_LIMIT, DEFAULT_TIMEZONE
+from drova_bot.domain.models import (
+    DEFAULT_CSV_BUNDLE_MODE,
+    DEFAULT_SESSION_LIMIT,
+    DEFAULT_TIMEZONE,
+)
 
 
 def utc_now() -> datetime:
@@ -53,6 +62,12 @@ class ChatProfileRow(Base):
         default=DEFAULT_SESSION_LIMIT,
     )
     timezone: Mapped[str] = mapped_column(String(64), nullable=False, default=DEFAULT_TIMEZONE)
+    csv_bundle_mode: Mapped[str] = mapped_column(
+        String(16),
+        nullable=False,
+        default=DEFAULT_CSV_BUNDLE_MODE,
+        server_default=DEFAULT_CSV_BUNDLE_MODE,
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=utc_now,
@@ -101,22 +116,184 @@ class ProductCacheRow(Base):
 
 class ExportJobRow(Base):
     __tablename__ = "export_jobs"
+    __table_args__ = (
+        Index("ix_export_jobs_status_created", "status", "created_at"),
+        Index("ix_export_jobs_dedup_key_status", "dedup_key", "status"),
+    )
 
     id: Mapped[str] = mapped_column(String(64), primary_key=True)
     telegram_chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
     kind: Mapped[str] = mapped_column(String(32), nullable=False)
     status: Mapped[str] = mapped_column(String(32), nullable=False)
+    dedup_key: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    progress_message_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=utc_now,
         nullable=False,
     )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     error_code: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
 
-def create_database_engine(database_url: str, *, echo: bool = False) -> AsyncEngine:
-    return create_async_engine(database_url, echo=echo)
+class ExportJobTargetRow(Base):
+    """Another request served by an in-flight export job with the same output."""
+
+    __tablename__ = "export_job_targets"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey("export_jobs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    telegram_chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    progress_message_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=utc_now,
+        nullable=False,
+    )
+
+
+class TelegramFileRow(Base):
+    """Telegram `file_id` of a document the bot uploaded, by hash of its filename and bytes."""
+
+    __tablename__ = "telegram_files"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    file_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=utc_now,
+        nullable=False,
+    )
+
+
+class SessionRow(Base):
+    """Local copy of Drova session history, synced incrementally per merchant."""
+
+    __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_merchant_server_created", "merchant_id", "server_id", "created_on_ms"),
+    )
+
+    uuid: Mapped[str] = mapped_column(String(64), primary_key=True)
+    merchant_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    server_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    product_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    client_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    creator_ip: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    created_on_ms: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    finished_on_ms: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    billing_type: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    status: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    score_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=utc_now,
+        nullable=False,
+    )
+
+
+class SessionSyncStateRow(Base):
+    __tablename__ = "session_sync_state"
+
+    merchant_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    full_synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    truncated_before_ms: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+
+
+class SessionStationSyncRow(Base):
+    """A station whose history was fetched on its own past a truncated first sync."""
+
+    __tablename__ = "session_station_sync"
+
+    merchant_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    server_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    backfilled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+@dataclass(frozen=True, slots=True)
+class SQLitePragmas:
+    """Per-connection SQLite tuning applied from the engine's `connect` event."""
+
+    journal_mode: str = "wal"
+    synchronous: str = "normal"
+    busy_timeout_ms: int = 5_000
+    mmap_size_bytes: int = 256 * 1024 * 1024
+    cache_size_kib: int = 16 * 1024
+    temp_store: str = "memory"
+    foreign_keys: bool = True
+
+    def statements(self) -> list[str]:
+        return [
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}",
+            f"PRAGMA mmap_size={int(self.mmap_size_bytes)}",
+            # A negative cache_size is a budget in KiB rather than in pages.
+            f"PRAGMA cache_size={-int(self.cache_size_kib)}",
+            f"PRAGMA temp_store={self.temp_store}",
+            f"PRAGMA foreign_keys={'ON' if self.foreign_keys else 'OFF'}",
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class DatabasePoolOptions:
+    """Connection pool sizing for server databases; ignored for SQLite."""
+
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_pre_ping: bool = True
+    pool_recycle_seconds: int = 1_800
+
+
+DEFAULT_SQLITE_PRAGMAS = SQLitePragmas()
+DEFAULT_POOL_OPTIONS = DatabasePoolOptions()
+
+
+def create_database_engine(
+    database_url: str,
+    *,
+    echo: bool = False,
+    sqlite_pragmas: SQLitePragmas | None = DEFAULT_SQLITE_PRAGMAS,
+    pool: DatabasePoolOptions = DEFAULT_POOL_OPTIONS,
+) -> AsyncEngine:
+    """Create the async engine with the production profile for its backend.
+
+    SQLite connections get `sqlite_pragmas` (pass None for SQLite defaults); other
+    backends get a sized, pre-pinged connection pool.
+    """
+    url = make_url(database_url)
+    if not url.drivername.startswith("sqlite"):
+        return create_async_engine(
+            url,
+            echo=echo,
+            pool_size=pool.pool_size,
+            max_overflow=pool.max_overflow,
+            pool_pre_ping=pool.pool_pre_ping,
+            pool_recycle=pool.pool_recycle_seconds,
+        )
+    engine = create_async_engine(url, echo=echo)
+    if sqlite_pragmas is not None:
+        statements = sqlite_pragmas.statements()
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def apply_pragmas(dbapi_connection: Any, _connection_record: object) -> None:
+            cursor = dbapi_connection.cursor()
+            try:
+                for statement in statements:
+                    cursor.execute(statement)
+            finally:
+                cursor.close()
+
+    return engine
 
 
 def make_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
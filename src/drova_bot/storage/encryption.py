@@ -2,25 +2,68 @@
 
 from __future__ import annotations
 
-from cryptography.fernet import Fernet, InvalidToken
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+
+DEFAULT_DECRYPT_CACHE_SIZE = 1024
 
 
 class TokenEncryptor:
-    """Fernet-backed encryption for Drova proxy tokens at rest."""
+    """Fernet-backed encryption for Drova proxy tokens at rest.
 
-    def __init__(self, secret_key: str) -> None:
-        self._fernet = Fernet(secret_key.encode("ascii"))
+    New tokens are encrypted with `secret_key`; `retired_keys` still decrypt tokens
+    written before a key rotation until `rotate` re-encrypts them. Recent
+    ciphertext-to-plaintext results are kept in a small LRU, so decrypting the same
+    stored token again skips the HMAC check and AES.
+    """
+
+    def __init__(
+        self,
+        secret_key: str,
+        *,
+        retired_keys: Iterable[str] = (),
+        cache_size: int = DEFAULT_DECRYPT_CACHE_SIZE,
+    ) -> None:
+        self._primary = Fernet(secret_key.encode("ascii"))
+        self._fernet = MultiFernet(
+            [self._primary, *(Fernet(key.encode("ascii")) for key in retired_keys)]
+        )
+        self._cache_size = cache_size
+        self._plaintexts: OrderedDict[bytes, str] = OrderedDict()
 
     @staticmethod
     def generate_key() -> str:
         return Fernet.generate_key().decode("ascii")
 
     def encrypt(self, token: str) -> bytes:
-        return self._fernet.encrypt(token.encode("utf-8"))
+        return self._primary.encrypt(token.encode("utf-8"))
 
     def decrypt(self, payload: bytes) -> str:
+        cached = self._plaintexts.get(payload)
+        if cached is not None:
+            self._plaintexts.move_to_end(payload)
+            return cached
         try:
-            return self._fernet.decrypt(payload).decode("utf-8")
+            token = self._fernet.decrypt(payload).decode("utf-8")
         except InvalidToken as exc:
             raise ValueError("stored token cannot be decrypted") from exc
+        if self._cache_size > 0:
+            self._plaintexts[payload] = token
+            while len(self._plaintexts) > self._cache_size:
+                self._plaintexts.popitem(last=False)
+        return token
 
+    def rotate(self, payload: bytes) -> bytes | None:
+        """Re-encrypt `payload` with the primary key; None when it already uses it."""
+        try:
+            self._primary.decrypt(payload)
+        except InvalidToken:
+            pass
+        else:
+            return None
+        try:
+            return self._fernet.rotate(payload)
+        except InvalidToken as exc:
+            raise ValueError("stored token cannot be decrypted") from exc
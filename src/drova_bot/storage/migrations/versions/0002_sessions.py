@@ -0,0 +1,48 @@
+"""Local session history."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002_sessions"
+down_revision: str | None = "0001_initial"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sessions",
+        sa.Column("uuid", sa.String(length=64), primary_key=True),
+        sa.Column("merchant_id", sa.String(length=255), nullable=False),
+        sa.Column("server_id", sa.String(length=255), nullable=False),
+        sa.Column("product_id", sa.String(length=255), nullable=False),
+        sa.Column("client_id", sa.String(length=255), nullable=True),
+        sa.Column("creator_ip", sa.String(length=64), nullable=True),
+        sa.Column("created_on_ms", sa.BigInteger(), nullable=False),
+        sa.Column("finished_on_ms", sa.BigInteger(), nullable=True),
+        sa.Column("billing_type", sa.String(length=32), nullable=True),
+        sa.Column("status", sa.String(length=32), nullable=True),
+        sa.Column("score_text", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_sessions_merchant_server_created",
+        "sessions",
+        ["merchant_id", "server_id", "created_on_ms"],
+    )
+    op.create_table(
+        "session_sync_state",
+        sa.Column("merchant_id", sa.String(length=255), primary_key=True),
+        sa.Column("full_synced_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_synced_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("session_sync_state")
+    op.drop_index("ix_sessions_merchant_server_created", table_name="sessions")
+    op.drop_table("sessions")
@@ -0,0 +1,31 @@
+"""Export job queue bookkeeping."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003_export_job_queue"
+down_revision: str | None = "0002_sessions"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("export_jobs") as batch:
+        batch.add_column(sa.Column("progress_message_id", sa.BigInteger(), nullable=True))
+        batch.add_column(
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0"))
+        )
+        batch.add_column(sa.Column("started_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_export_jobs_status_created", "export_jobs", ["status", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_jobs_status_created", table_name="export_jobs")
+    with op.batch_alter_table("export_jobs") as batch:
+        batch.drop_column("started_at")
+        batch.drop_column("attempts")
+        batch.drop_column("progress_message_id")
@@ -0,0 +1,41 @@
+"""Deduplicated export job delivery targets."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004_export_job_targets"
+down_revision: str | None = "0003_export_job_queue"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("export_jobs") as batch:
+        batch.add_column(sa.Column("dedup_key", sa.String(length=255), nullable=True))
+    op.create_index("ix_export_jobs_dedup_key_status", "export_jobs", ["dedup_key", "status"])
+    op.create_table(
+        "export_job_targets",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "job_id",
+            sa.String(length=64),
+            sa.ForeignKey("export_jobs.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("telegram_chat_id", sa.BigInteger(), nullable=False),
+        sa.Column("progress_message_id", sa.BigInteger(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_export_job_targets_job_id", "export_job_targets", ["job_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_job_targets_job_id", table_name="export_job_targets")
+    op.drop_table("export_job_targets")
+    op.drop_index("ix_export_jobs_dedup_key_status", table_name="export_jobs")
+    with op.batch_alter_table("export_jobs") as batch:
+        batch.drop_column("dedup_key")
@@ -0,0 +1,27 @@
+"""Telegram file ids of uploaded export documents."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005_telegram_files"
+down_revision: str | None = "0004_export_job_targets"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "telegram_files",
+        sa.Column("content_hash", sa.String(length=64), primary_key=True),
+        sa.Column("file_id", sa.String(length=255), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("telegram_files")
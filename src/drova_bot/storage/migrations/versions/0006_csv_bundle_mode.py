@@ -0,0 +1,30 @@
+"""Per-chat bundling of per-station CSV exports."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006_csv_bundle_mode"
+down_revision: str | None = "0005_telegram_files"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("chat_profiles") as batch:
+        batch.add_column(
+            sa.Column(
+                "csv_bundle_mode",
+                sa.String(length=16),
+                nullable=False,
+                server_default="auto",
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("chat_profiles") as batch:
+        batch.drop_column("csv_bundle_mode")
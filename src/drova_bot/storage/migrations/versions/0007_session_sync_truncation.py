@@ -0,0 +1,23 @@
+"""Where a capped first session sync stopped."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007_session_sync_truncation"
+down_revision: str | None = "0006_csv_bundle_mode"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("session_sync_state") as batch:
+        batch.add_column(sa.Column("truncated_before_ms", sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("session_sync_state") as batch:
+        batch.drop_column("truncated_before_ms")
@@ -0,0 +1,26 @@
+"""Stations backfilled past a truncated first session sync."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008_session_station_sync"
+down_revision: str | None = "0007_session_sync_truncation"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "session_station_sync",
+        sa.Column("merchant_id", sa.String(length=255), primary_key=True),
+        sa.Column("server_id", sa.String(length=255), primary_key=True),
+        sa.Column("backfilled_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("session_station_sync")
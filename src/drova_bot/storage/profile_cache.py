@@ -0,0 +1,92 @@
+"""In-process cache of chat profiles and their decrypted Drova tokens."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from drova_bot.domain.models import ChatProfile
+
+DEFAULT_PROFILE_CACHE_TTL_SECONDS = 300.0
+DEFAULT_PROFILE_CACHE_MAX_ENTRIES = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class CachedChatProfile:
+    profile: ChatProfile
+    # Plaintext when the repository already knows it (it wrote the token); otherwise
+    # None and decrypted from `profile.encrypted_proxy_token` when asked for.
+    proxy_token: str | None
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: CachedChatProfile
+    expires_at: float
+
+
+class ChatProfileCache:
+    """Bounded LRU of `CachedChatProfile` keyed by Telegram chat id, with a TTL.
+
+    `ChatProfileRepository` fills it on reads and writes committed changes through it.
+    Every write invalidates the chat first; a value read from storage before that
+    invalidation is refused by `put`, so a slow reader cannot resurrect a stale profile.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = DEFAULT_PROFILE_CACHE_TTL_SECONDS,
+        max_entries: int = DEFAULT_PROFILE_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._generation = 0
+        self._invalidated_at: OrderedDict[int, int] = OrderedDict()
+        # Generation of the newest invalidation forgotten from `_invalidated_at`.
+        self._invalidated_floor = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        """Token to pass to `put` for a value about to be read from storage."""
+        return self._generation
+
+    def get(self, telegram_chat_id: int) -> CachedChatProfile | None:
+        entry = self._entries.get(telegram_chat_id)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            del self._entries[telegram_chat_id]
+            return None
+        self._entries.move_to_end(telegram_chat_id)
+        return entry.value
+
+    def put(self, value: CachedChatProfile, *, generation: int) -> bool:
+        """Store `value` unless its chat was invalidated after `generation`."""
+        chat_id = value.profile.telegram_chat_id
+        if self._invalidated_at.get(chat_id, self._invalidated_floor) > generation:
+            return False
+        self._entries[chat_id] = _Entry(value=value, expires_at=self._clock() + self._ttl_seconds)
+        self._entries.move_to_end(chat_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, telegram_chat_id: int) -> int:
+        """Drop the chat's entry; returns the generation a later write-through must use."""
+        self._generation += 1
+        self._entries.pop(telegram_chat_id, None)
+        self._invalidated_at[telegram_chat_id] = self._generation
+        self._invalidated_at.move_to_end(telegram_chat_id)
+        while len(self._invalidated_at) > self._max_entries:
+            _, forgotten = self._invalidated_at.popitem(last=False)
+            self._invalidated_floor = max(self._invalidated_floor, forgotten)
+        return self._generation
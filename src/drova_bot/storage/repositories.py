@@ -3,34 +3,110 @@
 from __future__ import annotations
 
 from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
 from datetime import UTC, datetime
-
-from sqlalchemy import delete, select
+from typing import Any, cast
+
+from sqlalchemy import (
+    BigInteger,
+    CursorResult,
+    DateTime,
+    String,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from drova_bot.domain.formatters import normalize_session_limit
-from drova_bot.domain.models import DEFAULT_TIMEZONE, CatalogProduct, ChatProfile, Station
+from drova_bot.domain.formatters import normalize_csv_bundle_mode, normalize_session_limit
+from drova_bot.domain.models import (
+    DEFAULT_TIMEZONE,
+    CatalogProduct,
+    ChatProfile,
+    Session,
+    Station,
+)
 from drova_bot.storage.database import (
     ChatProfileRow,
     ExportJobRow,
+    ExportJobTargetRow,
     ProductCacheRow,
+    SessionRow,
+    SessionStationSyncRow,
+    SessionSyncStateRow,
     StationCacheRow,
+    TelegramFileRow,
 )
 from drova_bot.storage.encryption import TokenEncryptor
+from drova_bot.storage.profile_cache import CachedChatProfile, ChatProfileCache
+
+CATALOG_UPSERT_CHUNK_SIZE = 200
+SESSION_UPSERT_CHUNK_SIZE = 200
+
+
+class _Unchanged:
+    pass
+
+
+_UNCHANGED = _Unchanged()
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogUpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class SessionSyncMarks:
+    newest_created_on_ms: int | None = None
+    oldest_open_created_on_ms: int | None = None
+    full_synced: bool = False
+    truncated_before_ms: int | None = None
 
 
 class ChatProfileRepository:
-    def __init__(self, session: AsyncSession, encryptor: TokenEncryptor | None = None) -> None:
+    """Chat profiles, optionally read through and written through a `ChatProfileCache`.
+
+    Mutators invalidate the cached chat immediately and hold the new value until the
+    unit of work commits (`publish_cached`) or rolls back (`discard_cached`).
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        encryptor: TokenEncryptor | None = None,
+        cache: ChatProfileCache | None = None,
+    ) -> None:
         self._session = session
         self._encryptor = encryptor
+        self._cache = cache if encryptor is not None else None
+        self._pending: dict[int, tuple[CachedChatProfile, int]] = {}
 
     async def get(self, telegram_chat_id: int) -> ChatProfile | None:
+        cached = self._cached(telegram_chat_id)
+        if cached is not None:
+            return cached.profile
+        generation = self._cache.generation if self._cache is not None else 0
         row = await self._session.get(ChatProfileRow, telegram_chat_id)
         if row is None:
             return None
-        return self._to_domain(row)
+        if self._cache is None:
+            return self._to_domain(row)
+        return self._remember(row, generation).profile
 
     async def get_or_create(self, telegram_chat_id: int) -> ChatProfile:
+        cached = self._cached(telegram_chat_id)
+        if cached is not None:
+            return cached.profile
+        generation = self._cache.generation if self._cache is not None else 0
         row = await self._session.get(ChatProfileRow, telegram_chat_id)
         if row is None:
             row = ChatProfileRow(
@@ -40,7 +116,10 @@ class ChatProfileRepository:
             )
             self._session.add(row)
             await self._session.flush()
-        return self._to_domain(row)
+            return self._written(row, proxy_token=None).profile
+        if self._cache is None:
+            return self._to_domain(row)
+        return self._remember(row, generation).profile
 
     async def connect_token(
         self,
@@ -53,12 +132,13 @@ class ChatProfileRepository:
         row.drova_user_id = drova_user_id
         row.encrypted_proxy_token = self._encrypt(proxy_token)
         await self._session.flush()
-        return self._to_domain(row)
+        return self._written(row, proxy_token=proxy_token).profile
 
     async def update_token(self, telegram_chat_id: int, proxy_token: str) -> None:
         row = await self._get_or_create_row(telegram_chat_id)
         row.encrypted_proxy_token = self._encrypt(proxy_token)
         await self._session.flush()
+        self._written(row, proxy_token=proxy_token)
 
     async def set_selected_station(
         self,
@@ -68,13 +148,19 @@ class ChatProfileRepository:
         row = await self._get_or_create_row(telegram_chat_id)
         row.selected_station_id = station_id
         await self._session.flush()
-        return self._to_domain(row)
+        return self._written(row).profile
 
     async def set_session_limit(self, telegram_chat_id: int, limit: int) -> ChatProfile:
         row = await self._get_or_create_row(telegram_chat_id)
         row.session_limit = normalize_session_limit(limit)
         await self._session.flush()
-        return self._to_domain(row)
+        return self._written(row).profile
+
+    async def set_csv_bundle_mode(self, telegram_chat_id: int, mode: str) -> ChatProfile:
+        row = await self._get_or_create_row(telegram_chat_id)
+        row.csv_bundle_mode = normalize_csv_bundle_mode(mode)
+        await self._session.flush()
+        return self._written(row).profile
 
     async def logout(self, telegram_chat_id: int) -> ChatProfile:
         row = await self._get_or_create_row(telegram_chat_id)
@@ -82,15 +168,85 @@ class ChatProfileRepository:
         row.encrypted_proxy_token = None
         row.selected_station_id = None
         await self._session.flush()
-        return self._to_domain(row)
+        return self._written(row, proxy_token=None).profile
 
     async def decrypt_token(self, telegram_chat_id: int) -> str | None:
         if self._encryptor is None:
             raise RuntimeError("TokenEncryptor is required to decrypt tokens")
-        row = await self._session.get(ChatProfileRow, telegram_chat_id)
-        if row is None or row.encrypted_proxy_token is None:
+        cached = self._cached(telegram_chat_id)
+        if cached is not None:
+            return self._cached_token(cached)
+        generation = self._cache.generation if self._cache is not None else 0
+        # Always reload: a request-scoped session may hold a row loaded before another
+        # task renewed the token, and a stale token costs a second 401 round-trip.
+        row = await self._session.get(ChatProfileRow, telegram_chat_id, populate_existing=True)
+        if row is None:
             return None
-        return self._encryptor.decrypt(row.encrypted_proxy_token)
+        if self._cache is None:
+            return self._decrypt_row_token(row)
+        return self._cached_token(self._remember(row, generation))
+
+    async def chat_id_for_merchant(self, drova_user_id: str) -> int | None:
+        """Some connected chat of the Drova account, for background work on its behalf."""
+        chat_id: int | None = await self._session.scalar(
+            select(ChatProfileRow.telegram_chat_id)
+            .where(
+                ChatProfileRow.drova_user_id == drova_user_id,
+                ChatProfileRow.encrypted_proxy_token.is_not(None),
+            )
+            .order_by(ChatProfileRow.updated_at.desc())
+            .limit(1)
+        )
+        return chat_id
+
+    async def encrypted_tokens_after(
+        self,
+        telegram_chat_id: int | None,
+        *,
+        limit: int,
+    ) -> list[tuple[int, bytes]]:
+        """Next `limit` stored tokens ordered by chat id, for batched maintenance."""
+        statement = (
+            select(ChatProfileRow.telegram_chat_id, ChatProfileRow.encrypted_proxy_token)
+            .where(ChatProfileRow.encrypted_proxy_token.is_not(None))
+            .order_by(ChatProfileRow.telegram_chat_id)
+            .limit(limit)
+        )
+        if telegram_chat_id is not None:
+            statement = statement.where(ChatProfileRow.telegram_chat_id > telegram_chat_id)
+        result = await self._session.execute(statement)
+        return [(chat_id, payload) for chat_id, payload in result.tuples() if payload is not None]
+
+    async def replace_encrypted_token(
+        self,
+        telegram_chat_id: int,
+        *,
+        expected: bytes,
+        replacement: bytes,
+    ) -> bool:
+        """Swap the stored ciphertext unless the token changed since it was read."""
+        result = await self._session.execute(
+            update(ChatProfileRow)
+            .where(
+                ChatProfileRow.telegram_chat_id == telegram_chat_id,
+                ChatProfileRow.encrypted_proxy_token == expected,
+            )
+            .values(encrypted_proxy_token=replacement)
+            .execution_options(synchronize_session=False)
+        )
+        if self._cache is not None:
+            self._cache.invalidate(telegram_chat_id)
+        return cast(CursorResult[Any], result).rowcount > 0
+
+    def publish_cached(self) -> None:
+        """Write values changed by this repository through to the cache after commit."""
+        if self._cache is not None:
+            for value, generation in self._pending.values():
+                self._cache.put(value, generation=generation)
+        self._pending.clear()
+
+    def discard_cached(self) -> None:
+        self._pending.clear()
 
     async def _get_or_create_row(self, telegram_chat_id: int) -> ChatProfileRow:
         row = await self._session.get(ChatProfileRow, telegram_chat_id)
@@ -104,6 +260,58 @@ class ChatProfileRepository:
             await self._session.flush()
         return row
 
+    def _cached(self, telegram_chat_id: int) -> CachedChatProfile | None:
+        pending = self._pending.get(telegram_chat_id)
+        if pending is not None:
+            return pending[0]
+        if self._cache is None:
+            return None
+        return self._cache.get(telegram_chat_id)
+
+    def _remember(self, row: ChatProfileRow, generation: int) -> CachedChatProfile:
+        # The token is decrypted on demand: a profile whose ciphertext no longer decrypts
+        # must stay readable for everything that does not talk to Drova.
+        value = CachedChatProfile(self._to_domain(row), None)
+        if self._cache is not None:
+            self._cache.put(value, generation=generation)
+        return value
+
+    def _written(
+        self,
+        row: ChatProfileRow,
+        *,
+        proxy_token: str | None | _Unchanged = _UNCHANGED,
+    ) -> CachedChatProfile:
+        if self._cache is None:
+            return CachedChatProfile(self._to_domain(row), None)
+        if isinstance(proxy_token, _Unchanged):
+            cached = self._cached(row.telegram_chat_id)
+            token = (
+                cached.proxy_token
+                if cached is not None
+                and cached.profile.encrypted_proxy_token == row.encrypted_proxy_token
+                else None
+            )
+        else:
+            token = proxy_token
+        value = CachedChatProfile(self._to_domain(row), token)
+        generation = self._cache.invalidate(row.telegram_chat_id)
+        self._pending[row.telegram_chat_id] = (value, generation)
+        return value
+
+    def _cached_token(self, value: CachedChatProfile) -> str | None:
+        if value.proxy_token is not None:
+            return value.proxy_token
+        return self._decrypt(value.profile.encrypted_proxy_token)
+
+    def _decrypt_row_token(self, row: ChatProfileRow) -> str | None:
+        return self._decrypt(row.encrypted_proxy_token)
+
+    def _decrypt(self, payload: bytes | None) -> str | None:
+        if self._encryptor is None or payload is None:
+            return None
+        return self._encryptor.decrypt(payload)
+
     def _encrypt(self, token: str) -> bytes:
         if self._encryptor is None:
             raise RuntimeError("TokenEncryptor is required to store tokens")
@@ -118,6 +326,7 @@ class ChatProfileRepository:
             selected_station_id=row.selected_station_id,
             session_limit=row.session_limit,
             timezone=row.timezone,
+            csv_bundle_mode=normalize_csv_bundle_mode(row.csv_bundle_mode),
         )
 
 
@@ -125,21 +334,48 @@ class StationCacheRepository:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
 
-    async def replace_for_chat(self, telegram_chat_id: int, stations: Iterable[Station]) -> None:
-        await self._session.execute(
-            delete(StationCacheRow).where(StationCacheRow.telegram_chat_id == telegram_chat_id)
+    async def replace_for_chat(self, telegram_chat_id: int, stations: Iterable[Station]) -> bool:
+        """Make the chat's cached stations match `stations`; False when nothing changed.
+
+        Only inserts, renames and removals are written, so an unchanged list costs one
+        SELECT and takes no write lock.
+        """
+        wanted = {station.uuid: station.name for station in stations}
+        result = await self._session.execute(
+            select(StationCacheRow).where(StationCacheRow.telegram_chat_id == telegram_chat_id)
         )
-        updated_at = datetime.now(tz=UTC)
-        for station in stations:
-            self._session.add(
-                StationCacheRow(
-                    telegram_chat_id=telegram_chat_id,
-                    station_id=station.uuid,
-                    station_name=station.name,
-                    updated_at=updated_at,
+        existing = {row.station_id: row for row in result.scalars()}
+        changed = False
+        removed = existing.keys() - wanted.keys()
+        if removed:
+            await self._session.execute(
+                delete(StationCacheRow).where(
+                    StationCacheRow.telegram_chat_id == telegram_chat_id,
+                    StationCacheRow.station_id.in_(removed),
                 )
             )
-        await self._session.flush()
+            changed = True
+        updated_at = datetime.now(tz=UTC)
+        for station_id, station_name in wanted.items():
+            row = existing.get(station_id)
+            if row is None:
+                self._session.add(
+                    StationCacheRow(
+                        telegram_chat_id=telegram_chat_id,
+                        station_id=station_id,
+                        station_name=station_name,
+                        updated_at=updated_at,
+                    )
+                )
+            elif row.station_name != station_name:
+                row.station_name = station_name
+                row.updated_at = updated_at
+            else:
+                continue
+            changed = True
+        if changed:
+            await self._session.flush()
+        return changed
 
     async def station_names(self, telegram_chat_id: int) -> dict[str, str]:
         result = await self._session.execute(
@@ -164,34 +400,294 @@ class ProductCacheRepository:
         products: Iterable[CatalogProduct],
         *,
         payload_by_product_id: Mapping[str, str] | None = None,
-    ) -> None:
+        chunk_size: int = CATALOG_UPSERT_CHUNK_SIZE,
+    ) -> CatalogUpsertResult:
+        """Insert new products and update changed ones in chunked bulk statements.
+
+        Rows whose title (and payload, when one is given) already match are not written.
+        A missing payload keeps the stored one.
+        """
         updated_at = datetime.now(tz=UTC)
+        latest: dict[str, dict[str, object]] = {}
         for product in products:
-            row = await self._session.get(ProductCacheRow, product.product_id)
-            payload_json = (
-                payload_by_product_id.get(product.product_id) if payload_by_product_id else None
+            latest[product.product_id] = {
+                "product_id": product.product_id,
+                "title": product.title,
+                "payload_json": (
+                    payload_by_product_id.get(product.product_id)
+                    if payload_by_product_id
+                    else None
+                ),
+                "updated_at": updated_at,
+            }
+        inserted = updated = unchanged = 0
+        rows = list(latest.values())
+        for start in range(0, len(rows), max(1, chunk_size)):
+            chunk = rows[start : start + max(1, chunk_size)]
+            result = await self._session.execute(
+                select(
+                    ProductCacheRow.product_id,
+                    ProductCacheRow.title,
+                    ProductCacheRow.payload_json,
+                ).where(ProductCacheRow.product_id.in_([row["product_id"] for row in chunk]))
             )
-            if row is None:
-                self._session.add(
-                    ProductCacheRow(
-                        product_id=product.product_id,
-                        title=product.title,
-                        payload_json=payload_json,
-                        updated_at=updated_at,
-                    )
-                )
-            else:
-                row.title = product.title
-                if payload_json is not None:
-                    row.payload_json = payload_json
-                row.updated_at = updated_at
+            stored = {product_id: (title, payload) for product_id, title, payload in result}
+            changed = []
+            for row in chunk:
+                current = stored.get(str(row["product_id"]))
+                if current is None:
+                    inserted += 1
+                elif current[0] != row["title"] or (
+                    row["payload_json"] is not None and current[1] != row["payload_json"]
+                ):
+                    updated += 1
+                else:
+                    unchanged += 1
+                    continue
+                changed.append(row)
+            if changed:
+                await self._write_catalog_rows(changed)
         await self._session.flush()
+        return CatalogUpsertResult(inserted=inserted, updated=updated, unchanged=unchanged)
+
+    async def _write_catalog_rows(self, rows: list[dict[str, object]]) -> None:
+        dialect = self._session.get_bind().dialect.name
+        if dialect == "sqlite":
+            sqlite_statement = sqlite_insert(ProductCacheRow).values(rows)
+            await self._session.execute(
+                sqlite_statement.on_conflict_do_update(
+                    index_elements=[ProductCacheRow.product_id],
+                    set_=_catalog_conflict_updates(sqlite_statement.excluded),
+                )
+            )
+        elif dialect == "postgresql":
+            postgresql_statement = postgresql_insert(ProductCacheRow).values(rows)
+            await self._session.execute(
+                postgresql_statement.on_conflict_do_update(
+                    index_elements=[ProductCacheRow.product_id],
+                    set_=_catalog_conflict_updates(postgresql_statement.excluded),
+                )
+            )
+        else:
+            for row in rows:
+                await self._session.merge(ProductCacheRow(**row))
 
     async def title_map(self) -> dict[str, str]:
         result = await self._session.execute(select(ProductCacheRow))
         return {row.product_id: row.title for row in result.scalars()}
 
 
+def _catalog_conflict_updates(excluded: Any) -> dict[str, Any]:
+    return {
+        "title": excluded.title,
+        "payload_json": func.coalesce(excluded.payload_json, ProductCacheRow.payload_json),
+        "updated_at": excluded.updated_at,
+    }
+
+
+class SessionRepository:
+    """Locally stored Drova sessions, keyed by session uuid and grouped by merchant."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def upsert_many(
+        self,
+        merchant_id: str,
+        sessions: Iterable[Session],
+        *,
+        chunk_size: int = SESSION_UPSERT_CHUNK_SIZE,
+    ) -> int:
+        """Insert or refresh `sessions` under `merchant_id`; returns the number written."""
+        updated_at = datetime.now(tz=UTC)
+        latest: dict[str, dict[str, object]] = {
+            session.uuid: {
+                "uuid": session.uuid,
+                "merchant_id": merchant_id,
+                "server_id": session.server_id,
+                "product_id": session.product_id,
+                "client_id": session.client_id,
+                "creator_ip": session.creator_ip,
+                "created_on_ms": session.created_on_ms,
+                "finished_on_ms": session.finished_on_ms,
+                "billing_type": session.billing_type,
+                "status": session.status,
+                "score_text": session.score_text,
+                "updated_at": updated_at,
+            }
+            for session in sessions
+        }
+        rows = list(latest.values())
+        for start in range(0, len(rows), max(1, chunk_size)):
+            await self._write_session_rows(rows[start : start + max(1, chunk_size)])
+        await self._session.flush()
+        return len(rows)
+
+    async def sync_marks(self, merchant_id: str, *, open_since_ms: int) -> SessionSyncMarks:
+        """Where an incremental sync must reach back to; empty until a full sync finished.
+
+        `oldest_open_created_on_ms` only considers sessions created after `open_since_ms`.
+        """
+        state = await self._session.get(SessionSyncStateRow, merchant_id)
+        if state is None:
+            return SessionSyncMarks()
+        newest = await self._session.scalar(
+            select(func.max(SessionRow.created_on_ms)).where(
+                SessionRow.merchant_id == merchant_id
+            )
+        )
+        oldest_open = await self._session.scalar(
+            select(func.min(SessionRow.created_on_ms)).where(
+                SessionRow.merchant_id == merchant_id,
+                SessionRow.finished_on_ms.is_(None),
+                SessionRow.created_on_ms >= open_since_ms,
+            )
+        )
+        return SessionSyncMarks(
+            newest_created_on_ms=newest,
+            oldest_open_created_on_ms=oldest_open,
+            full_synced=True,
+            truncated_before_ms=state.truncated_before_ms,
+        )
+
+    async def station_backfilled(self, merchant_id: str, server_id: str) -> bool:
+        row = await self._session.get(SessionStationSyncRow, (merchant_id, server_id))
+        return row is not None
+
+    async def mark_station_backfilled(self, merchant_id: str, server_id: str) -> None:
+        await self._session.merge(
+            SessionStationSyncRow(
+                merchant_id=merchant_id,
+                server_id=server_id,
+                backfilled_at=datetime.now(tz=UTC),
+            )
+        )
+        await self._session.flush()
+
+    async def mark_synced(
+        self,
+        merchant_id: str,
+        *,
+        full: bool,
+        truncated_before_ms: int | None = None,
+    ) -> None:
+        """Record a completed sync.
+
+        A full sync that stopped at its row cap passes `truncated_before_ms`: sessions
+        created before it were not fetched.
+        """
+        synced_at = datetime.now(tz=UTC)
+        state = await self._session.get(SessionSyncStateRow, merchant_id)
+        if state is None:
+            if not full:
+                raise ValueError("incremental sync before a full sync")
+            self._session.add(
+                SessionSyncStateRow(
+                    merchant_id=merchant_id,
+                    full_synced_at=synced_at,
+                    last_synced_at=synced_at,
+                    truncated_before_ms=truncated_before_ms,
+                )
+            )
+        else:
+            if full:
+                state.full_synced_at = synced_at
+                state.truncated_before_ms = truncated_before_ms
+            state.last_synced_at = synced_at
+        await self._session.flush()
+
+    async def count(self, merchant_id: str, server_id: str | None = None) -> int:
+        statement = select(func.count()).select_from(SessionRow).where(
+            SessionRow.merchant_id == merchant_id
+        )
+        if server_id is not None:
+            statement = statement.where(SessionRow.server_id == server_id)
+        return int(await self._session.scalar(statement) or 0)
+
+    async def list_recent(
+        self,
+        merchant_id: str,
+        server_id: str | None = None,
+        *,
+        limit: int | None = None,
+    ) -> list[Session]:
+        """Stored sessions newest first, as Drova returns them."""
+        statement = (
+            select(*_SESSION_COLUMNS)
+            .where(SessionRow.merchant_id == merchant_id)
+            .order_by(SessionRow.created_on_ms.desc(), SessionRow.uuid)
+        )
+        if server_id is not None:
+            statement = statement.where(SessionRow.server_id == server_id)
+        if limit is not None:
+            statement = statement.limit(limit)
+        result = await self._session.execute(statement)
+        return [Session(*row) for row in result.tuples()]
+
+    async def merchant_ids(self) -> list[str]:
+        """Merchants whose history has been fully synced at least once."""
+        result = await self._session.execute(
+            select(SessionSyncStateRow.merchant_id).order_by(SessionSyncStateRow.merchant_id)
+        )
+        return list(result.scalars())
+
+    async def _write_session_rows(self, rows: list[dict[str, object]]) -> None:
+        dialect = self._session.get_bind().dialect.name
+        if dialect == "sqlite":
+            sqlite_statement = sqlite_insert(SessionRow).values(rows)
+            await self._session.execute(
+                sqlite_statement.on_conflict_do_update(
+                    index_elements=[SessionRow.uuid],
+                    set_=_session_conflict_updates(sqlite_statement.excluded),
+                )
+            )
+        elif dialect == "postgresql":
+            postgresql_statement = postgresql_insert(SessionRow).values(rows)
+            await self._session.execute(
+                postgresql_statement.on_conflict_do_update(
+                    index_elements=[SessionRow.uuid],
+                    set_=_session_conflict_updates(postgresql_statement.excluded),
+                )
+            )
+        else:
+            for row in rows:
+                await self._session.merge(SessionRow(**row))
+
+
+# Column order matches the `Session` dataclass fields.
+_SESSION_COLUMNS = (
+    SessionRow.uuid,
+    SessionRow.server_id,
+    SessionRow.merchant_id,
+    SessionRow.product_id,
+    SessionRow.client_id,
+    SessionRow.creator_ip,
+    SessionRow.created_on_ms,
+    SessionRow.finished_on_ms,
+    SessionRow.billing_type,
+    SessionRow.status,
+    SessionRow.score_text,
+)
+
+
+def _session_conflict_updates(excluded: Any) -> dict[str, Any]:
+    return {
+        column: getattr(excluded, column)
+        for column in (
+            "merchant_id",
+            "server_id",
+            "product_id",
+            "client_id",
+            "creator_ip",
+            "finished_on_ms",
+            "billing_type",
+            "status",
+            "score_text",
+            "updated_at",
+        )
+    }
+
+
 class ExportJobRepository:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
@@ -202,12 +698,17 @@ class ExportJobRepository:
         job_id: str,
         telegram_chat_id: int,
         kind: str,
+        progress_message_id: int | None = None,
+        dedup_key: str | None = None,
     ) -> ExportJobRow:
         row = ExportJobRow(
             id=job_id,
             telegram_chat_id=telegram_chat_id,
             kind=kind,
             status="queued",
+            dedup_key=dedup_key,
+            progress_message_id=progress_message_id,
+            attempts=0,
             created_at=datetime.now(tz=UTC),
         )
         self._session.add(row)
@@ -217,6 +718,119 @@ class ExportJobRepository:
     async def get(self, job_id: str) -> ExportJobRow | None:
         return await self._session.get(ExportJobRow, job_id)
 
+    async def find_in_flight(self, dedup_key: str) -> ExportJobRow | None:
+        """Oldest queued or running job created with `dedup_key`."""
+        row: ExportJobRow | None = await self._session.scalar(
+            select(ExportJobRow)
+            .where(
+                ExportJobRow.dedup_key == dedup_key,
+                ExportJobRow.status.in_(("queued", "running")),
+            )
+            .order_by(ExportJobRow.created_at, ExportJobRow.id)
+            .limit(1)
+        )
+        return row
+
+    async def attach_target(
+        self,
+        job_id: str,
+        *,
+        telegram_chat_id: int,
+        progress_message_id: int | None = None,
+    ) -> bool:
+        """Add a delivery target to `job_id` if the job is still queued or running.
+
+        The status check is part of the INSERT, so a job that finished after
+        `find_in_flight` returned it is not attached to; the caller gets False and creates
+        its own job instead.
+        """
+        in_flight = exists().where(
+            ExportJobRow.id == job_id,
+            ExportJobRow.status.in_(("queued", "running")),
+        )
+        result = await self._session.execute(
+            insert(ExportJobTargetRow).from_select(
+                ["job_id", "telegram_chat_id", "progress_message_id", "created_at"],
+                select(
+                    literal(job_id, String(64)),
+                    literal(telegram_chat_id, BigInteger()),
+                    literal(progress_message_id, BigInteger()),
+                    literal(datetime.now(tz=UTC), DateTime(timezone=True)),
+                ).where(in_flight),
+            )
+        )
+        return cast(CursorResult[Any], result).rowcount == 1
+
+    async def targets(self, job_id: str) -> list[ExportJobTargetRow]:
+        rows = await self._session.scalars(
+            select(ExportJobTargetRow)
+            .where(ExportJobTargetRow.job_id == job_id)
+            .order_by(ExportJobTargetRow.id)
+        )
+        return list(rows)
+
+    async def claim_next(self, *, excluded_chat_ids: Iterable[int] = ()) -> ExportJobRow | None:
+        """Move the oldest queued job outside `excluded_chat_ids` to `running`.
+
+        The status check in the UPDATE makes the claim safe against another claimer that
+        picked the same row; the loser gets None and simply asks again.
+        """
+        statement = (
+            select(ExportJobRow.id)
+            .where(ExportJobRow.status == "queued")
+            .order_by(ExportJobRow.created_at, ExportJobRow.id)
+            .limit(1)
+        )
+        excluded = list(excluded_chat_ids)
+        if excluded:
+            statement = statement.where(ExportJobRow.telegram_chat_id.not_in(excluded))
+        job_id = await self._session.scalar(statement)
+        if job_id is None:
+            return None
+        result = await self._session.execute(
+            update(ExportJobRow)
+            .where(ExportJobRow.id == job_id, ExportJobRow.status == "queued")
+            .values(
+                status="running",
+                attempts=ExportJobRow.attempts + 1,
+                started_at=datetime.now(tz=UTC),
+            )
+        )
+        if cast(CursorResult[Any], result).rowcount != 1:
+            return None
+        return await self._session.get(ExportJobRow, job_id, populate_existing=True)
+
+    async def requeue_interrupted(self, *, max_attempts: int) -> tuple[int, int]:
+        """Return `running` jobs left by a previous process to the queue.
+
+        Jobs that already used `max_attempts` are failed with `interrupted` instead, so a
+        job that takes the process down cannot do so on every start. Returns the number
+        of requeued and failed jobs.
+        """
+        requeued = await self._session.execute(
+            update(ExportJobRow)
+            .where(ExportJobRow.status == "running", ExportJobRow.attempts < max_attempts)
+            .values(status="queued", started_at=None)
+        )
+        failed = await self._session.execute(
+            update(ExportJobRow)
+            .where(ExportJobRow.status == "running")
+            .values(status="failed", error_code="interrupted", finished_at=datetime.now(tz=UTC))
+        )
+        return (
+            cast(CursorResult[Any], requeued).rowcount,
+            cast(CursorResult[Any], failed).rowcount,
+        )
+
+    async def count_by_status(self) -> dict[str, int]:
+        rows = await self._session.execute(
+            select(ExportJobRow.status, func.count())
+            .where(ExportJobRow.status.in_(("queued", "running")))
+            .group_by(ExportJobRow.status)
+        )
+        counts: dict[str, int] = {status: count for status, count in rows.tuples()}
+        return counts
+
     async def mark_running(self, job_id: str) -> None:
         row = await self._require(job_id)
         row.status = "running"
@@ -237,8 +851,55 @@ class ExportJobRepository:
         row.error_code = error_code
         await self._session.flush()
 
+    async def fail_if_running(self, job_id: str, error_code: str) -> bool:
+        """Move a job that is still `running` to `failed`; a finished job is left alone.
+
+        Returns whether the job was failed.
+        """
+        result = await self._session.execute(
+            update(ExportJobRow)
+            .where(ExportJobRow.id == job_id, ExportJobRow.status == "running")
+            .values(status="failed", error_code=error_code, finished_at=datetime.now(tz=UTC))
+        )
+        return cast(CursorResult[Any], result).rowcount == 1
+
     async def _require(self, job_id: str) -> ExportJobRow:
         row = await self.get(job_id)
         if row is None:
             raise LookupError(f"export job not found: {job_id}")
         return row
+
+
+class TelegramFileRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def file_ids(self, content_hashes: Iterable[str]) -> dict[str, str]:
+        hashes = set(content_hashes)
+        if not hashes:
+            return {}
+        rows = await self._session.execute(
+            select(TelegramFileRow.content_hash, TelegramFileRow.file_id).where(
+                TelegramFileRow.content_hash.in_(hashes)
+            )
+        )
+        file_ids: dict[str, str] = dict(rows.tuples().all())
+        return file_ids
+
+    async def remember(self, content_hash: str, file_id: str, *, size_bytes: int) -> None:
+        await self._session.merge(
+            TelegramFileRow(
+                content_hash=content_hash,
+                file_id=file_id,
+                size_bytes=size_bytes,
+                updated_at=datetime.now(tz=UTC),
+            )
+        )
+        await self._session.flush()
+
+    async def prune(self, *, older_than: datetime) -> int:
+        """Forget ids last stored before `older_than`; returns how many were dropped."""
+        result = await self._session.execute(
+            delete(TelegramFileRow).where(TelegramFileRow.updated_at < older_than)
+        )
+        return cast(CursorResult[Any], result).rowcount
@@ -2,41 +2,116 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from types import TracebackType
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
 
 from drova_bot.storage.encryption import TokenEncryptor
+from drova_bot.storage.profile_cache import ChatProfileCache
 from drova_bot.storage.repositories import (
     ChatProfileRepository,
     ExportJobRepository,
     ProductCacheRepository,
+    SessionRepository,
     StationCacheRepository,
+    TelegramFileRepository,
+)
+
+
+class _RequestScope:
+    """Session shared by the units of work of one Telegram update.
+
+    The scope belongs to the task that opened it: tasks spawned while handling the
+    update (fan-out, export delivery) inherit the context variable but get their own
+    sessions, so the shared session is never used concurrently.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._session_factory = session_factory
+        self._owner = asyncio.current_task()
+        self._session: AsyncSession | None = None
+        self._loaded: list[object] = []
+        self.in_use = False
+        self.closed = False
+
+    def available(self) -> bool:
+        return not self.closed and not self.in_use and asyncio.current_task() is self._owner
+
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+            # The identity map holds rows weakly; keep them for the rest of the update.
+            for name in ("loaded_as_persistent", "pending_to_persistent"):
+                event.listen(self._session.sync_session, name, self._retain)
+        return self._session
+
+    def _retain(self, session: Session, instance: object) -> None:
+        self._loaded.append(instance)
+
+    async def close(self) -> None:
+        self.closed = True
+        self._loaded = []
+        if self._session is not None:
+            await self._session.close()
+
+
+_request_scope: ContextVar[_RequestScope | None] = ContextVar(
+    "drova_bot_request_scope",
+    default=None,
 )
 
 
 class StorageUnitOfWork:
-    """Small async unit of work that groups repositories around one session."""
+    """Small async unit of work that groups repositories around one session.
+
+    Inside `StorageUnitOfWorkFactory.request_scope` consecutive units of work reuse
+    the update's session. Each block still commits on exit, but loaded rows stay in
+    the session's identity map, so repeated profile reads within an update are served
+    without another query or transaction.
+    """
 
     def __init__(
         self,
         session_factory: async_sessionmaker[AsyncSession],
         encryptor: TokenEncryptor,
+        profile_cache: ChatProfileCache | None = None,
     ) -> None:
         self._session_factory = session_factory
         self._encryptor = encryptor
+        self._profile_cache = profile_cache
+        self._scope: _RequestScope | None = None
         self.session: AsyncSession | None = None
         self.chat_profiles: ChatProfileRepository
         self.station_cache: StationCacheRepository
         self.product_cache: ProductCacheRepository
+        self.sessions: SessionRepository
         self.export_jobs: ExportJobRepository
+        self.telegram_files: TelegramFileRepository
 
     async def __aenter__(self) -> StorageUnitOfWork:
-        self.session = self._session_factory()
-        self.chat_profiles = ChatProfileRepository(self.session, self._encryptor)
+        scope = _request_scope.get()
+        if scope is not None and scope.available():
+            scope.in_use = True
+            self._scope = scope
+            self.session = scope.session()
+        else:
+            self.session = self._session_factory()
+        self.chat_profiles = ChatProfileRepository(
+            self.session,
+            self._encryptor,
+            self._profile_cache,
+        )
         self.station_cache = StationCacheRepository(self.session)
         self.product_cache = ProductCacheRepository(self.session)
+        self.sessions = SessionRepository(self.session)
         self.export_jobs = ExportJobRepository(self.session)
+        self.telegram_files = TelegramFileRepository(self.session)
         return self
 
     async def __aexit__(
@@ -50,10 +125,16 @@ class StorageUnitOfWork:
         try:
             if exc_type is None:
                 await self.session.commit()
+                self.chat_profiles.publish_cached()
             else:
                 await self.session.rollback()
         finally:
-            await self.session.close()
+            self.chat_profiles.discard_cached()
+            if self._scope is not None:
+                self._scope.in_use = False
+                self._scope = None
+            else:
+                await self.session.close()
 
 
 class StorageUnitOfWorkFactory:
@@ -61,9 +142,22 @@ class StorageUnitOfWorkFactory:
         self,
         session_factory: async_sessionmaker[AsyncSession],
         encryptor: TokenEncryptor,
+        profile_cache: ChatProfileCache | None = None,
     ) -> None:
         self._session_factory = session_factory
         self._encryptor = encryptor
+        self._profile_cache = profile_cache
 
     def __call__(self) -> StorageUnitOfWork:
-        return StorageUnitOfWork(self._session_factory, self._encryptor)
+        return StorageUnitOfWork(self._session_factory, self._encryptor, self._profile_cache)
+
+    @asynccontextmanager
+    async def request_scope(self) -> AsyncIterator[None]:
+        """Share one session between the units of work opened by the current task."""
+        scope = _RequestScope(self._session_factory)
+        token = _request_scope.set(scope)
+        try:
+            yield
+        finally:
+            _request_scope.reset(token)
+            await scope.close()
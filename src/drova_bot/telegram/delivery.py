@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import hashlib
 from html import unescape
 from typing import Any, cast
 
 import structlog
+from aiogram import Bot
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import (
     BufferedInputFile,
@@ -57,22 +59,35 @@ async def answer_rendered(message: Message, rendered: RenderedMessage) -> Any:
             raise TelegramDeliveryFailed("telegram answer failed after fallback") from exc
 
 
-async def edit_rendered_message(message: Message, rendered: RenderedMessage) -> Any:
+async def edit_progress_message(
+    bot: Bot,
+    chat_id: int,
+    message_id: int | None,
+    rendered: RenderedMessage,
+) -> Any:
+    """Replace a progress message by id, or send `rendered` when there is none to edit.
+
+    Works from ids alone, so a job resumed after a restart can still finish its message.
+    """
     markup = to_aiogram_keyboard(rendered.keyboard)
-    try:
-        return await message.edit_text(
-            rendered.text,
-            parse_mode=rendered.parse_mode,
+
+    async def deliver(text: str, parse_mode: str | None) -> Any:
+        if message_id is None:
+            return await bot.send_message(chat_id, text, parse_mode=parse_mode, reply_markup=markup)
+        return await bot.edit_message_text(
+            text,
+            chat_id=chat_id,
+            message_id=message_id,
+            parse_mode=parse_mode,
             reply_markup=markup,
         )
+
+    try:
+        return await deliver(rendered.text, rendered.parse_mode)
     except TelegramBadRequest:
         logger.warning("telegram_html_fallback")
         try:
-            return await message.edit_text(
-                _plain_text(rendered.text),
-                parse_mode=None,
-                reply_markup=markup,
-            )
+            return await deliver(_plain_text(rendered.text), None)
         except TelegramBadRequest as exc:
             raise TelegramDeliveryFailed("telegram edit failed after fallback") from exc
 
@@ -100,13 +115,49 @@ async def edit_or_answer_rendered(callback: CallbackQuery, rendered: RenderedMes
             raise TelegramDeliveryFailed("telegram callback edit failed after fallback") from exc
 
 
-async def send_export_file(message: Message, export_file: ExportFile) -> Any:
+async def send_export_file(
+    bot: Bot,
+    chat_id: int,
+    export_file: ExportFile,
+    *,
+    file_id: str | None = None,
+) -> str | None:
+    """Send `export_file` and return the Telegram `file_id` of the sent document.
+
+    With `file_id` from an earlier send the document is not uploaded again; if Telegram
+    rejects the id, the payload is uploaded instead.
+    """
+    if file_id is not None:
+        try:
+            message = await bot.send_document(chat_id, file_id)
+        except TelegramBadRequest:
+            logger.warning("telegram_file_id_rejected", filename=export_file.filename)
+        else:
+            return _document_file_id(message) or file_id
     try:
-        return await message.answer_document(
+        message = await bot.send_document(
+            chat_id,
             BufferedInputFile(export_file.payload, filename=export_file.filename),
         )
     except TelegramBadRequest as exc:
         raise TelegramDeliveryFailed("telegram document delivery failed") from exc
+    return _document_file_id(message)
+
+
+def document_hash(filename: str, payload: bytes) -> str:
+    """Key under which the `file_id` of an uploaded document is stored.
+
+    A document sent by `file_id` keeps the filename it was uploaded with, so the name is
+    part of the key: the same bytes under a new (timestamped) name are uploaded again.
+    """
+    digest = hashlib.sha256(filename.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(payload)
+    return digest.hexdigest()
+
+
+def _document_file_id(message: Message) -> str | None:
+    return message.document.file_id if message.document is not None else None
 
 
 def _plain_text(text: str) -> str:
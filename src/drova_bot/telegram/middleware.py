@@ -5,6 +5,7 @@ from __future__ import annotations
 import hashlib
 import time
 from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, nullcontext
 from typing import Any
 from uuid import uuid4
 
@@ -15,10 +16,18 @@ from aiogram.types import CallbackQuery, Message, TelegramObject
 logger = structlog.get_logger(__name__)
 
 Handler = Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]]
+RequestScope = Callable[[], AbstractAsyncContextManager[None]]
 
 
 class RequestContextMiddleware(BaseMiddleware):
-    """Attach non-sensitive request metadata to aiogram handler data and logs."""
+    """Attach non-sensitive request metadata to aiogram handler data and logs.
+
+    When `request_scope` is given, the handler runs inside it; the runtime passes
+    `StorageUnitOfWorkFactory.request_scope` so one update shares a storage session.
+    """
+
+    def __init__(self, request_scope: RequestScope | None = None) -> None:
+        self._request_scope = request_scope
 
     async def __call__(
         self,
@@ -34,8 +43,10 @@ class RequestContextMiddleware(BaseMiddleware):
         started_at = time.perf_counter()
         bound_logger = logger.bind(request_id=request_id, chat_id_hash=chat_id_hash)
         bound_logger.info("telegram_update_start")
+        scope = self._request_scope() if self._request_scope is not None else nullcontext()
         try:
-            result = await handler(event, data)
+            async with scope:
+                result = await handler(event, data)
         except Exception as exc:
             bound_logger.exception(
                 "telegram_update_failed",
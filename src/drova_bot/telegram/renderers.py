@@ -28,6 +28,7 @@ from drova_bot.domain.formatters import (
 )
 from drova_bot.domain.models import (
     ChatProfile,
+    CsvBundleMode,
     Endpoint,
     LaunchParameters,
     OpenedPrepaidDeal,
@@ -125,6 +126,7 @@ def render_help() -> RenderedMessage:
         "/promocodes - неактивированные prepaid-промокоды",
         "/export_sessions - один XLSX со всеми сессиями",
         "/export_sessions_csv - CSV-файлы по каждой станции",
+        "/csv_bundle auto|zip|files - CSV по станциям одним ZIP или отдельными файлами",
         "/export_products - XLSX-матрица состояния продуктов по станциям",
         "/export_product_time - XLSX по времени использования продуктов",
         "Совместимость: /station all, /sessions short, /export ..., /dump..., /game...",
@@ -132,12 +134,22 @@ def render_help() -> RenderedMessage:
     return RenderedMessage("Команды:\n" + "\n".join(commands))
 
 
+def render_csv_bundle_mode(mode: CsvBundleMode, station_threshold: int) -> RenderedMessage:
+    descriptions = {
+        "auto": f"один ZIP, если станций больше {station_threshold}, иначе отдельные файлы",
+        "zip": "всегда один ZIP",
+        "files": "всегда отдельный файл на станцию",
+    }
+    return RenderedMessage(f"CSV по станциям: {descriptions[mode]}.")
+
+
 def render_error(code: str) -> RenderedMessage:
     messages = {
         "unknown_command": "Команда не найдена. Используйте /help.",
         "unknown_text": "Я понимаю только команды. Используйте /help.",
         "not_connected": "Сначала подключите Drova token командой /token &lt;proxy_token&gt;.",
         "invalid_limit": "Лимит должен быть числом от 1 до 100.",
+        "invalid_csv_bundle_mode": "Укажите режим: /csv_bundle auto, zip или files.",
         "invalid_promocode_minutes": "Укажите количество минут целым числом больше 0.",
         "invalid_product_id": "Выберите игру через /games.",
         "station_required": "Сначала выберите одну станцию через /station.",
@@ -1,5 +1,5 @@
 """Telegram router factory exports."""
 
-from drova_bot.telegram.routers.core import build_router
+from drova_bot.telegram.routers.core import build_router, deliver_export_job
 
-__all__ = ["build_router"]
+__all__ = ["build_router", "deliver_export_job"]
@@ -3,22 +3,23 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Coroutine
-from typing import Any
 
 import structlog
-from aiogram import F, Router
+from aiogram import Bot, F, Router
+from aiogram.exceptions import TelegramAPIError
 from aiogram.filters import Command
 from aiogram.types import CallbackQuery, Message
 
+from drova_bot.application.export_jobs import ExportDeliveryTarget, ExportJob, ExportJobQueue
 from drova_bot.application.services import BotService
 from drova_bot.drova.errors import TelegramDeliveryFailed
 from drova_bot.exports import ExportKind
 from drova_bot.telegram.callbacks import InvalidCallbackData, parse_callback_data
 from drova_bot.telegram.delivery import (
     answer_rendered,
+    document_hash,
     edit_or_answer_rendered,
-    edit_rendered_message,
+    edit_progress_message,
     send_export_file,
 )
 from drova_bot.telegram.renderers import RenderedMessage, render_error, render_help
@@ -43,6 +44,7 @@ def build_router() -> Router:
     router.message.register(station_all_command, Command("station_all"))
     router.message.register(station_manage_command, Command("station_manage"))
     router.message.register(limit_command, Command("limit"))
+    router.message.register(csv_bundle_command, Command("csv_bundle"))
     router.message.register(sessions_command, Command("sessions"))
     router.message.register(sessions_short_command, Command("sessions_short"))
     router.message.register(current_command, Command("current"))
@@ -132,6 +134,13 @@ async def limit_command(message: Message, bot_service: BotService) -> None:
     )
 
 
+async def csv_bundle_command(message: Message, bot_service: BotService) -> None:
+    await answer_rendered(
+        message,
+        await bot_service.set_csv_bundle_mode(message.chat.id, _command_args(message.text)),
+    )
+
+
 async def sessions_command(message: Message, bot_service: BotService) -> None:
     await answer_rendered(
         message,
@@ -320,51 +329,81 @@ async def promocodes_command(message: Message, bot_service: BotService) -> None:
     await answer_rendered(message, await bot_service.unused_promocodes(message.chat.id))
 
 
-async def export_command(message: Message, bot_service: BotService) -> None:
+async def export_command(
+    message: Message,
+    bot_service: BotService,
+    export_queue: ExportJobQueue,
+) -> None:
     kind = export_kind_from_message(message.text)
     if kind is None:
         await answer_rendered(message, render_error("unknown_command"))
         return
     progress = await answer_rendered(message, RenderedMessage("Готовлю файл..."))
-    progress_message = progress if isinstance(progress, Message) else message
-    job = await bot_service.create_export_job(message.chat.id, kind)
-    schedule_background_task(
-        deliver_export_job(
-            source_message=message,
-            progress_message=progress_message,
-            bot_service=bot_service,
-            telegram_chat_id=message.chat.id,
-            job_id=job.id,
-            kind=kind,
-        )
+    await bot_service.create_export_job(
+        message.chat.id,
+        kind,
+        progress_message_id=progress.message_id if isinstance(progress, Message) else None,
     )
+    export_queue.notify()
 
 
-async def deliver_export_job(
-    *,
-    source_message: Message,
-    progress_message: Message,
-    bot_service: BotService,
-    telegram_chat_id: int,
-    job_id: str,
-    kind: ExportKind,
-) -> None:
+async def deliver_export_job(job: ExportJob, *, bot: Bot, bot_service: BotService) -> None:
+    """Build a claimed export job and send its files to every chat waiting for it.
+
+    The job's own chat goes first, then chats attached to the job as duplicates. A file
+    whose bytes were uploaded before, for this job or an earlier one, is sent by its
+    stored `file_id` instead of being uploaded again. A chat that cannot be reached is
+    logged and skipped; the job's status reflects the build alone.
+    """
     result = await bot_service.run_export_job(
-        job_id=job_id,
-        telegram_chat_id=telegram_chat_id,
-        kind=kind,
+        job_id=job.id,
+        telegram_chat_id=job.telegram_chat_id,
+        kind=job.kind,
     )
-    try:
-        for export_file in result.files:
-            await send_export_file(source_message, export_file)
-        await edit_rendered_message(progress_message, RenderedMessage(result.message))
-    except TelegramDeliveryFailed:
-        await bot_service.fail_export_job(job_id, "telegram_delivery_failed")
-        logger.warning("telegram_export_delivery_failed", export_job_id=job_id)
-
-
-def schedule_background_task(coro: Coroutine[Any, Any, None]) -> asyncio.Task[None]:
-    return asyncio.create_task(coro)
+    targets = [
+        ExportDeliveryTarget(job.telegram_chat_id, job.progress_message_id),
+        *await bot_service.export_job_targets(job.id),
+    ]
+    hashes = [
+        await asyncio.to_thread(document_hash, export_file.filename, export_file.payload)
+        for export_file in result.files
+    ]
+    known = await bot_service.telegram_file_ids(hashes)
+    file_ids = [known.get(content_hash) for content_hash in hashes]
+    for index, target in enumerate(targets):
+        try:
+            for position, export_file in enumerate(result.files):
+                file_ids[position] = (
+                    await send_export_file(
+                        bot,
+                        target.telegram_chat_id,
+                        export_file,
+                        file_id=file_ids[position],
+                    )
+                    or file_ids[position]
+                )
+            await edit_progress_message(
+                bot,
+                target.telegram_chat_id,
+                target.progress_message_id,
+                RenderedMessage(result.message),
+            )
+        except (TelegramAPIError, TelegramDeliveryFailed) as exc:
+            # TelegramAPIError covers blocked bots, flood waits and TelegramNetworkError.
+            # The remaining targets still get their files and the job stays done.
+            logger.warning(
+                "telegram_export_delivery_failed",
+                export_job_id=job.id,
+                target=index,
+                error=type(exc).__name__,
+            )
+    for content_hash, file_id, export_file in zip(hashes, file_ids, result.files, strict=True):
+        if file_id is not None and file_id != known.get(content_hash):
+            await bot_service.remember_telegram_file(
+                content_hash,
+                file_id,
+                size_bytes=len(export_file.payload),
+            )
 
 
 async def callback_query(callback: CallbackQuery, bot_service: BotService) -> None:
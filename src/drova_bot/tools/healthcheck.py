@@ -8,6 +8,7 @@ from pathlib import Path
 from sqlalchemy.engine import make_url
 
 from drova_bot.config import Settings
+from drova_bot.drova.breaker import CircuitState, read_circuit_states
 
 
 class HealthcheckError(RuntimeError):
@@ -19,9 +20,27 @@ def check_health(settings: Settings | None = None) -> None:
     _check_sqlite_path(settings.database_url)
 
 
+def open_drova_circuits(settings: Settings | None = None) -> list[str]:
+    """Drova path families the running bot currently short-circuits.
+
+    Informational only: an open circuit means Drova is down, which a container
+    restart would not fix.
+    """
+    settings = settings or Settings()
+    if not settings.drova_breaker_state_file:
+        return []
+    states = read_circuit_states(Path(settings.drova_breaker_state_file))
+    return [family for family, state in states.items() if state is not CircuitState.CLOSED]
+
+
 def main() -> None:
-    check_health()
-    print("ok")
+    settings = Settings()
+    check_health(settings)
+    open_circuits = open_drova_circuits(settings)
+    if open_circuits:
+        print(f"ok (drova circuits open: {', '.join(open_circuits)})")
+    else:
+        print("ok")
 
 
 def _check_sqlite_path(database_url: str) -> None:
@@ -124,7 +124,10 @@ def main(argv: list[str] | None = None) -> int:
         engine = create_database_engine(settings.database_url)
         try:
             session_factory = make_session_factory(engine)
-            encryptor = TokenEncryptor(settings.bot_secret_key)
+            encryptor = TokenEncryptor(
+                settings.bot_secret_key,
+                retired_keys=settings.retired_secret_keys(),
+            )
             result = import_legacy_payload(
                 payload,
                 StorageUnitOfWorkFactory(session_factory, encryptor),
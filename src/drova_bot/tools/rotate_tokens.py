@@ -0,0 +1,109 @@
+"""Re-encrypt stored Drova tokens with the current ``BOT_SECRET_KEY``."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from drova_bot.config import Settings
+from drova_bot.storage import (
+    StorageUnitOfWork,
+    StorageUnitOfWorkFactory,
+    TokenEncryptor,
+    create_database_engine,
+    make_session_factory,
+    run_migrations,
+)
+
+UnitOfWorkFactory = Callable[[], StorageUnitOfWork]
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True, slots=True)
+class RotateTokensResult:
+    scanned: int = 0
+    rotated: int = 0
+    unreadable: int = 0
+
+
+async def rotate_tokens(
+    uow_factory: UnitOfWorkFactory,
+    encryptor: TokenEncryptor,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> RotateTokensResult:
+    """Walk `chat_profiles` by chat id and rewrite tokens not under the primary key.
+
+    Each batch is read and committed in its own unit of work, so memory use and lock
+    time stay bounded by `batch_size`. A token changed by the bot in the meantime is
+    left alone: it was already written with the primary key.
+    """
+    scanned = rotated = unreadable = 0
+    last_chat_id: int | None = None
+    while True:
+        async with uow_factory() as uow:
+            batch = await uow.chat_profiles.encrypted_tokens_after(last_chat_id, limit=batch_size)
+            for chat_id, payload in batch:
+                try:
+                    replacement = encryptor.rotate(payload)
+                except ValueError:
+                    unreadable += 1
+                    continue
+                if replacement is not None and await uow.chat_profiles.replace_encrypted_token(
+                    chat_id,
+                    expected=payload,
+                    replacement=replacement,
+                ):
+                    rotated += 1
+        if not batch:
+            break
+        scanned += len(batch)
+        last_chat_id = batch[-1][0]
+    return RotateTokensResult(scanned=scanned, rotated=rotated, unreadable=unreadable)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = list(sys.argv[1:] if argv is None else argv)
+    if args:
+        print("Usage: python -m drova_bot.tools.rotate_tokens", file=sys.stderr)
+        return 2
+
+    settings = Settings()
+    if not settings.bot_secret_key:
+        print("Missing required runtime environment: BOT_SECRET_KEY", file=sys.stderr)
+        return 1
+
+    try:
+        run_migrations(settings.database_url)
+        engine = create_database_engine(settings.database_url)
+        try:
+            encryptor = TokenEncryptor(
+                settings.bot_secret_key,
+                retired_keys=settings.retired_secret_keys(),
+                cache_size=0,
+            )
+            uow_factory = StorageUnitOfWorkFactory(make_session_factory(engine), encryptor)
+            result = asyncio.run(rotate_tokens(uow_factory, encryptor))
+        finally:
+            asyncio.run(engine.dispose())
+    except Exception as exc:
+        print(f"Token rotation failed: {type(exc).__name__}", file=sys.stderr)
+        return 1
+
+    print(
+        "Token rotation complete: "
+        f"scanned={result.scanned}, "
+        f"rotated={result.rotated}, "
+        f"unreadable={result.unreadable}"
+    )
+    return 1 if result.unreadable else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+
+
+__all__ = ["RotateTokensResult", "main", "rotate_tokens"]
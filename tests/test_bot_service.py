@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import AsyncGenerator
 from dataclasses import replace
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
 import pytest
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncEngine
 
+from drova_bot.application.catalog import ProductCatalog
+from drova_bot.application.export_jobs import ExportDeliveryTarget
 from drova_bot.application.protocols import TokenPersister
+from drova_bot.application.response_cache import (
+    SERVERS,
+    CacheKey,
+    CachingDrovaClient,
+    DrovaResponseCache,
+)
 from drova_bot.application.services import BotService
+from drova_bot.application.session_history import SessionHistory, SessionSyncResult
 from drova_bot.domain.models import (
     Account,
     CatalogProduct,
@@ -32,6 +43,7 @@ from drova_bot.exports import ExportKind
 from drova_bot.storage import (
     ChatProfileRepository,
     ExportJobRow,
+    TelegramFileRow,
     TokenEncryptor,
     create_database_engine,
     create_schema,
@@ -96,6 +108,9 @@ class FakeDrovaClient:
         self.source_update_calls: list[tuple[str, str, str]] = []
         self.issued_promocode_minutes: list[int] = []
         self.session_calls: list[tuple[str | None, str | None, int | None]] = []
+        self.server_calls = 0
+        self.server_product_calls: list[str] = []
+        self.product_calls = 0
 
     @property
     def proxy_token(self) -> str:
@@ -110,9 +125,12 @@ class FakeDrovaClient:
         return self.account
 
     async def get_products_full(self) -> list[CatalogProduct]:
+        self.product_calls += 1
+        await asyncio.sleep(0)
         return self.products
 
     async def get_servers(self, user_id: str) -> list[Station]:
+        self.server_calls += 1
         return self.stations
 
     async def get_sessions(
@@ -133,7 +151,18 @@ class FakeDrovaClient:
             sessions = sessions[:limit]
         return SessionPage(sessions=sessions)
 
+    async def iter_sessions(
+        self,
+        merchant_id: str | None = None,
+        server_id: str | None = None,
+        limit: int | None = None,
+    ) -> AsyncGenerator[list[Session], None]:
+        page = await self.get_sessions(merchant_id=merchant_id, server_id=server_id, limit=limit)
+        for start in range(0, len(page.sessions), 2):
+            yield page.sessions[start : start + 2]
+
     async def get_server_products(self, user_id: str, server_id: str) -> list[StationProduct]:
+        self.server_product_calls.append(server_id)
         return self.station_products.get(server_id, [])
 
     async def get_server_product_edit(
@@ -290,6 +319,7 @@ def make_service(
     factory: FakeDrovaClientFactory,
     *,
     export_row_limit: int = 50_000,
+    export_csv_zip_station_threshold: int = 5,
     session_geo_resolver: SessionGeoResolver | None = None,
 ) -> BotService:
     session_factory = make_session_factory(engine)
@@ -299,6 +329,7 @@ def make_service(
         client_factory=factory,
         clock=lambda: datetime(2026, 5, 18, 12, 0, tzinfo=UTC),
         export_row_limit=export_row_limit,
+        export_csv_zip_station_threshold=export_csv_zip_station_threshold,
         session_geo_resolver=session_geo_resolver,
     )
 
@@ -1325,6 +1356,62 @@ async def test_export_not_connected_returns_safe_message(service_engine: AsyncEn
     assert "Сначала подключите" in result.message
 
 
+@pytest.mark.asyncio
+async def test_duplicate_export_requests_attach_to_the_in_flight_job(
+    service_engine: AsyncEngine,
+) -> None:
+    service = make_service(
+        service_engine,
+        FakeDrovaClientFactory(FakeDrovaClient(), FakeDrovaClient()),
+    )
+    await service.connect_token(10001, "token")
+    await service.connect_token(10002, "token")
+
+    first = await service.create_export_job(10001, ExportKind.PRODUCTS, progress_message_id=1)
+    repeated = await service.create_export_job(10001, ExportKind.PRODUCTS, progress_message_id=2)
+    other_chat = await service.create_export_job(10002, ExportKind.PRODUCTS)
+    other_kind = await service.create_export_job(10001, ExportKind.SESSIONS)
+
+    assert repeated.id == other_chat.id == first.id
+    assert other_kind.id != first.id
+    assert await service.export_job_targets(first.id) == [
+        ExportDeliveryTarget(10001, progress_message_id=2),
+        ExportDeliveryTarget(10002),
+    ]
+
+    await service.fail_export_job(first.id, "export_too_large")
+    after_finish = await service.create_export_job(10001, ExportKind.PRODUCTS)
+
+    assert after_finish.id != first.id
+    assert await service.export_job_targets(after_finish.id) == []
+
+
+@pytest.mark.asyncio
+async def test_telegram_file_ids_are_stored_by_content_hash(service_engine: AsyncEngine) -> None:
+    service = make_service(service_engine, FakeDrovaClientFactory())
+
+    await service.remember_telegram_file("hash-1", "file-1", size_bytes=10)
+    await service.remember_telegram_file("hash-1", "file-2", size_bytes=10)
+
+    assert await service.telegram_file_ids(["hash-1", "hash-2"]) == {"hash-1": "file-2"}
+    assert await service.telegram_file_ids([]) == {}
+
+
+@pytest.mark.asyncio
+async def test_storing_a_telegram_file_id_prunes_expired_ones(service_engine: AsyncEngine) -> None:
+    service = make_service(service_engine, FakeDrovaClientFactory())
+    await service.remember_telegram_file("hash-old", "file-old", size_bytes=10)
+    async with make_session_factory(service_engine)() as session:
+        await session.execute(
+            update(TelegramFileRow).values(updated_at=datetime.now(tz=UTC) - timedelta(days=8))
+        )
+        await session.commit()
+
+    await service.remember_telegram_file("hash-new", "file-new", size_bytes=10)
+
+    assert await service.telegram_file_ids(["hash-old", "hash-new"]) == {"hash-new": "file-new"}
+
+
 @pytest.mark.asyncio
 async def test_export_job_lifecycle_marks_success_and_failure(
     service_engine: AsyncEngine,
@@ -1420,6 +1507,41 @@ async def test_export_sessions_csv_returns_one_file_per_station(
     ]
 
 
+@pytest.mark.asyncio
+async def test_export_sessions_csv_bundles_into_zip_by_chat_mode(
+    service_engine: AsyncEngine,
+    ui_stations: list[Station],
+    ui_sessions: list[Session],
+    ui_catalog: dict[str, str],
+) -> None:
+    service = make_service(
+        service_engine,
+        FakeDrovaClientFactory(
+            FakeDrovaClient(stations=ui_stations, products=_catalog_products(ui_catalog)),
+            FakeDrovaClient(stations=ui_stations, sessions=ui_sessions),
+            FakeDrovaClient(stations=ui_stations, sessions=ui_sessions),
+            FakeDrovaClient(stations=ui_stations, sessions=ui_sessions),
+        ),
+        export_csv_zip_station_threshold=2,
+    )
+    await service.connect_token(10001, "token")
+
+    auto = await service.export(10001, ExportKind.SESSIONS_CSV)
+    assert (await service.set_csv_bundle_mode(10001, "files")).text == (
+        "CSV по станциям: всегда отдельный файл на станцию."
+    )
+    files = await service.export(10001, ExportKind.SESSIONS_CSV)
+    assert "Укажите режим" in (await service.set_csv_bundle_mode(10001, "tar")).text
+    await service.set_csv_bundle_mode(10001, "ZIP")
+    zipped = await service.export(10001, ExportKind.SESSIONS_CSV)
+
+    # Three selected stations are above the threshold of two.
+    assert [file.filename for file in auto.files] == ["drova-sessions-csv-20260518-120000.zip"]
+    assert auto.message == "Файл готов."
+    assert len(files.files) == 3
+    assert zipped.files == auto.files
+
+
 @pytest.mark.asyncio
 async def test_export_products_and_product_time(
     service_engine: AsyncEngine,
@@ -1468,6 +1590,182 @@ async def test_export_row_limit_returns_safe_failure(
     assert "Выгрузка слишком большая" in result.message
 
 
+@pytest.mark.asyncio
+async def test_session_history_syncs_full_then_incrementally(
+    service_engine: AsyncEngine,
+    ui_sessions: list[Session],
+) -> None:
+    def session(uuid: str, created_on_ms: int, finished_on_ms: int | None) -> Session:
+        return replace(
+            ui_sessions[0],
+            uuid=uuid,
+            created_on_ms=created_on_ms,
+            finished_on_ms=finished_on_ms,
+        )
+
+    uow_factory = StorageUnitOfWorkFactory(
+        make_session_factory(service_engine),
+        TokenEncryptor(TokenEncryptor.generate_key()),
+    )
+    history = SessionHistory(uow_factory, window=1, wall_clock=lambda: 5.0)
+    fake = FakeDrovaClient(
+        sessions=[
+            session("s4", 4000, None),
+            session("s3", 3000, 3500),
+            session("s2", 2000, 2500),
+            session("s1", 1000, 1500),
+        ]
+    )
+
+    first = await history.sync(fake, "merchant-1")
+    fake.sessions_data = [
+        session("s5", 5000, None),
+        session("s4", 4000, 4500),
+        *fake.sessions_data[1:],
+    ]
+    second = await history.sync(fake, "merchant-1")
+
+    assert first == SessionSyncResult(fetched=4, stored=4, full=True)
+    assert second == SessionSyncResult(fetched=4, stored=4, full=False)
+    assert fake.session_calls == [
+        ("merchant-1", None, None),
+        ("merchant-1", None, 1),
+        ("merchant-1", None, 2),
+        ("merchant-1", None, 4),
+    ]
+    async with uow_factory() as uow:
+        stored = await uow.sessions.list_recent("merchant-1")
+        assert await uow.sessions.merchant_ids() == ["merchant-1"]
+    assert [(item.uuid, item.finished_on_ms) for item in stored] == [
+        ("s5", None),
+        ("s4", 4500),
+        ("s3", 3500),
+        ("s2", 2500),
+        ("s1", 1500),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_session_history_caps_first_sync_and_backfills_one_station(
+    service_engine: AsyncEngine,
+    ui_sessions: list[Session],
+) -> None:
+    def session(uuid: str, server_id: str, created_on_ms: int) -> Session:
+        return replace(
+            ui_sessions[0],
+            uuid=uuid,
+            server_id=server_id,
+            created_on_ms=created_on_ms,
+            finished_on_ms=created_on_ms + 100,
+        )
+
+    uow_factory = StorageUnitOfWorkFactory(
+        make_session_factory(service_engine),
+        TokenEncryptor(TokenEncryptor.generate_key()),
+    )
+    history = SessionHistory(uow_factory, full_sync_limit=2, wall_clock=lambda: 10.0)
+    fake = FakeDrovaClient(
+        sessions=[
+            session("s5", "server-b", 5000),
+            session("s4", "server-a", 4000),
+            session("s3", "server-b", 3000),
+            session("s2", "server-a", 2000),
+            session("s1", "server-a", 1000),
+        ]
+    )
+
+    first = await history.sync(fake, "merchant-1")
+    second = await history.sync(fake, "merchant-1")
+    backfilled = await history.backfill_station(fake, "merchant-1", "server-a")
+    calls = len(fake.session_calls)
+    again = await history.backfill_station(fake, "merchant-1", "server-a")
+
+    # The first sync stops one session past the cap instead of streaming everything.
+    assert first == SessionSyncResult(fetched=3, stored=3, full=True, truncated_before_ms=3000)
+    assert second.full is False
+    assert second.truncated_before_ms == 3000
+    assert backfilled == 3
+    assert fake.session_calls[0] == ("merchant-1", None, 3)
+    assert fake.session_calls[-1] == ("merchant-1", "server-a", 3)
+    # The station is backfilled once; incremental syncs keep it current afterwards.
+    assert again == 0
+    assert len(fake.session_calls) == calls
+    async with uow_factory() as uow:
+        station = await uow.sessions.list_recent("merchant-1", "server-a")
+    assert [item.uuid for item in station] == ["s4", "s2", "s1"]
+
+
+@pytest.mark.asyncio
+async def test_session_history_caps_incremental_window_at_full_sync_limit(
+    service_engine: AsyncEngine,
+    ui_sessions: list[Session],
+) -> None:
+    def session(uuid: str, created_on_ms: int, finished_on_ms: int | None) -> Session:
+        return replace(
+            ui_sessions[0],
+            uuid=uuid,
+            created_on_ms=created_on_ms,
+            finished_on_ms=finished_on_ms,
+        )
+
+    uow_factory = StorageUnitOfWorkFactory(
+        make_session_factory(service_engine),
+        TokenEncryptor(TokenEncryptor.generate_key()),
+    )
+    history = SessionHistory(uow_factory, window=1, full_sync_limit=4, wall_clock=lambda: 9.0)
+    finished = [session(f"s{index}", index * 1000, index * 1000 + 500) for index in (4, 3, 2)]
+    fake = FakeDrovaClient(sessions=[*finished, session("s1", 1000, None)])
+    await history.sync(fake, "merchant-1")
+    fake.sessions_data = [
+        session("s6", 6000, 6500),
+        session("s5", 5000, 5500),
+        *fake.sessions_data,
+    ]
+    fake.session_calls.clear()
+
+    # Reaching back to the still-open s1 would need the whole history; the window stops
+    # at the cap once it covers the newest stored session.
+    result = await history.sync(fake, "merchant-1")
+
+    assert [limit for _, _, limit in fake.session_calls] == [1, 2, 4]
+    assert result == SessionSyncResult(fetched=4, stored=4, full=False)
+
+
+@pytest.mark.asyncio
+async def test_session_sync_loop_survives_failing_merchants(
+    service_engine: AsyncEngine,
+    ui_sessions: list[Session],
+) -> None:
+    uow_factory = StorageUnitOfWorkFactory(
+        make_session_factory(service_engine),
+        TokenEncryptor(TokenEncryptor.generate_key()),
+    )
+    history = SessionHistory(uow_factory)
+    for merchant_id in ("merchant-1", "merchant-2"):
+        await history.sync(FakeDrovaClient(sessions=ui_sessions[:1]), merchant_id)
+    clients: list[FakeDrovaClient] = []
+
+    async def client_source(merchant_id: str) -> FakeDrovaClient:
+        if merchant_id == "merchant-1":
+            raise ValueError("token no longer decrypts")
+        client = FakeDrovaClient(sessions=ui_sessions[:1])
+        clients.append(client)
+        return client
+
+    task = asyncio.create_task(history.run_sync_loop(client_source, interval_seconds=0))
+    for _ in range(200):
+        if len(clients) >= 2:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # merchant-2 is synced on every tick although merchant-1 fails before it each time.
+    assert len(clients) >= 2
+    assert all(client.closed for client in clients[:2])
+
+
 def _catalog_products(catalog: dict[str, str]) -> list[CatalogProduct]:
     return [CatalogProduct(product_id, title) for product_id, title in catalog.items()]
 
@@ -1482,3 +1780,185 @@ def _promocode(code: str, playtime_msecs: int) -> Promocode:
         merchant_id="merchant-1",
         playtime_msecs=playtime_msecs,
     )
+
+
+@pytest.mark.asyncio
+async def test_response_cache_serves_repeat_reads_until_ttl_or_station_write(
+    ui_stations: list[Station],
+    ui_sessions: list[Session],
+    ui_products_by_station: dict[str, list[StationProduct]],
+) -> None:
+    now = [0.0]
+    fake = FakeDrovaClient(
+        stations=ui_stations,
+        sessions=ui_sessions,
+        station_products=ui_products_by_station,
+    )
+    client = CachingDrovaClient(
+        fake,
+        DrovaResponseCache(clock=lambda: now[0]),
+        merchant_id="user-1",
+    )
+
+    await client.get_servers("user-1")
+    await client.get_servers("user-1")
+    await client.get_server_products("user-1", "station-online")
+    await client.get_server_products("user-1", "station-online")
+    await client.get_sessions(server_id="station-online", limit=1)
+    await client.get_sessions(server_id="station-online", limit=1)
+
+    assert fake.server_calls == 1
+    assert fake.server_product_calls == ["station-online"]
+    assert len(fake.session_calls) == 2
+
+    await client.set_server_product_enabled("station-online", "product-a", False)
+    await client.get_server_products("user-1", "station-online")
+    await client.get_servers("user-1")
+
+    assert fake.server_product_calls == ["station-online", "station-online"]
+    assert fake.server_calls == 2
+
+    now[0] = 31.0
+    await client.get_servers("user-1")
+
+    assert fake.server_calls == 3
+
+
+@pytest.mark.asyncio
+async def test_response_cache_evicts_least_recently_used_over_byte_budget(
+    ui_stations: list[Station],
+) -> None:
+    probe = DrovaResponseCache()
+    probe.put(CacheKey("merchant-0", SERVERS), ui_stations)
+    cache = DrovaResponseCache(max_bytes=probe.size_bytes * 2)
+
+    cache.put(CacheKey("merchant-1", SERVERS), ui_stations)
+    cache.put(CacheKey("merchant-2", SERVERS), ui_stations)
+    assert cache.get(CacheKey("merchant-1", SERVERS)) is not None
+    cache.put(CacheKey("merchant-3", SERVERS), ui_stations)
+
+    assert len(cache) == 2
+    assert cache.size_bytes <= probe.size_bytes * 2
+    assert cache.get(CacheKey("merchant-1", SERVERS)) is not None
+    assert cache.get(CacheKey("merchant-2", SERVERS)) is None
+
+
+@pytest.mark.asyncio
+async def test_product_catalog_refreshes_once_on_unknown_product(
+    service_engine: AsyncEngine,
+) -> None:
+    uow_factory = StorageUnitOfWorkFactory(
+        make_session_factory(service_engine),
+        TokenEncryptor(TokenEncryptor.generate_key()),
+    )
+    async with uow_factory() as uow:
+        await uow.product_cache.upsert_catalog([CatalogProduct("product-a", "Cyber Rally")])
+    now = [0.0]
+    catalog = ProductCatalog(uow_factory, miss_refresh_interval_seconds=300, clock=lambda: now[0])
+    client = FakeDrovaClient(
+        products=[
+            CatalogProduct("product-a", "Cyber Rally"),
+            CatalogProduct("product-b", "Space Miners"),
+        ]
+    )
+
+    assert (await catalog.lookup(client, ["product-a"]))["product-a"] == "Cyber Rally"
+    assert client.product_calls == 0
+
+    first, second = await asyncio.gather(
+        catalog.lookup(client, ["product-b"]),
+        catalog.lookup(client, ["product-b"]),
+    )
+    assert first["product-b"] == second["product-b"] == "Space Miners"
+    assert client.product_calls == 1
+
+    await catalog.lookup(client, ["product-unknown"])
+    assert client.product_calls == 1
+    now[0] = 301.0
+    await catalog.lookup(client, ["product-unknown"])
+    assert client.product_calls == 2
+
+    assert await catalog.apply(client.products) is False
+    async with uow_factory() as uow:
+        assert await uow.product_cache.title_map() == {
+            "product-a": "Cyber Rally",
+            "product-b": "Space Miners",
+        }
+
+
+@pytest.mark.asyncio
+async def test_product_catalog_refresher_survives_unexpected_errors(
+    service_engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    uow_factory = StorageUnitOfWorkFactory(
+        make_session_factory(service_engine),
+        TokenEncryptor(TokenEncryptor.generate_key()),
+    )
+    catalog = ProductCatalog(uow_factory)
+    refresh = catalog.refresh
+    attempts: list[FakeDrovaClient] = []
+
+    async def flaky_refresh(client: FakeDrovaClient) -> bool:
+        attempts.append(client)
+        if len(attempts) == 1:
+            raise RuntimeError("database is locked")
+        return await refresh(client)
+
+    monkeypatch.setattr(catalog, "refresh", flaky_refresh)
+    task = asyncio.create_task(
+        catalog.run_refresher(
+            lambda: FakeDrovaClient(products=[CatalogProduct("product-a", "Cyber Rally")]),
+            interval_seconds=0,
+        )
+    )
+    for _ in range(200):
+        if len(attempts) >= 2:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert len(attempts) >= 2
+    assert all(client.closed for client in attempts[:2])
+    async with uow_factory() as uow:
+        assert await uow.product_cache.title_map() == {"product-a": "Cyber Rally"}
+
+
+@pytest.mark.asyncio
+async def test_station_cache_sync_is_skipped_within_freshness_window(
+    service_engine: AsyncEngine,
+    ui_stations: list[Station],
+) -> None:
+    session_factory = make_session_factory(service_engine)
+    now = [0.0]
+    service = BotService(
+        uow_factory=StorageUnitOfWorkFactory(
+            session_factory,
+            TokenEncryptor(TokenEncryptor.generate_key()),
+        ),
+        client_factory=FakeDrovaClientFactory(
+            FakeDrovaClient(stations=ui_stations),
+            FakeDrovaClient(stations=ui_stations),
+            FakeDrovaClient(stations=ui_stations),
+        ),
+        station_cache_fresh_seconds=60,
+        monotonic=lambda: now[0],
+    )
+    await service.connect_token(10001, "token")
+
+    async def cached_station_ids() -> set[str]:
+        async with session_factory() as session:
+            return set(await StationCacheRepository(session).station_names(10001))
+
+    async with session_factory() as session:
+        await StationCacheRepository(session).replace_for_chat(10001, [])
+        await session.commit()
+
+    await service.stations(10001)
+    assert await cached_station_ids() == set()
+
+    now[0] = 61.0
+    await service.stations(10001)
+    assert await cached_station_ids() == {station.uuid for station in ui_stations}
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from drova_bot.application.concurrency import fan_out, gather_all
+from drova_bot.drova.errors import DrovaUnauthorized, DrovaUnavailable
+
+
+@pytest.mark.asyncio
+async def test_fan_out_keeps_input_order_and_bounds_in_flight_calls() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def call(key: str) -> str:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 if key == "a" else 0)
+        in_flight -= 1
+        return key.upper()
+
+    result = await fan_out(["a", "b", "c", "d", "e"], call, limit=2)
+
+    assert list(result.values) == ["a", "b", "c", "d", "e"]
+    assert result.values["a"] == "A"
+    assert result.failures == {}
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_fan_out_captures_listed_errors_per_key() -> None:
+    async def call(key: str) -> int:
+        if key == "broken":
+            raise DrovaUnavailable("down")
+        return len(key)
+
+    result = await fan_out(["ok", "broken", "fine"], call, capture=(DrovaUnavailable,))
+
+    assert result.values == {"ok": 2, "fine": 4}
+    assert result.failed_keys == {"broken"}
+
+
+@pytest.mark.asyncio
+async def test_fan_out_reraises_uncaptured_error_and_cancels_siblings() -> None:
+    cancelled: list[str] = []
+
+    async def call(key: str) -> str:
+        if key == "auth":
+            raise DrovaUnauthorized("invalid")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(key)
+            raise
+        return key
+
+    with pytest.raises(DrovaUnauthorized):
+        await fan_out(["slow", "auth"], call, capture=(DrovaUnavailable,))
+
+    assert cancelled == ["slow"]
+
+
+@pytest.mark.asyncio
+async def test_gather_all_returns_results_in_argument_order() -> None:
+    async def value(result: str, delay: float) -> str:
+        await asyncio.sleep(delay)
+        return result
+
+    assert await gather_all(value("first", 0.01), value("second", 0)) == ("first", "second")
+
+
+@pytest.mark.asyncio
+async def test_gather_all_cancels_pending_reads_on_first_error() -> None:
+    cancelled = False
+
+    async def slow() -> str:
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return "slow"
+
+    async def failing() -> str:
+        raise DrovaUnavailable("down")
+
+    with pytest.raises(DrovaUnavailable):
+        await gather_all(slow(), failing())
+
+    assert cancelled
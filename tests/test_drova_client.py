@@ -1,11 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import json
+from collections.abc import AsyncIterator, Callable
+from datetime import UTC, datetime
+
 import httpx
 import pytest
 import respx
+from pydantic import ValidationError
 
+from drova_bot.drova.breaker import CircuitBreaker, CircuitState
 from drova_bot.drova.client import DrovaClient
-from drova_bot.drova.errors import DrovaUnavailable
+from drova_bot.drova.coalescing import RequestCoalescer
+from drova_bot.drova.errors import DrovaCircuitOpen, DrovaUnavailable
+from drova_bot.drova.models import (
+    CatalogProductResponse,
+    SessionPageResponse,
+    parse_catalog_products_json,
+    parse_sessions_json,
+)
+from drova_bot.drova.renewal import TokenRenewalCoordinator
+from drova_bot.drova.retry import RetryBudget, RetryPolicy, parse_retry_after
+from drova_bot.drova.streaming import iter_json_array
 
 from .conftest import load_api_response
 
@@ -41,6 +58,72 @@ async def test_get_sessions_parses_session_page() -> None:
     assert request.url.params["limit"] == "5"
 
 
+@pytest.mark.asyncio
+async def test_iter_sessions_streams_batches_matching_get_sessions() -> None:
+    body = load_api_response("sessions_all_limit_5.json")
+    with respx.mock(assert_all_called=True) as router:
+        route = router.get("https://services.drova.io/session-manager/sessions").mock(
+            return_value=httpx.Response(200, json=body)
+        )
+        async with DrovaClient(proxy_token="token") as client:
+            page = await client.get_sessions(merchant_id="user-1")
+            batches = [
+                batch
+                async for batch in client.iter_sessions(merchant_id="user-1", batch_size=2)
+            ]
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [session for batch in batches for session in batch] == page.sessions
+    assert route.calls[1].request.url.params["merchant_id"] == "user-1"
+
+
+@pytest.mark.asyncio
+async def test_iter_json_array_reads_split_chunks() -> None:
+    async def chunks(payload: bytes) -> AsyncIterator[bytes]:
+        for index in range(len(payload)):
+            yield payload[index : index + 1]
+
+    payload = '{"total": 12345, "note": "сессии", "sessions": [{"a": 1}, {"b": [2, 3]}]}'
+    items = [item async for item in iter_json_array(chunks(payload.encode()), key="sessions")]
+    assert items == [{"a": 1}, {"b": [2, 3]}]
+
+    plain = [item async for item in iter_json_array(chunks(b" [1, 22, 333] "), key="sessions")]
+    assert plain == [1, 22, 333]
+
+    empty = [item async for item in iter_json_array(chunks(b'{"other": []}'), key="sessions")]
+    assert empty == []
+
+    with pytest.raises(ValueError):
+        [item async for item in iter_json_array(chunks(b'{"sessions": [{"a": 1}'), key="sessions")]
+
+
+@pytest.mark.parametrize(
+    "fixture",
+    [
+        "sessions_all_limit_5.json",
+        "server_1_sessions_limit_5.json",
+        "server_2_sessions_limit_5.json",
+        "server_3_sessions_limit_5.json",
+    ],
+)
+def test_session_fast_path_matches_response_models(fixture: str) -> None:
+    payload = load_api_response(fixture)
+    content = json.dumps(payload).encode()
+
+    expected = SessionPageResponse.parse_payload(payload).to_domain().sessions
+    assert parse_sessions_json(content) == expected
+    assert parse_sessions_json(json.dumps(payload["sessions"]).encode()) == expected
+
+
+def test_catalog_fast_path_matches_response_models() -> None:
+    payload = load_api_response("products_full.json")
+
+    expected = [CatalogProductResponse.model_validate(item).to_domain() for item in payload]
+    assert parse_catalog_products_json(json.dumps(payload).encode()) == expected
+    with pytest.raises(ValidationError):
+        parse_catalog_products_json(b'[{"productId": 1}]')
+
+
 @pytest.mark.asyncio
 async def test_token_renewal_persists_before_retry() -> None:
     persisted: list[str] = []
@@ -83,6 +166,139 @@ async def test_read_requests_retry_timeout_once() -> None:
     assert len(route.calls) == 2
 
 
+@pytest.mark.asyncio
+async def test_read_requests_retry_overloaded_status_after_retry_after(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    delays: list[float] = []
+    real_sleep = asyncio.sleep
+
+    async def record_sleep(delay: float) -> None:
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr("drova_bot.drova.client.asyncio.sleep", record_sleep)
+    policy = RetryPolicy(max_attempts=3, jitter=lambda: 0.5)
+    with respx.mock(assert_all_called=True) as router:
+        route = router.get("https://services.drova.io/product-manager/product/listfull2").mock(
+            side_effect=[
+                httpx.Response(503),
+                httpx.Response(429, headers={"Retry-After": "2"}),
+                httpx.Response(200, json=load_api_response("products_full.json")),
+            ]
+        )
+        async with DrovaClient(proxy_token="token", retry_policy=policy) as client:
+            products = await client.get_products_full()
+
+    assert products
+    assert len(route.calls) == 3
+    assert delays == [0.1, 2.0]
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retry_budget_returns_overloaded_response() -> None:
+    policy = RetryPolicy(
+        max_attempts=3,
+        base_delay_seconds=0,
+        budget=RetryBudget(ratio=0, min_retries=0),
+    )
+    with respx.mock(assert_all_called=True) as router:
+        route = router.get("https://services.drova.io/product-manager/product/listfull2").mock(
+            return_value=httpx.Response(503)
+        )
+        async with DrovaClient(proxy_token="token", retry_policy=policy) as client:
+            with pytest.raises(DrovaUnavailable):
+                await client.get_products_full()
+
+    assert len(route.calls) == 1
+
+
+def test_retry_policy_caps_backoff_and_elapsed_budget() -> None:
+    policy = RetryPolicy(
+        max_attempts=10,
+        base_delay_seconds=1,
+        max_delay_seconds=4,
+        max_elapsed_seconds=10,
+        jitter=lambda: 1.0,
+    )
+
+    assert [policy.backoff_seconds(attempt) for attempt in range(1, 5)] == [1, 2, 4, 4]
+    assert policy.retry_delay(1, elapsed_seconds=9.5) is None
+    assert policy.retry_delay(1, elapsed_seconds=0, retry_after="30") is None
+    assert policy.retry_delay(10, elapsed_seconds=0) is None
+    now = datetime(2026, 10, 21, 7, 27, tzinfo=UTC)
+    assert parse_retry_after("Wed, 21 Oct 2026 07:28:00 GMT", now=now) == 60
+    assert parse_retry_after("soon") is None
+
+
+def test_retry_budget_forgets_requests_outside_the_window() -> None:
+    now = [0.0]
+    budget = RetryBudget(ratio=0.5, min_retries=0, window_seconds=10, clock=lambda: now[0])
+
+    for _ in range(10_000):
+        budget.record_request("services.drova.io")
+        now[0] += 0.1
+
+    # Only the last window of requests is kept, and it still funds retries.
+    assert len(budget._requests["services.drova.io"]) <= 101
+    assert budget.try_acquire_retry("services.drova.io")
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_per_path_family() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30, clock=lambda: now[0])
+    policy = RetryPolicy(max_attempts=1)
+    with respx.mock(assert_all_called=True) as router:
+        servers_route = router.get("https://services.drova.io/server-manager/servers").mock(
+            return_value=httpx.Response(502)
+        )
+        account_route = router.get("https://services.drova.io/accounting/myaccount").mock(
+            return_value=httpx.Response(200, json=load_api_response("account.json"))
+        )
+        async with DrovaClient(
+            proxy_token="token",
+            retry_policy=policy,
+            circuit_breaker=breaker,
+        ) as client:
+            for _ in range(2):
+                with pytest.raises(DrovaUnavailable):
+                    await client.get_servers("user-1")
+            with pytest.raises(DrovaCircuitOpen):
+                await client.get_servers("user-1")
+            await client.get_account()
+
+            assert len(servers_route.calls) == 2
+            assert breaker.states() == {
+                "accounting": CircuitState.CLOSED,
+                "server-manager": CircuitState.OPEN,
+            }
+
+            now[0] = 31.0
+            servers_route.mock(return_value=httpx.Response(200, json=[]))
+            assert await client.get_servers("user-1") == []
+
+    assert len(account_route.calls) == 1
+    assert breaker.states()["server-manager"] is CircuitState.CLOSED
+
+
+def test_half_open_circuit_admits_one_probe_and_reopens_on_failure() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=10, clock=lambda: now[0])
+    breaker.before_call("session-manager")
+    breaker.record_failure("session-manager")
+
+    now[0] = 10.0
+    breaker.before_call("session-manager")
+    with pytest.raises(DrovaCircuitOpen):
+        breaker.before_call("session-manager")
+    breaker.record_failure("session-manager")
+
+    assert breaker.states() == {"session-manager": CircuitState.OPEN}
+    with pytest.raises(DrovaCircuitOpen):
+        breaker.before_call("session-manager")
+
+
 @pytest.mark.asyncio
 async def test_publish_write_does_not_retry_timeout() -> None:
     with respx.mock(assert_all_called=True) as router:
@@ -272,3 +488,124 @@ async def test_next_write_endpoints_do_not_retry_timeout() -> None:
                 await client.set_server_product_enabled("station-1", "product-1", True)
 
     assert len(route.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_unauthorized_requests_renew_token_once() -> None:
+    persisted: list[str] = []
+
+    async def persist_token(token: str) -> None:
+        persisted.append(token)
+
+    def by_token(payload: object) -> Callable[[httpx.Request], httpx.Response]:
+        def respond(request: httpx.Request) -> httpx.Response:
+            if request.headers["X-Auth-Token"] == "old-token":
+                return httpx.Response(401, json={"error": "expired"})
+            return httpx.Response(200, json=payload)
+
+        return respond
+
+    with respx.mock(assert_all_called=True) as router:
+        router.get("https://services.drova.io/accounting/myaccount").mock(
+            side_effect=by_token(load_api_response("account.json"))
+        )
+        router.get("https://services.drova.io/server-manager/servers").mock(
+            side_effect=by_token(load_api_response("servers.json"))
+        )
+        renew_route = router.post("https://services.drova.io/token-verifier/renewProxyToken").mock(
+            return_value=httpx.Response(200, json={"proxyToken": "new-token"})
+        )
+        async with DrovaClient(proxy_token="old-token", token_persister=persist_token) as client:
+            account, stations = await asyncio.gather(
+                client.get_account(),
+                client.get_servers("user-1"),
+            )
+
+    assert account.uuid == "<uuid:1>"
+    assert stations
+    assert len(renew_route.calls) == 1
+    assert persisted == ["new-token"]
+    assert client.proxy_token == "new-token"
+
+
+@pytest.mark.asyncio
+async def test_clients_sharing_coordinator_renew_and_persist_once_per_token() -> None:
+    persisted: list[str] = []
+
+    async def persist_token(token: str) -> None:
+        persisted.append(token)
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        if request.headers["X-Auth-Token"] == "old-token":
+            return httpx.Response(401, json={"error": "expired"})
+        return httpx.Response(200, json=load_api_response("account.json"))
+
+    coordinator = TokenRenewalCoordinator()
+    with respx.mock(assert_all_called=True) as router:
+        router.get("https://services.drova.io/accounting/myaccount").mock(side_effect=respond)
+        renew_route = router.post("https://services.drova.io/token-verifier/renewProxyToken").mock(
+            return_value=httpx.Response(200, json={"proxyToken": "new-token"})
+        )
+        clients = [
+            DrovaClient(
+                proxy_token="old-token",
+                token_persister=persist_token,
+                renewal_coordinator=coordinator,
+            )
+            for _ in range(3)
+        ]
+        await asyncio.gather(clients[0].get_account(), clients[1].get_account())
+        await clients[2].get_account()
+        for client in clients:
+            await client.aclose()
+
+    assert len(renew_route.calls) == 1
+    assert persisted == ["new-token"]
+    assert {client.proxy_token for client in clients} == {"new-token"}
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_reads_share_one_request_per_token() -> None:
+    async def slow_servers(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=load_api_response("servers.json"))
+
+    coalescer = RequestCoalescer()
+    with respx.mock(assert_all_called=True) as router:
+        route = router.get("https://services.drova.io/server-manager/servers").mock(
+            side_effect=slow_servers
+        )
+        first = DrovaClient(proxy_token="token-a", request_coalescer=coalescer)
+        second = DrovaClient(proxy_token="token-a", request_coalescer=coalescer)
+        other = DrovaClient(proxy_token="token-b", request_coalescer=coalescer)
+        results = await asyncio.gather(
+            first.get_servers("user-1"),
+            second.get_servers("user-1"),
+            other.get_servers("user-1"),
+        )
+        for client in [first, second, other]:
+            await client.aclose()
+
+    assert results[0] == results[1] == results[2]
+    assert len(route.calls) == 2
+    assert {call.request.headers["X-Auth-Token"] for call in route.calls} == {
+        "token-a",
+        "token-b",
+    }
+    assert coalescer.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_get_writes_are_never_coalesced() -> None:
+    async def slow_issue(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=load_api_response("promocodes_issue_60.json"))
+
+    with respx.mock(assert_all_called=True) as router:
+        route = router.get(
+            "https://services.drova.io/accounting/prepaid/issue_promocodes/1/3600000"
+        ).mock(side_effect=slow_issue)
+        async with DrovaClient(proxy_token="token") as client:
+            await asyncio.gather(client.issue_promocode(60), client.issue_promocode(60))
+
+    assert len(route.calls) == 2
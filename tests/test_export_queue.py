@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncGenerator, Callable
+from pathlib import Path
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from drova_bot.application.export_jobs import ExportJob, ExportJobQueue
+from drova_bot.exports import ExportKind
+from drova_bot.storage import (
+    ExportJobRepository,
+    StorageUnitOfWorkFactory,
+    TokenEncryptor,
+    create_database_engine,
+    create_schema,
+    make_session_factory,
+)
+from drova_bot.storage.database import ExportJobRow
+
+
+@pytest.fixture
+async def engine(tmp_path: Path) -> AsyncGenerator[AsyncEngine]:
+    async_engine = create_database_engine(f"sqlite+aiosqlite:///{tmp_path / 'drova.sqlite3'}")
+    await create_schema(async_engine)
+    try:
+        yield async_engine
+    finally:
+        await async_engine.dispose()
+
+
+@pytest.fixture
+def uow_factory(engine: AsyncEngine) -> StorageUnitOfWorkFactory:
+    return StorageUnitOfWorkFactory(
+        make_session_factory(engine),
+        TokenEncryptor(TokenEncryptor.generate_key()),
+    )
+
+
+async def enqueue(uow_factory: StorageUnitOfWorkFactory, job_id: str, chat_id: int) -> None:
+    async with uow_factory() as uow:
+        await uow.export_jobs.create(
+            job_id=job_id,
+            telegram_chat_id=chat_id,
+            kind=ExportKind.PRODUCTS.value,
+        )
+
+
+async def job_row(uow_factory: StorageUnitOfWorkFactory, job_id: str) -> ExportJobRow:
+    async with uow_factory() as uow:
+        row = await uow.export_jobs.get(job_id)
+    assert row is not None
+    return row
+
+
+async def eventually(condition: Callable[[], bool]) -> None:
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_queue_enforces_global_and_per_chat_caps(
+    uow_factory: StorageUnitOfWorkFactory,
+) -> None:
+    for job_id, chat_id in [("a1", 1), ("a2", 1), ("a3", 1), ("b1", 2), ("c1", 3)]:
+        await enqueue(uow_factory, job_id, chat_id)
+    started: list[str] = []
+    running: Counter[int] = Counter()
+    peaks = {"global": 0, "chat": 0}
+
+    async def runner(job: ExportJob) -> None:
+        started.append(job.id)
+        running[job.telegram_chat_id] += 1
+        peaks["global"] = max(peaks["global"], sum(running.values()))
+        peaks["chat"] = max(peaks["chat"], running[job.telegram_chat_id])
+        await asyncio.sleep(0.02)
+        running[job.telegram_chat_id] -= 1
+
+    queue = ExportJobQueue(uow_factory, runner, workers=2, per_chat_limit=1)
+    task = asyncio.create_task(queue.run())
+    await eventually(lambda: len(started) == 5 and not any(running.values()))
+    await queue.drain(1.0)
+    await task
+
+    assert peaks == {"global": 2, "chat": 1}
+    assert [job_id for job_id in started if job_id.startswith("a")] == ["a1", "a2", "a3"]
+    # Other chats are not stuck behind chat 1's backlog.
+    assert started.index("b1") < started.index("a3")
+    assert started.index("c1") < started.index("a3")
+    assert (await job_row(uow_factory, "a1")).attempts == 1
+    assert queue.stats().queued == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_requeues_interrupted_jobs_and_fails_exhausted_ones(
+    engine: AsyncEngine,
+    uow_factory: StorageUnitOfWorkFactory,
+) -> None:
+    await enqueue(uow_factory, "interrupted", 1)
+    await enqueue(uow_factory, "exhausted", 2)
+    async with uow_factory() as uow:
+        assert await uow.export_jobs.claim_next() is not None
+        assert await uow.export_jobs.claim_next() is not None
+        assert await uow.export_jobs.count_by_status() == {"running": 2}
+    async with make_session_factory(engine)() as session, session.begin():
+        await session.execute(
+            update(ExportJobRow).where(ExportJobRow.id == "exhausted").values(attempts=3)
+        )
+    ran: list[str] = []
+
+    async def runner(job: ExportJob) -> None:
+        ran.append(job.id)
+        async with uow_factory() as uow:
+            await uow.export_jobs.mark_done(job.id)
+
+    queue = ExportJobQueue(uow_factory, runner, max_attempts=3)
+    task = asyncio.create_task(queue.run())
+    await eventually(lambda: ran == ["interrupted"])
+    await queue.drain(1.0)
+    await task
+
+    interrupted = await job_row(uow_factory, "interrupted")
+    exhausted = await job_row(uow_factory, "exhausted")
+    assert (interrupted.status, interrupted.attempts) == ("done", 2)
+    assert (exhausted.status, exhausted.error_code) == ("failed", "interrupted")
+
+
+@pytest.mark.asyncio
+async def test_drain_stops_claiming_and_leaves_overdue_jobs_for_the_next_start(
+    uow_factory: StorageUnitOfWorkFactory,
+) -> None:
+    await enqueue(uow_factory, "slow", 1)
+    await enqueue(uow_factory, "waiting", 1)
+    release = asyncio.Event()
+    ran: list[str] = []
+
+    async def blocking_runner(job: ExportJob) -> None:
+        ran.append(job.id)
+        await release.wait()
+
+    queue = ExportJobQueue(uow_factory, blocking_runner, workers=2)
+    task = asyncio.create_task(queue.run())
+    await eventually(lambda: ran == ["slow"])
+    assert queue.stats().running == 1
+    await queue.drain(0.05)
+    await task
+
+    assert ran == ["slow"]
+    assert (await job_row(uow_factory, "slow")).status == "running"
+    assert (await job_row(uow_factory, "waiting")).status == "queued"
+
+    resumed: list[str] = []
+
+    async def runner(job: ExportJob) -> None:
+        resumed.append(job.id)
+
+    restarted = ExportJobQueue(uow_factory, runner)
+    task = asyncio.create_task(restarted.run())
+    await eventually(lambda: resumed == ["slow", "waiting"])
+    await restarted.drain(1.0)
+    await task
+
+
+@pytest.mark.asyncio
+async def test_runner_failure_marks_job_failed_and_queue_continues(
+    uow_factory: StorageUnitOfWorkFactory,
+) -> None:
+    await enqueue(uow_factory, "broken", 1)
+    await enqueue(uow_factory, "fine", 1)
+    ran: list[str] = []
+
+    async def runner(job: ExportJob) -> None:
+        ran.append(job.id)
+        if job.id == "broken":
+            raise RuntimeError("boom")
+
+    queue = ExportJobQueue(uow_factory, runner, workers=1)
+    queue.notify()
+    task = asyncio.create_task(queue.run())
+    await eventually(lambda: ran == ["broken", "fine"])
+    await queue.drain(1.0)
+    await task
+
+    broken = await job_row(uow_factory, "broken")
+    assert (broken.status, broken.error_code) == ("failed", "unexpected_export_error")
+
+
+@pytest.mark.asyncio
+async def test_runner_failure_after_finish_keeps_job_done(
+    uow_factory: StorageUnitOfWorkFactory,
+) -> None:
+    await enqueue(uow_factory, "delivered", 1)
+    ran: list[str] = []
+
+    async def runner(job: ExportJob) -> None:
+        async with uow_factory() as uow:
+            await uow.export_jobs.mark_done(job.id)
+        ran.append(job.id)
+        raise RuntimeError("delivery boom")
+
+    queue = ExportJobQueue(uow_factory, runner, workers=1)
+    queue.notify()
+    task = asyncio.create_task(queue.run())
+    await eventually(lambda: ran == ["delivered"])
+    await queue.drain(1.0)
+    await task
+
+    delivered = await job_row(uow_factory, "delivered")
+    assert (delivered.status, delivered.error_code) == ("done", None)
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_failing_failure_bookkeeping(
+    uow_factory: StorageUnitOfWorkFactory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await enqueue(uow_factory, "broken", 1)
+    await enqueue(uow_factory, "fine", 1)
+    ran: list[str] = []
+
+    async def runner(job: ExportJob) -> None:
+        ran.append(job.id)
+        if job.id == "broken":
+            raise RuntimeError("boom")
+
+    async def unavailable(*args: object, **kwargs: object) -> bool:
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(ExportJobRepository, "fail_if_running", unavailable)
+    queue = ExportJobQueue(uow_factory, runner, workers=1)
+    queue.notify()
+    task = asyncio.create_task(queue.run())
+    # A single worker still picks up the next job.
+    await eventually(lambda: ran == ["broken", "fine"])
+    await queue.drain(1.0)
+    await task
+
+    assert (await job_row(uow_factory, "broken")).status == "running"
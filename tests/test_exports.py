@@ -1,15 +1,31 @@
 from __future__ import annotations
 
+import asyncio
 import csv
-from datetime import datetime, timedelta
+import os
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime, timedelta
 from io import BytesIO, StringIO
+from pathlib import Path
+from zipfile import ZIP_DEFLATED, ZipFile
 
 import pytest
 from openpyxl import load_workbook
 
 from drova_bot.domain.models import Session, Station, StationProduct
+from drova_bot.exports import (
+    ExportArtifactCache,
+    ExportCacheScope,
+    ExportKind,
+    ProcessExportExecutor,
+)
+from drova_bot.exports.cache import ExportArtifact, ExportCacheKey
+from drova_bot.exports.executor import pack_records, unpack_records
 from drova_bot.exports.products import ProductExportService
 from drova_bot.exports.sessions import SESSION_EXPORT_HEADERS, SessionExportService
+from drova_bot.exports.xlsx import StyledValue, write_xlsx
 
 
 @pytest.mark.asyncio
@@ -70,6 +86,45 @@ async def test_sessions_csv_per_station_headers_and_sanitized_filename(
     assert alpha_rows[2][1] == "Desktop Mode"
 
 
+@pytest.mark.asyncio
+async def test_sessions_csv_zip_bundles_station_csvs(
+    ui_sessions: list[Session],
+    ui_stations: list[Station],
+    ui_catalog: dict[str, str],
+    ui_now: datetime,
+) -> None:
+    # Sanitizes to the same member name as "Alpha Station".
+    stations = [*ui_stations, replace(ui_stations[0], uuid="station-alpha-2", name="alpha station")]
+    service = SessionExportService()
+    files = await service.build_sessions_csv_by_station(
+        sessions=ui_sessions,
+        stations=stations,
+        product_catalog=ui_catalog,
+        now=ui_now,
+        timezone="Asia/Yekaterinburg",
+    )
+    export = await service.build_sessions_csv_zip(
+        sessions=ui_sessions,
+        stations=stations,
+        product_catalog=ui_catalog,
+        now=ui_now,
+        timezone="Asia/Yekaterinburg",
+    )
+
+    assert export.filename == "drova-sessions-csv-20260518-120000.zip"
+    assert export.content_type == "application/zip"
+    with ZipFile(BytesIO(export.payload)) as archive:
+        members = archive.infolist()
+        assert [member.filename for member in members] == [
+            "drova-sessions-alpha-station.csv",
+            "drova-sessions-alpha-station-2.csv",
+            "drova-sessions-beta-test-station.csv",
+            "drova-sessions-gamma-trial.csv",
+        ]
+        assert {member.compress_type for member in members} == {ZIP_DEFLATED}
+        assert [archive.read(member) for member in members] == [file.payload for file in files]
+
+
 @pytest.mark.asyncio
 async def test_products_xlsx_sorted_matrix_and_problem_fill(
     ui_stations: list[Station],
@@ -136,3 +191,191 @@ async def test_product_time_xlsx_durations_and_total_formula(
     assert sheet["E2"].number_format == "[h]:mm:ss"
     assert sheet["A4"].value == "Space Farm"
     assert sheet["D4"].value == timedelta(minutes=20)
+
+
+def test_write_xlsx_consumes_rows_lazily_and_keeps_styles() -> None:
+    produced: list[int] = []
+
+    def rows() -> Iterator[list[object]]:
+        yield ["n", "styled"]
+        for index in range(3):
+            produced.append(index)
+            yield [index, StyledValue(index / 86_400, number_format="[h]:mm:ss")]
+
+    row_iterator = rows()
+    payload = write_xlsx("numbers", row_iterator)
+
+    sheet = load_workbook(BytesIO(payload))["numbers"]
+    assert produced == [0, 1, 2]
+    assert next(row_iterator, None) is None
+    assert [cell.value for cell in sheet["A"]] == ["n", 0, 1, 2]
+    assert sheet["B4"].number_format == "[h]:mm:ss"
+
+
+@pytest.mark.asyncio
+async def test_process_executor_builds_sessions_xlsx_from_packed_records(
+    ui_sessions: list[Session],
+    ui_stations: list[Station],
+    ui_catalog: dict[str, str],
+    ui_now: datetime,
+) -> None:
+    executor = ProcessExportExecutor(max_workers=1)
+    try:
+        export = await SessionExportService(executor).build_sessions_xlsx(
+            sessions=ui_sessions,
+            stations=ui_stations,
+            product_catalog=ui_catalog,
+            now=ui_now,
+            timezone="Asia/Yekaterinburg",
+        )
+    finally:
+        executor.close()
+
+    sheet = load_workbook(BytesIO(export.payload))["sessions"]
+    assert export.filename == "drova-sessions-20260518-120000.xlsx"
+    assert [cell.value for cell in sheet[1]] == SESSION_EXPORT_HEADERS
+    assert sheet["A2"].value == "Gamma Trial"
+    assert sheet["H2"].value == "00:20:00"
+
+
+def test_pack_records_round_trips_single_field_dataclasses() -> None:
+    @dataclass(frozen=True, slots=True)
+    class Single:
+        value: str
+
+    records = pack_records(Single, [Single("a"), Single("bc")])
+
+    assert records == [("a",), ("bc",)]
+    assert unpack_records(Single, records) == [Single("a"), Single("bc")]
+
+
+@pytest.mark.asyncio
+async def test_process_executor_timeout_terminates_running_builder() -> None:
+    executor = ProcessExportExecutor(max_workers=1)
+    try:
+        worker_pid = await executor.run(os.getpid)
+
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(executor.run(time.sleep, 30.0), timeout=0.5)
+
+        assert await executor.run(os.getpid) != worker_pid
+        assert time.monotonic() - started < 20
+    finally:
+        executor.close()
+
+
+class CountingExecutor:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def run[*Ts, T](self, fn: Callable[[*Ts], T], /, *args: *Ts) -> T:
+        self.calls += 1
+        return fn(*args)
+
+    def close(self) -> None:
+        return None
+
+
+@pytest.mark.asyncio
+async def test_export_cache_serves_unchanged_inputs_across_chats_and_restarts(
+    tmp_path: Path,
+    ui_stations: list[Station],
+    ui_products_by_station: dict[str, list[StationProduct]],
+    ui_now: datetime,
+) -> None:
+    executor = CountingExecutor()
+    service = ProductExportService(executor, cache=ExportArtifactCache(tmp_path))
+    merchant = ExportCacheScope("merchant-1")
+
+    first = await service.build_products_xlsx(
+        stations=ui_stations,
+        products_by_station=ui_products_by_station,
+        now=ui_now,
+        cache_scope=merchant,
+    )
+    later = ui_now + timedelta(hours=1)
+    second = await service.build_products_xlsx(
+        stations=list(ui_stations),
+        products_by_station={key: list(value) for key, value in ui_products_by_station.items()},
+        now=later,
+        cache_scope=ExportCacheScope("merchant-1"),
+    )
+    assert executor.calls == 1
+    assert second.payload == first.payload
+    # A hit keeps the name of the first build, so Telegram can resend it by file_id.
+    assert second.filename == first.filename == "drova-products-20260518-120000.xlsx"
+
+    restarted = ProductExportService(executor, cache=ExportArtifactCache(tmp_path))
+    after_restart = await restarted.build_products_xlsx(
+        stations=ui_stations,
+        products_by_station=ui_products_by_station,
+        now=later,
+        cache_scope=merchant,
+    )
+    assert executor.calls == 1
+    assert after_restart.filename == first.filename
+
+    await service.build_products_xlsx(
+        stations=ui_stations,
+        products_by_station=ui_products_by_station,
+        now=later,
+        cache_scope=ExportCacheScope("merchant-2"),
+    )
+    station_id, products = next(iter(ui_products_by_station.items()))
+    changed = {
+        **ui_products_by_station,
+        station_id: [replace(products[0], enabled=not products[0].enabled), *products[1:]],
+    }
+    await service.build_products_xlsx(
+        stations=ui_stations,
+        products_by_station=changed,
+        now=later,
+        cache_scope=merchant,
+    )
+    assert executor.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_export_cache_rebuilds_open_session_durations_for_a_new_clock(
+    tmp_path: Path,
+    ui_sessions: list[Session],
+    ui_stations: list[Station],
+    ui_catalog: dict[str, str],
+    ui_now: datetime,
+) -> None:
+    assert any(session.finished_on_ms is None for session in ui_sessions)
+    executor = CountingExecutor()
+    service = ProductExportService(executor, cache=ExportArtifactCache(tmp_path))
+
+    for now in (ui_now, ui_now, ui_now + timedelta(minutes=1)):
+        await service.build_product_time_xlsx(
+            stations=ui_stations,
+            sessions=ui_sessions,
+            product_catalog=ui_catalog,
+            now=now,
+            cache_scope=ExportCacheScope("merchant-1"),
+        )
+
+    assert executor.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_export_artifact_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ExportArtifactCache(tmp_path, max_bytes=10)
+    keys = [
+        ExportCacheKey(ExportCacheScope("merchant-1"), ExportKind.PRODUCTS, None, str(index))
+        for index in range(3)
+    ]
+
+    built_at = datetime(2026, 5, 18, 12, 0, tzinfo=UTC)
+    for key, payload in zip(keys[:2], (b"aaaa", b"bbbb"), strict=True):
+        await cache.put(key, ExportArtifact(payload, built_at))
+    assert await cache.get(keys[0]) == ExportArtifact(b"aaaa", built_at)
+    await cache.put(keys[2], ExportArtifact(b"cccc", built_at))
+
+    assert await cache.get(keys[1]) is None
+    assert await cache.get(keys[0]) == ExportArtifact(b"aaaa", built_at)
+    assert await cache.get(keys[2]) == ExportArtifact(b"cccc", built_at)
+    assert cache.size_bytes == 8
+    assert len(list(tmp_path.glob("*.artifact"))) == 2
@@ -1,22 +1,26 @@
 from __future__ import annotations
 
+from types import SimpleNamespace
 from typing import Any, cast
 
 import pytest
-from aiogram.exceptions import TelegramBadRequest
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
 from aiogram.methods import SendMessage
 from aiogram.types import CallbackQuery, Message
 
+from drova_bot.application.export_jobs import ExportDeliveryTarget, ExportJob
 from drova_bot.drova.errors import TelegramDeliveryFailed
 from drova_bot.exports import ExportFile, ExportKind, ExportResult
 from drova_bot.telegram.callbacks import CallbackSpec, parse_callback_data
-from drova_bot.telegram.delivery import answer_rendered
+from drova_bot.telegram.delivery import answer_rendered, document_hash
 from drova_bot.telegram.renderers import RenderedMessage
 from drova_bot.telegram.routers import build_router
 from drova_bot.telegram.routers.core import (
     account_command,
     account_menu_command,
     callback_query,
+    csv_bundle_command,
     current_command,
     deliver_export_job,
     desktop_off_command,
@@ -105,6 +109,52 @@ class FakeMessage:
         return self
 
 
+class FakeBot:
+    def __init__(
+        self,
+        *,
+        fail_document: bool = False,
+        fail_chat_ids: set[int] | None = None,
+        forbidden_chat_ids: set[int] | None = None,
+        rejected_file_ids: set[str] | None = None,
+    ) -> None:
+        self.fail_document = fail_document
+        self.fail_chat_ids = fail_chat_ids or set()
+        self.forbidden_chat_ids = forbidden_chat_ids or set()
+        self.rejected_file_ids = rejected_file_ids or set()
+        self.documents: list[tuple[int, Any]] = []
+        self.edits: list[tuple[str, dict[str, Any]]] = []
+        self.sent: list[tuple[int, str]] = []
+
+    async def send_document(self, chat_id: int, document: Any) -> SimpleNamespace:
+        if self.fail_document or chat_id in self.fail_chat_ids:
+            raise _telegram_bad_request()
+        if chat_id in self.forbidden_chat_ids:
+            raise TelegramForbiddenError(
+                method=SendMessage(chat_id=chat_id, text="x"),
+                message="bot was blocked by the user",
+            )
+        if isinstance(document, str) and document in self.rejected_file_ids:
+            raise _telegram_bad_request()
+        self.documents.append((chat_id, document))
+        file_id = document if isinstance(document, str) else f"file-{len(self.documents)}"
+        return SimpleNamespace(document=SimpleNamespace(file_id=file_id))
+
+    async def edit_message_text(self, text: str, **kwargs: Any) -> None:
+        self.edits.append((text, kwargs))
+
+    async def send_message(self, chat_id: int, text: str, **kwargs: Any) -> None:
+        self.sent.append((chat_id, text))
+
+
+class FakeExportQueue:
+    def __init__(self) -> None:
+        self.notified = 0
+
+    def notify(self) -> None:
+        self.notified += 1
+
+
 class FakeCallback:
     def __init__(self, data: str | None) -> None:
         self.data = data
@@ -119,6 +169,8 @@ class FakeCallback:
 class FakeService:
     def __init__(self) -> None:
         self.calls: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+        self.export_targets: list[ExportDeliveryTarget] = []
+        self.file_ids: dict[str, str] = {}
 
     async def start(self, chat_id: int) -> RenderedMessage:
         self.calls.append(("start", (chat_id,), {}))
@@ -148,6 +200,10 @@ class FakeService:
         self.calls.append(("set_limit", (chat_id, raw_limit), {}))
         return RenderedMessage(f"limit:{raw_limit}")
 
+    async def set_csv_bundle_mode(self, chat_id: int, raw_mode: str) -> RenderedMessage:
+        self.calls.append(("set_csv_bundle_mode", (chat_id, raw_mode), {}))
+        return RenderedMessage("csv bundle")
+
     async def sessions(self, chat_id: int, *, short_mode: bool = False) -> RenderedMessage:
         self.calls.append(("sessions", (chat_id,), {"short_mode": short_mode}))
         return RenderedMessage(f"sessions:{short_mode}")
@@ -257,8 +313,16 @@ class FakeService:
         self.calls.append(("export", (chat_id, kind), {}))
         return await self._export_result(kind)
 
-    async def create_export_job(self, chat_id: int, kind: ExportKind) -> object:
-        self.calls.append(("create_export_job", (chat_id, kind), {}))
+    async def create_export_job(
+        self,
+        chat_id: int,
+        kind: ExportKind,
+        *,
+        progress_message_id: int | None = None,
+    ) -> object:
+        self.calls.append(
+            ("create_export_job", (chat_id, kind), {"progress_message_id": progress_message_id})
+        )
         return FakeExportJob("job-1")
 
     async def run_export_job(
@@ -274,6 +338,26 @@ class FakeService:
     async def fail_export_job(self, job_id: str, error_code: str) -> None:
         self.calls.append(("fail_export_job", (job_id, error_code), {}))
 
+    async def export_job_targets(self, job_id: str) -> list[ExportDeliveryTarget]:
+        return list(self.export_targets)
+
+    async def telegram_file_ids(self, content_hashes: Any) -> dict[str, str]:
+        return {
+            content_hash: self.file_ids[content_hash]
+            for content_hash in content_hashes
+            if content_hash in self.file_ids
+        }
+
+    async def remember_telegram_file(
+        self,
+        content_hash: str,
+        file_id: str,
+        *,
+        size_bytes: int,
+    ) -> None:
+        self.calls.append(("remember_telegram_file", (content_hash, file_id), {}))
+        self.file_ids[content_hash] = file_id
+
     async def _export_result(self, kind: ExportKind) -> ExportResult:
         return ExportResult(
             files=[
@@ -352,6 +436,7 @@ async def test_token_limit_sessions_and_station_handlers_parse_arguments() -> No
     token_message = FakeMessage("/token proxy-token")
     await token_command(cast(Message, token_message), service)  # type: ignore[arg-type]
     await limit_command(cast(Message, FakeMessage("/limit 25")), service)  # type: ignore[arg-type]
+    await csv_bundle_command(cast(Message, FakeMessage("/csv_bundle zip")), service)  # type: ignore[arg-type]
     await sessions_short_command(cast(Message, FakeMessage("/sessions_short")), service)  # type: ignore[arg-type]
     await station_all_command(cast(Message, FakeMessage("/station_all")), service)  # type: ignore[arg-type]
     await promocode_command(cast(Message, FakeMessage("/promocode 60")), service)  # type: ignore[arg-type]
@@ -389,6 +474,7 @@ async def test_token_limit_sessions_and_station_handlers_parse_arguments() -> No
     assert service.calls == [
         ("connect_token", (10001, "proxy-token"), {}),
         ("set_limit", (10001, "25"), {}),
+        ("set_csv_bundle_mode", (10001, "zip"), {}),
         ("sessions", (10001,), {"short_mode": True}),
         ("select_all_stations", (10001,), {}),
         ("issue_promocode", (10001, "60"), {}),
@@ -426,39 +512,148 @@ async def test_legacy_multiword_command_aliases_still_work() -> None:
 
 
 @pytest.mark.asyncio
-async def test_legacy_logout_and_one_word_export_command(monkeypatch: pytest.MonkeyPatch) -> None:
-    from drova_bot.telegram.routers import core
-
+async def test_legacy_logout_and_one_word_export_command() -> None:
     service = FakeService()
+    queue = FakeExportQueue()
     logout_message = FakeMessage("/removeToken")
     export_message = FakeMessage("/export_sessions_csv")
-    scheduled: list[Any] = []
-
-    def capture_task(coro: Any) -> None:
-        scheduled.append(coro)
-
-    monkeypatch.setattr(core, "schedule_background_task", capture_task)
 
     await logout_command(cast(Message, logout_message), service)  # type: ignore[arg-type]
-    await export_command(cast(Message, export_message), service)  # type: ignore[arg-type]
+    await export_command(
+        cast(Message, export_message),
+        service,  # type: ignore[arg-type]
+        queue,  # type: ignore[arg-type]
+    )
 
     assert service.calls == [
         ("logout", (10001,), {}),
-        ("create_export_job", (10001, ExportKind.SESSIONS_CSV), {}),
+        (
+            "create_export_job",
+            (10001, ExportKind.SESSIONS_CSV),
+            {"progress_message_id": None},
+        ),
     ]
     assert export_message.answers[0][0] == "Готовлю файл..."
     assert export_message.documents == []
-    assert scheduled
+    assert queue.notified == 1
+
+
+@pytest.mark.asyncio
+async def test_deliver_export_job_sends_files_and_edits_progress_by_id() -> None:
+    service = FakeService()
+    bot = FakeBot()
+    job = ExportJob(
+        id="job-1",
+        telegram_chat_id=10001,
+        kind=ExportKind.SESSIONS_CSV,
+        status="running",
+        progress_message_id=77,
+    )
+
+    await deliver_export_job(job, bot=cast(Bot, bot), bot_service=service)  # type: ignore[arg-type]
+
+    assert service.calls == [
+        ("run_export_job", ("job-1", 10001, ExportKind.SESSIONS_CSV), {}),
+        ("remember_telegram_file", (document_hash("sessions_csv.xlsx", b"payload"), "file-1"), {}),
+    ]
+    assert bot.documents[0][0] == 10001
+    assert bot.documents[0][1].filename == "sessions_csv.xlsx"
+    assert bot.edits[-1][0] == "Файл готов."
+    assert bot.edits[-1][1]["message_id"] == 77
 
-    await scheduled[0]
 
-    assert service.calls[-1] == (
-        "run_export_job",
-        ("job-1", 10001, ExportKind.SESSIONS_CSV),
-        {},
+@pytest.mark.asyncio
+async def test_deliver_export_job_reuses_file_id_for_attached_targets() -> None:
+    service = FakeService()
+    service.export_targets = [
+        ExportDeliveryTarget(10002, progress_message_id=88),
+        ExportDeliveryTarget(10003),
+        ExportDeliveryTarget(10004),
+    ]
+    bot = FakeBot(fail_chat_ids={10003})
+    job = ExportJob(
+        id="job-1",
+        telegram_chat_id=10001,
+        kind=ExportKind.SESSIONS,
+        status="running",
+        progress_message_id=77,
     )
-    assert export_message.documents[0][0].filename == "sessions_csv.xlsx"
-    assert export_message.edits[-1][0] == "Файл готов."
+
+    await deliver_export_job(job, bot=cast(Bot, bot), bot_service=service)  # type: ignore[arg-type]
+
+    assert [chat_id for chat_id, _ in bot.documents] == [10001, 10002, 10004]
+    assert bot.documents[0][1].filename == "sessions.xlsx"
+    assert [document for _, document in bot.documents[1:]] == ["file-1", "file-1"]
+    assert [kwargs["message_id"] for _, kwargs in bot.edits] == [77, 88]
+    assert bot.sent == [(10004, "Файл готов.")]
+    # A failed extra target does not fail the job.
+    assert [call[0] for call in service.calls] == ["run_export_job", "remember_telegram_file"]
+
+
+@pytest.mark.asyncio
+async def test_deliver_export_job_skips_forbidden_chat_and_keeps_file_id() -> None:
+    service = FakeService()
+    service.export_targets = [ExportDeliveryTarget(10002), ExportDeliveryTarget(10003)]
+    bot = FakeBot(forbidden_chat_ids={10002})
+    job = ExportJob(id="job-1", telegram_chat_id=10001, kind=ExportKind.SESSIONS, status="running")
+
+    await deliver_export_job(job, bot=cast(Bot, bot), bot_service=service)  # type: ignore[arg-type]
+
+    assert bot.documents[0][0] == 10001
+    assert bot.documents[1:] == [(10003, "file-1")]
+    assert bot.sent == [(10001, "Файл готов."), (10003, "Файл готов.")]
+    assert [call[0] for call in service.calls] == ["run_export_job", "remember_telegram_file"]
+
+
+@pytest.mark.asyncio
+async def test_deliver_export_job_sends_known_payload_by_stored_file_id() -> None:
+    service = FakeService()
+    service.file_ids[document_hash("sessions.xlsx", b"payload")] = "stored"
+    bot = FakeBot()
+    job = ExportJob(id="job-1", telegram_chat_id=10001, kind=ExportKind.SESSIONS, status="running")
+
+    await deliver_export_job(job, bot=cast(Bot, bot), bot_service=service)  # type: ignore[arg-type]
+
+    assert bot.documents == [(10001, "stored")]
+    assert [call[0] for call in service.calls] == ["run_export_job"]
+
+    # An id Telegram no longer accepts is replaced by the one from a fresh upload.
+    bot = FakeBot(rejected_file_ids={"stored"})
+    await deliver_export_job(job, bot=cast(Bot, bot), bot_service=service)  # type: ignore[arg-type]
+
+    assert bot.documents[0][1].filename == "sessions.xlsx"
+    assert service.file_ids[document_hash("sessions.xlsx", b"payload")] == "file-1"
+
+
+@pytest.mark.asyncio
+async def test_deliver_export_job_uploads_same_payload_under_new_filename() -> None:
+    service = FakeService()
+    bot = FakeBot()
+    first = ExportJob(
+        id="job-1",
+        telegram_chat_id=10001,
+        kind=ExportKind.SESSIONS,
+        status="running",
+    )
+    second = ExportJob(
+        id="job-2",
+        telegram_chat_id=10001,
+        kind=ExportKind.SESSIONS_CSV,
+        status="running",
+    )
+
+    await deliver_export_job(first, bot=cast(Bot, bot), bot_service=service)  # type: ignore[arg-type]
+    await deliver_export_job(second, bot=cast(Bot, bot), bot_service=service)  # type: ignore[arg-type]
+
+    # Same bytes, different name: the stored file_id would resend the first filename.
+    assert [document.filename for _, document in bot.documents] == [
+        "sessions.xlsx",
+        "sessions_csv.xlsx",
+    ]
+    assert service.file_ids == {
+        document_hash("sessions.xlsx", b"payload"): "file-1",
+        document_hash("sessions_csv.xlsx", b"payload"): "file-2",
+    }
 
 
 def test_export_kind_mapping() -> None:
@@ -649,25 +844,21 @@ async def test_html_delivery_failure_after_fallback_raises_safe_error() -> None:
 
 
 @pytest.mark.asyncio
-async def test_export_delivery_failure_marks_job_failed() -> None:
+async def test_export_delivery_failure_leaves_job_status_to_the_build() -> None:
     service = FakeService()
-    message = FakeMessage("/dumpall", fail_document=True)
-
-    await deliver_export_job(
-        source_message=cast(Message, message),
-        progress_message=cast(Message, message),
-        bot_service=service,  # type: ignore[arg-type]
+    bot = FakeBot(fail_document=True)
+    job = ExportJob(
+        id="job-1",
         telegram_chat_id=10001,
-        job_id="job-1",
         kind=ExportKind.SESSIONS_CSV,
+        status="running",
     )
 
-    assert service.calls[-1] == (
-        "fail_export_job",
-        ("job-1", "telegram_delivery_failed"),
-        {},
-    )
-    assert message.edits == []
+    await deliver_export_job(job, bot=cast(Bot, bot), bot_service=service)  # type: ignore[arg-type]
+
+    assert [call[0] for call in service.calls] == ["run_export_job"]
+    assert bot.edits == []
+    assert bot.sent == []
 
 
 def _telegram_bad_request() -> TelegramBadRequest:
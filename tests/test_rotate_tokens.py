@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from drova_bot.storage import (
+    StorageUnitOfWorkFactory,
+    TokenEncryptor,
+    create_database_engine,
+    create_schema,
+    make_session_factory,
+)
+from drova_bot.tools.rotate_tokens import RotateTokensResult, rotate_tokens
+
+
+@pytest.fixture
+async def engine(tmp_path: Path) -> AsyncGenerator[AsyncEngine]:
+    async_engine = create_database_engine(f"sqlite+aiosqlite:///{tmp_path / 'drova.sqlite3'}")
+    await create_schema(async_engine)
+    try:
+        yield async_engine
+    finally:
+        await async_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_rotate_tokens_rewrites_old_key_tokens_in_batches(engine: AsyncEngine) -> None:
+    old_key = TokenEncryptor.generate_key()
+    new_key = TokenEncryptor.generate_key()
+    session_factory = make_session_factory(engine)
+    old_uow = StorageUnitOfWorkFactory(session_factory, TokenEncryptor(old_key))
+    async with old_uow() as uow:
+        for chat_id in range(1, 6):
+            await uow.chat_profiles.connect_token(
+                chat_id,
+                drova_user_id=f"user-{chat_id}",
+                proxy_token=f"token-{chat_id}",
+            )
+        await uow.chat_profiles.get_or_create(6)
+
+    rotating = TokenEncryptor(new_key, retired_keys=[old_key])
+    rotating_uow = StorageUnitOfWorkFactory(session_factory, rotating)
+    async with rotating_uow() as uow:
+        await uow.chat_profiles.update_token(5, "token-5b")
+
+    result = await rotate_tokens(rotating_uow, rotating, batch_size=2)
+    assert result == RotateTokensResult(scanned=5, rotated=4)
+    assert await rotate_tokens(rotating_uow, rotating) == RotateTokensResult(scanned=5)
+
+    new_only = StorageUnitOfWorkFactory(session_factory, TokenEncryptor(new_key))
+    async with new_only() as uow:
+        tokens = [await uow.chat_profiles.decrypt_token(chat_id) for chat_id in range(1, 7)]
+    assert tokens == ["token-1", "token-2", "token-3", "token-4", "token-5b", None]
+
+
+@pytest.mark.asyncio
+async def test_rotate_tokens_counts_tokens_no_key_can_read(engine: AsyncEngine) -> None:
+    session_factory = make_session_factory(engine)
+    lost = StorageUnitOfWorkFactory(session_factory, TokenEncryptor(TokenEncryptor.generate_key()))
+    async with lost() as uow:
+        await uow.chat_profiles.connect_token(1, drova_user_id="user-1", proxy_token="token-1")
+
+    encryptor = TokenEncryptor(TokenEncryptor.generate_key())
+    result = await rotate_tokens(StorageUnitOfWorkFactory(session_factory, encryptor), encryptor)
+
+    assert result == RotateTokensResult(scanned=1, unreadable=1)
+
+
+def test_token_encryptor_decrypts_retired_keys_and_caches_plaintexts(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    old_key = TokenEncryptor.generate_key()
+    payload = TokenEncryptor(old_key).encrypt("secret")
+    encryptor = TokenEncryptor(TokenEncryptor.generate_key(), retired_keys=[old_key])
+
+    assert encryptor.decrypt(payload) == "secret"
+    rotated = encryptor.rotate(payload)
+    assert rotated is not None and encryptor.rotate(rotated) is None
+
+    monkeypatch.setattr(encryptor, "_fernet", None)
+    assert encryptor.decrypt(payload) == "secret"  # served from the plaintext LRU
+    with pytest.raises(ValueError, match="cannot be decrypted"):
+        TokenEncryptor(TokenEncryptor.generate_key()).decrypt(payload)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import sqlite3
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any, cast
 
@@ -9,8 +11,12 @@ from aiogram.types import Message, TelegramObject
 
 from drova_bot import app
 from drova_bot.config import Settings
+from drova_bot.drova import CircuitState, DrovaClient
+from drova_bot.drova.breaker import write_circuit_states
+from drova_bot.exports import ProcessExportExecutor
 from drova_bot.storage import TokenEncryptor, run_migrations
 from drova_bot.telegram.middleware import RequestContextMiddleware, hash_chat_id
+from drova_bot.tools.healthcheck import open_drova_circuits
 
 
 def test_build_runtime_requires_secrets() -> None:
@@ -33,6 +39,7 @@ def test_migration_runner_creates_tables(tmp_path: Path) -> None:
             )
         }
     assert {"chat_profiles", "station_cache", "product_cache", "export_jobs"} <= tables
+    assert {"sessions", "session_sync_state"} <= tables
     assert "alembic_version" in tables
 
 
@@ -49,10 +56,36 @@ async def test_build_runtime_wires_service_and_router(tmp_path: Path) -> None:
     try:
         assert "bot_service" in runtime.dispatcher.workflow_data
         assert runtime.dispatcher.sub_routers[0].name == "drova_bot_core"
+        assert isinstance(runtime.export_executor, ProcessExportExecutor)
+        assert runtime.export_queue is not None
+        assert runtime.dispatcher["export_queue"] is runtime.export_queue
     finally:
         await runtime.close()
 
 
+@pytest.mark.asyncio
+async def test_client_factory_shares_pool_until_runtime_close(tmp_path: Path) -> None:
+    db_path = tmp_path / "drova.sqlite3"
+    settings = _settings(
+        telegram_bot_token="123456:test-token",
+        bot_secret_key=TokenEncryptor.generate_key(),
+        database_url=f"sqlite+aiosqlite:///{db_path}",
+    )
+
+    runtime = app.build_runtime(settings)
+    factory = runtime.client_factory
+    assert factory is not None
+    first = cast(DrovaClient, factory.create("token-a"))
+    second = cast(DrovaClient, factory.create("token-b"))
+
+    assert first._client is second._client
+    await first.aclose()
+    assert not second._client.is_closed
+
+    await runtime.close()
+    assert second._client.is_closed
+
+
 @pytest.mark.asyncio
 async def test_register_bot_commands_uses_runtime_command_list() -> None:
     fake_bot = FakeBot()
@@ -87,6 +120,7 @@ async def test_register_bot_commands_uses_runtime_command_list() -> None:
         "promocodes",
         "export_sessions",
         "export_sessions_csv",
+        "csv_bundle",
         "export_products",
         "export_product_time",
     ]
@@ -149,6 +183,31 @@ async def test_request_context_middleware_adds_non_sensitive_metadata(
     assert "10001" not in repr(fake_logger.records)
 
 
+@pytest.mark.asyncio
+async def test_request_context_middleware_runs_handler_in_request_scope() -> None:
+    events: list[str] = []
+
+    @asynccontextmanager
+    async def request_scope() -> AsyncIterator[None]:
+        events.append("enter")
+        try:
+            yield
+        finally:
+            events.append("exit")
+
+    async def handler(event: TelegramObject, handler_data: dict[str, Any]) -> str:
+        events.append("handler")
+        raise RuntimeError("boom")
+
+    message = Message.model_validate(
+        {"message_id": 1, "date": 0, "chat": {"id": 10001, "type": "private"}, "text": "/start"},
+    )
+    with pytest.raises(RuntimeError):
+        await RequestContextMiddleware(request_scope=request_scope)(handler, message, {})
+
+    assert events == ["enter", "handler", "exit"]
+
+
 def test_deployment_files_keep_secrets_out_of_image() -> None:
     root = Path(__file__).resolve().parents[1]
     dockerfile = (root / "Dockerfile").read_text(encoding="utf-8")
@@ -225,3 +284,15 @@ class FakeLogger:
 
 def _settings(**values: object) -> Settings:
     return Settings.model_validate(values)
+
+
+def test_healthcheck_reports_open_drova_circuits(tmp_path: Path) -> None:
+    state_file = tmp_path / "breaker.json"
+    write_circuit_states(
+        state_file,
+        {"accounting": CircuitState.CLOSED, "server-manager": CircuitState.OPEN},
+    )
+    settings = Settings(DROVA_BREAKER_STATE_FILE=str(state_file))
+
+    assert open_drova_circuits(settings) == ["server-manager"]
+    assert open_drova_circuits(Settings(DROVA_BREAKER_STATE_FILE="")) == []
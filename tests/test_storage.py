@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import AsyncGenerator
 from pathlib import Path
 
 import pytest
-from sqlalchemy import inspect
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from drova_bot.domain.formatters import normalize_session_limit
+from drova_bot.domain.models import CatalogProduct, ChatProfile, Station
 from drova_bot.storage import (
+    CachedChatProfile,
+    CatalogUpsertResult,
+    ChatProfileCache,
     ChatProfileRepository,
     ChatProfileRow,
+    ProductCacheRepository,
+    ProductCacheRow,
+    StationCacheRepository,
+    StorageUnitOfWorkFactory,
     TokenEncryptor,
     create_database_engine,
     create_schema,
@@ -69,6 +78,249 @@ async def test_chat_profile_repository_encrypts_token_and_logs_out(engine: Async
         assert logged_out.selected_station_id is None
 
 
+@pytest.mark.asyncio
+async def test_product_cache_bulk_upsert_writes_only_changes(engine: AsyncEngine) -> None:
+    session_factory = make_session_factory(engine)
+
+    async with session_factory() as session:
+        repo = ProductCacheRepository(session)
+        first = await repo.upsert_catalog(
+            [CatalogProduct(f"product-{index}", f"Game {index}") for index in range(5)],
+            payload_by_product_id={"product-0": '{"v": 1}'},
+            chunk_size=2,
+        )
+        assert first == CatalogUpsertResult(inserted=5)
+
+        second = await repo.upsert_catalog(
+            [
+                CatalogProduct("product-0", "Game 0"),
+                CatalogProduct("product-1", "Game 1 Remastered"),
+                CatalogProduct("product-2", "Game 2"),
+                CatalogProduct("product-9", "Game 9"),
+            ],
+            payload_by_product_id={"product-2": '{"v": 2}'},
+            chunk_size=2,
+        )
+        assert second == CatalogUpsertResult(inserted=1, updated=2, unchanged=1)
+        await session.commit()
+
+    async with session_factory() as session:
+        titles = await ProductCacheRepository(session).title_map()
+        assert titles["product-1"] == "Game 1 Remastered"
+        assert len(titles) == 6
+        kept = await session.get(ProductCacheRow, "product-0")
+        assert kept is not None and kept.payload_json == '{"v": 1}'
+
+
+@pytest.mark.asyncio
+async def test_station_cache_replace_writes_only_differences(engine: AsyncEngine) -> None:
+    session_factory = make_session_factory(engine)
+
+    def station(uuid: str, name: str) -> Station:
+        return Station(uuid=uuid, name=name, state="HANDSHAKE", published=True)
+
+    async with session_factory() as session:
+        await ChatProfileRepository(session).get_or_create(10001)
+        repo = StationCacheRepository(session)
+        assert await repo.replace_for_chat(10001, [station("a", "Alpha"), station("b", "Beta")])
+        await session.commit()
+
+        assert not await repo.replace_for_chat(10001, [station("a", "Alpha"), station("b", "Beta")])
+        assert not session.dirty and not session.new
+
+        assert await repo.replace_for_chat(10001, [station("b", "Beta 2"), station("c", "Gamma")])
+        await session.commit()
+        assert await repo.station_names(10001) == {"b": "Beta 2", "c": "Gamma"}
+
+
+@pytest.mark.asyncio
+async def test_sqlite_engine_applies_pragmas_and_cascades(engine: AsyncEngine) -> None:
+    async with engine.connect() as connection:
+        pragmas = {
+            name: (await connection.exec_driver_sql(f"PRAGMA {name}")).scalar_one()
+            for name in ("journal_mode", "synchronous", "busy_timeout", "foreign_keys")
+        }
+    assert pragmas == {
+        "journal_mode": "wal",
+        "synchronous": 1,
+        "busy_timeout": 5000,
+        "foreign_keys": 1,
+    }
+
+    session_factory = make_session_factory(engine)
+    async with session_factory() as session:
+        await ChatProfileRepository(session).get_or_create(10001)
+        await StationCacheRepository(session).replace_for_chat(
+            10001,
+            [Station(uuid="a", name="Alpha", state="HANDSHAKE", published=True)],
+        )
+        await session.commit()
+        await session.delete(await session.get(ChatProfileRow, 10001))
+        await session.commit()
+        assert await StationCacheRepository(session).station_names(10001) == {}
+
+
+@pytest.mark.asyncio
+async def test_request_scope_reuses_session_and_loaded_rows(engine: AsyncEngine) -> None:
+    uow_factory = StorageUnitOfWorkFactory(
+        make_session_factory(engine),
+        TokenEncryptor(TokenEncryptor.generate_key()),
+    )
+    async with uow_factory() as uow:
+        await uow.chat_profiles.connect_token(10001, drova_user_id="user-1", proxy_token="t")
+
+    statements: list[str] = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    async with uow_factory.request_scope():
+        async with uow_factory() as first:
+            assert await first.chat_profiles.get(10001) is not None
+            assert await first.chat_profiles.decrypt_token(10001) == "t"
+        async with uow_factory() as second:
+            assert second.session is first.session
+            assert await second.chat_profiles.decrypt_token(10001) == "t"
+            async with uow_factory() as nested:
+                assert nested.session is not first.session
+                assert await nested.chat_profiles.get(10001) is not None
+        async with uow_factory() as third:
+            await third.chat_profiles.set_selected_station(10001, "station-1")
+
+        async def spawned() -> None:
+            async with uow_factory() as other:
+                assert other.session is not first.session
+
+        await asyncio.create_task(spawned())
+
+    profile_selects = [sql for sql in statements if "FROM chat_profiles" in sql]
+    # The first read, two token reads (always reloaded) and the nested, unscoped unit of work.
+    assert len(profile_selects) == 4
+    async with uow_factory() as uow:
+        profile = await uow.chat_profiles.get(10001)
+    assert profile is not None and profile.selected_station_id == "station-1"
+
+
+@pytest.mark.asyncio
+async def test_request_scope_reads_token_renewed_by_another_task(engine: AsyncEngine) -> None:
+    uow_factory = StorageUnitOfWorkFactory(
+        make_session_factory(engine),
+        TokenEncryptor(TokenEncryptor.generate_key()),
+    )
+    async with uow_factory() as uow:
+        await uow.chat_profiles.connect_token(10001, drova_user_id="user-1", proxy_token="old")
+
+    async def renew() -> None:
+        async with uow_factory() as other:
+            await other.chat_profiles.update_token(10001, "new")
+
+    async with uow_factory.request_scope():
+        async with uow_factory() as first:
+            assert await first.chat_profiles.decrypt_token(10001) == "old"
+        await asyncio.create_task(renew())
+        async with uow_factory() as second:
+            assert await second.chat_profiles.decrypt_token(10001) == "new"
+            profile = await second.chat_profiles.get(10001)
+    assert profile is not None and profile.encrypted_proxy_token is not None
+
+
+@pytest.mark.asyncio
+async def test_profile_cache_serves_hot_reads_and_writes_through(
+    engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    encryptor = TokenEncryptor(TokenEncryptor.generate_key())
+    cache = ChatProfileCache()
+    uow_factory = StorageUnitOfWorkFactory(make_session_factory(engine), encryptor, cache)
+    async with uow_factory() as uow:
+        await uow.chat_profiles.connect_token(10001, drova_user_id="user-1", proxy_token="t1")
+
+    statements: list[str] = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    decrypts: list[bytes] = []
+    original_decrypt = TokenEncryptor.decrypt
+
+    def counting_decrypt(self: TokenEncryptor, payload: bytes) -> str:
+        decrypts.append(payload)
+        return original_decrypt(self, payload)
+
+    monkeypatch.setattr(TokenEncryptor, "decrypt", counting_decrypt)
+    for _ in range(3):
+        async with uow_factory() as uow:
+            profile = await uow.chat_profiles.get(10001)
+            assert profile is not None and profile.drova_user_id == "user-1"
+            assert await uow.chat_profiles.decrypt_token(10001) == "t1"
+    assert statements == []
+    assert decrypts == []
+
+    async with uow_factory() as uow:
+        await uow.chat_profiles.update_token(10001, "t2")
+        await uow.chat_profiles.set_session_limit(10001, 20)
+    with pytest.raises(RuntimeError):
+        async with uow_factory() as uow:
+            await uow.chat_profiles.set_selected_station(10001, "rolled-back")
+            raise RuntimeError("boom")
+
+    statements.clear()
+    async with uow_factory() as uow:
+        profile = await uow.chat_profiles.get(10001)
+        assert await uow.chat_profiles.decrypt_token(10001) == "t2"
+    assert len(statements) == 1  # the rolled-back write dropped the entry
+    assert profile is not None
+    assert (profile.session_limit, profile.selected_station_id) == (20, None)
+
+
+@pytest.mark.asyncio
+async def test_profile_with_undecryptable_token_stays_readable(engine: AsyncEngine) -> None:
+    session_factory = make_session_factory(engine)
+    retired = StorageUnitOfWorkFactory(
+        session_factory,
+        TokenEncryptor(TokenEncryptor.generate_key()),
+    )
+    async with retired() as uow:
+        await uow.chat_profiles.connect_token(10001, drova_user_id="user-1", proxy_token="t")
+
+    # The key that wrote the token was rotated out without re-encrypting it.
+    uow_factory = StorageUnitOfWorkFactory(
+        session_factory,
+        TokenEncryptor(TokenEncryptor.generate_key()),
+        ChatProfileCache(),
+    )
+    async with uow_factory() as uow:
+        profile = await uow.chat_profiles.get(10001)
+        assert profile is not None and profile.drova_user_id == "user-1"
+        assert (await uow.chat_profiles.get_or_create(10001)).drova_user_id == "user-1"
+        selected = await uow.chat_profiles.set_selected_station(10001, "station-1")
+    assert selected.selected_station_id == "station-1"
+    async with uow_factory() as uow:
+        assert await uow.chat_profiles.get(10001) == selected
+        with pytest.raises(ValueError):
+            await uow.chat_profiles.decrypt_token(10001)
+
+
+def test_profile_cache_refuses_values_read_before_an_invalidation() -> None:
+    now = [0.0]
+    cache = ChatProfileCache(ttl_seconds=10, max_entries=1, clock=lambda: now[0])
+    stale = CachedChatProfile(ChatProfile(telegram_chat_id=1, session_limit=5), "old")
+
+    generation = cache.generation
+    cache.invalidate(1)
+    assert not cache.put(stale, generation=generation)
+    assert cache.get(1) is None
+
+    assert cache.put(stale, generation=cache.generation)
+    assert cache.get(1) == stale
+    cache.put(CachedChatProfile(ChatProfile(telegram_chat_id=2), None), generation=cache.generation)
+    assert cache.get(1) is None and len(cache) == 1
+    now[0] = 11
+    assert cache.get(2) is None
+
+
 def test_legacy_limit_normalization() -> None:
     assert normalize_session_limit(42) == 42
     assert normalize_session_limit(101) == 5